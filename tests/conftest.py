@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vidCache
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    """Every test gets an empty cache instead of the user's."""
+    root = tmp_path / "cache"
+    monkeypatch.setattr(vidCache, "CACHE_ROOT", str(root))
+    return root
@@ -0,0 +1,21 @@
+import vidBench
+
+
+def report(open_seconds, export_seconds):
+    return {"results": [{
+        "media": {"name": "testsrc.mp4"},
+        "open": {"editable_seconds": open_seconds, "probe_seconds": None},
+        "exports": [{"mode": "copy", "merge": True, "workers": 2, "total_seconds": export_seconds}],
+    }]}
+
+
+def test_compare_reports_the_change_of_every_timing():
+    lines = vidBench.compare(report(2.0, 4.0), report(1.0, 5.0))
+    assert lines == [
+        "testsrc.mp4 export.copy+merge x2: 4.000s -> 5.000s (+25.0%)",
+        "testsrc.mp4 open.editable_seconds: 2.000s -> 1.000s (-50.0%)",
+    ]
+
+
+def test_parse_resolution():
+    assert vidBench.parse_resolution("3840x2160") == (3840, 2160)
@@ -0,0 +1,101 @@
+import os
+import sys
+import subprocess
+import vidCache
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def build_entry(cache, key, size):
+    entry = cache.reserve(key)
+    with open(os.path.join(entry, "proxy.m3u8"), "wb") as f:
+        f.write(b"x" * size)
+    cache.commit(key)
+    cache.release(key)
+    return entry
+
+
+def test_proxy_cache_reserve_and_commit(tmp_path):
+    cache = vidCache.ProxyCache(root=str(tmp_path / "proxies"))
+    entry = cache.reserve("a")
+    assert os.path.isdir(entry)
+    # This process is alive, so its build lock holds
+    assert cache.reserve("a") is None
+    assert cache.lookup("a") is None
+    cache.commit("a")
+    assert cache.lookup("a") == entry
+    assert not os.path.exists(os.path.join(entry, cache.LOCK_NAME))
+
+
+def test_proxy_cache_takes_over_stale_builds(tmp_path):
+    cache = vidCache.ProxyCache(root=str(tmp_path / "proxies"))
+    entry = cache.entry_path("a")
+    os.makedirs(entry)
+    with open(os.path.join(entry, cache.LOCK_NAME), "w") as f:
+        f.write(str(dead_pid()))
+    with open(os.path.join(entry, "proxy_00000.ts"), "wb") as f:
+        f.write(b"half-written")
+    assert cache.reserve("a") == entry
+    assert os.listdir(entry) == [cache.LOCK_NAME]
+
+    orphan = cache.entry_path("b")
+    os.makedirs(orphan)
+    with open(os.path.join(orphan, cache.LOCK_NAME), "w") as f:
+        f.write(str(dead_pid()))
+    cache.evict()
+    assert not os.path.exists(orphan)
+    assert os.path.exists(entry)
+
+
+def test_proxy_cache_evicts_least_recently_used_unheld_entries(tmp_path):
+    cache = vidCache.ProxyCache(root=str(tmp_path / "proxies"), max_bytes=250)
+    played = build_entry(cache, "played", 100)
+    old = build_entry(cache, "old", 100)
+    assert cache.lookup("played") == played
+    # The least recently used entry is still held by this process, so the next one goes
+    os.utime(played, (1, 1))
+    os.utime(old, (2, 2))
+    build_entry(cache, "new", 100)
+    assert os.path.exists(played)
+    assert not os.path.exists(old)
+
+    # Reader files of processes that are gone don't hold an entry
+    cache.release("played")
+    with open(os.path.join(played, cache.READER_PREFIX + "0"), "w") as f:
+        f.write(str(dead_pid()))
+    os.utime(played, (1, 1))
+    cache.max_bytes = 150
+    cache.evict()
+    assert not os.path.exists(played)
+    assert cache.lookup("new") is not None
+
+
+def test_segment_cache_keeps_its_own_copy(tmp_path):
+    cache = vidCache.SegmentCache(root=str(tmp_path / "segments"))
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"source")
+    exported = tmp_path / "1.mp4"
+    exported.write_bytes(b"segment")
+    key = cache.key(cache.source_id(str(source)), {"start": 0, "end": 10})
+    cache.store(key, str(exported))
+
+    # Editing the export afterwards must not change what the cache hands out
+    exported.write_bytes(b"edited")
+    target = tmp_path / "again.mp4"
+    assert cache.fetch(key, str(target))
+    assert target.read_bytes() == b"segment"
+    assert not cache.fetch(cache.key("other", {"start": 0, "end": 10}), str(tmp_path / "missing.mp4"))
+
+
+def test_segment_cache_key_follows_the_file_version(tmp_path):
+    cache = vidCache.SegmentCache(root=str(tmp_path / "segments"))
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"source")
+    before = cache.source_id(str(source))
+    source.write_bytes(b"source")
+    os.utime(source, ns=(1, 1))
+    assert cache.source_id(str(source)) != before
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import subprocess
+import pytest
+import vidEngine
+import vidProbe
+
+
+def python_command(code):
+    return [sys.executable, "-c", code]
+
+
+def test_active_segments_skip_deactivated_ones():
+    segments = vidEngine.active_segments([30, 10], [(10, 30)], 60)
+    assert segments == [(0, 10), (30, 60)]
+    assert vidEngine.active_segments([], [], 60) == [(0, 60)]
+
+
+def test_segments_from_indices_use_editor_numbers():
+    assert vidEngine.segments_from_indices([10, 30], [3, 1, 4, 0], 60) == [(30, 60), (0, 10)]
+
+
+def test_output_location_is_a_folder_next_to_the_source():
+    folder, name = vidEngine.output_location(os.path.join("videos", "holiday.mov"))
+    assert folder == os.path.join("videos", "holiday")
+    assert name == "holiday"
+
+
+def test_encode_segments_runs_every_job_on_the_pool(tmp_path):
+    outputs = [tmp_path / f"{i}.txt" for i in range(4)]
+    jobs = [[python_command(f"open({str(path)!r}, 'w').write('done')")] for path in outputs]
+    finished = []
+    vidEngine.encode_segments(jobs, workers=2, progress=finished.append)
+    assert finished == [1, 2, 3, 4]
+    assert all(path.read_text() == "done" for path in outputs)
+
+
+def test_encode_segments_stop_the_other_jobs_when_one_fails():
+    jobs = [[python_command("import time; time.sleep(30)")], [python_command("import sys; sys.exit(3)")]]
+    started = time.monotonic()
+    with pytest.raises(subprocess.CalledProcessError):
+        vidEngine.encode_segments(jobs, workers=2)
+    assert time.monotonic() - started < 20
+
+
+def test_copy_exports_cut_on_keyframes():
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0]
+    plan = vidEngine.export_plan("in.mp4", [4.8, 4.9, 7.1], [], 10, mode="copy", keyframes=keyframes)
+    # The segment between 4.8 and 4.9 collapses onto one keyframe and is dropped
+    assert plan == [(0, 4.0), (4.0, 8.0), (8.0, 10)]
+    assert vidEngine.export_plan("in.mp4", [4.8], [], 10, mode="encode") == [(0, 4.8), (4.8, 10)]
+
+
+def test_smart_cuts_copy_segments_that_start_on_a_keyframe():
+    commands, temp_files = vidEngine.smart_segment_commands("in.mp4", 4.0, 9.0, "out.mp4", [0.0, 4.0, 8.0])
+    assert temp_files == []
+    assert len(commands) == 1
+    assert "copy" in commands[0]
+
+
+def test_smart_cuts_encode_only_the_head(tmp_path, monkeypatch):
+    info = {"video_codec": "h264", "video_profile": "High", "video_level": 40, "pix_fmt": "yuv420p",
+            "video_timescale": 15360, "has_audio": False}
+    monkeypatch.setattr(vidProbe, "probe", lambda video_path: info)
+    output_path = str(tmp_path / "out.mp4")
+    commands, temp_files = vidEngine.smart_segment_commands("in.mp4", 3.0, 9.0, output_path, [0.0, 4.0, 8.0])
+    head, tail, concat = commands
+    assert head[head.index("-t") + 1] == "1.0"
+    assert head[head.index("-c:v") + 1] == "libx264"
+    assert tail[tail.index("-ss") + 1] == "4.0"
+    assert concat[-1] == output_path
+    assert len(temp_files) == 3
+
+    # Streams an encode can't reproduce are re-encoded as one piece
+    info["video_codec"] = "vp9"
+    commands, temp_files = vidEngine.smart_segment_commands("in.mp4", 3.0, 9.0, output_path, [0.0, 4.0, 8.0])
+    assert len(commands) == 1 and temp_files == []
+
+
+def test_single_pass_maps_every_segment_to_its_output():
+    cmd = vidEngine.single_pass_command("in.mp4", [(0, 5), (7, 12)], ["a.mp4", "b.mp4"], has_audio=False)
+    assert cmd.count("-i") == 1
+    maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+    assert maps == ["[vo0]", "[vo1]", "0:v"]
+    assert cmd.index("a.mp4") < cmd.index("b.mp4")
+    # The null output runs up to the end of the last segment
+    assert cmd[-5:] == ["-t", "12", "-f", "null", "-"]
+
+
+def test_trim_graph_cuts_each_segment_from_one_input():
+    graph = vidEngine.trim_graph([(0, 5), (7, 12)], video_filter="crop=100:100")
+    assert graph[0] == "[0:v]split=2[v0][v1]"
+    assert graph[1] == "[0:a]asplit=2[a0][a1]"
+    assert "[v1]trim=start=7:end=12,setpts=PTS-STARTPTS,crop=100:100[vo1]" in graph
+    assert "[a1]atrim=start=7:end=12,asetpts=PTS-STARTPTS[ao1]" in graph
+
+
+def test_merge_concatenates_before_the_filter():
+    cmd = vidEngine.merge_command("in.mp4", [(0, 5), (7, 12)], "merged.mp4", video_filter="crop=100:100")
+    graph = cmd[cmd.index("-filter_complex") + 1].split(";")
+    assert "[vo0][ao0][vo1][ao1]concat=n=2:v=1:a=1[vm][am]" in graph
+    assert graph[-1] == "[vm]crop=100:100[vf]"
+    maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+    assert maps == ["[vf]", "[am]"]
+    assert cmd[-1] == "merged.mp4"
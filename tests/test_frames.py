@@ -0,0 +1,20 @@
+import vidFrames
+
+
+def test_frame_size_scales_down_to_even_dimensions():
+    assert vidFrames.frame_size(3840, 2160) == (640, 360)
+    assert vidFrames.frame_size(1080, 1920) == (202, 360)
+    # Small sources aren't scaled up
+    assert vidFrames.frame_size(321, 241) == (320, 240)
+
+
+def test_eviction_keeps_the_window_around_the_playhead():
+    buffer = vidFrames.FrameBuffer("in.mp4", 30, 4, 2, frame_count=100, max_bytes=16 * 24)
+    assert (buffer.capacity, buffer.batch, buffer.window_size) == (16, 2, 14)
+    with buffer.lock:
+        buffer.frames = {index: b"" for index in range(21)}
+        buffer.window = (10, 24)
+        buffer.playhead = 12
+        buffer.evict()
+    # Every frame of the window is kept, then the ones nearest to the playhead
+    assert sorted(buffer.frames) == list(range(7, 21))
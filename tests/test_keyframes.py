@@ -0,0 +1,22 @@
+import vidKeyframes
+
+
+def test_snap_to_keyframe_picks_the_nearest():
+    keyframes = [0.0, 2.0, 4.0]
+    assert vidKeyframes.snap_to_keyframe(keyframes, 2.9) == 2.0
+    assert vidKeyframes.snap_to_keyframe(keyframes, 3.1) == 4.0
+    assert vidKeyframes.snap_to_keyframe(keyframes, 9.0) == 4.0
+    assert vidKeyframes.snap_to_keyframe([], 3.1) == 3.1
+
+
+def test_snap_segments_keep_the_ends_and_drop_collapsed_segments():
+    keyframes = [0.0, 2.0, 4.0, 6.0]
+    segments = [(0, 1.9), (1.9, 2.1), (2.1, 5.2), (5.2, 7.5)]
+    assert vidKeyframes.snap_segments(segments, keyframes, 7.5) == [(0, 2.0), (2.0, 6.0), (6.0, 7.5)]
+
+
+def test_next_keyframe_is_at_or_after_the_position():
+    keyframes = [0.0, 2.0, 4.0]
+    assert vidKeyframes.next_keyframe(keyframes, 2.0) == 2.0
+    assert vidKeyframes.next_keyframe(keyframes, 2.1) == 4.0
+    assert vidKeyframes.next_keyframe(keyframes, 4.1) is None
@@ -0,0 +1,69 @@
+import os
+import vidManifest
+
+PARAMS = {"source": "abc", "mode": "encode"}
+CUTS = [(0, 10), (10, 20)]
+
+
+def finish(manifest, index, data=b"segment"):
+    with open(vidManifest.part_path(manifest.output_path(index)), "wb") as f:
+        f.write(data)
+    manifest.complete(index)
+
+
+def outputs(folder):
+    return [str(folder / "1.mp4"), str(folder / "2.mp4")]
+
+
+def test_part_path_keeps_the_extension():
+    assert vidManifest.part_path(os.path.join("out", "1.mp4")) == os.path.join("out", "1.part.mp4")
+
+
+def test_interrupted_export_resumes(tmp_path):
+    manifest = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    assert manifest.pending() == [0, 1]
+    finish(manifest, 0)
+    assert (tmp_path / "1.mp4").read_bytes() == b"segment"
+    assert not os.path.exists(vidManifest.part_path(str(tmp_path / "1.mp4")))
+
+    resumed = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    assert resumed.pending() == [1]
+
+
+def test_changed_output_or_params_are_exported_again(tmp_path):
+    manifest = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    finish(manifest, 0)
+    finish(manifest, 1)
+
+    (tmp_path / "2.mp4").write_bytes(b"edited elsewhere")
+    resumed = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    assert resumed.pending() == [1]
+
+    changed = vidManifest.ExportManifest.open(str(tmp_path), dict(PARAMS, mode="copy"), outputs(tmp_path), CUTS)
+    assert changed.pending() == [0, 1]
+
+
+def test_moved_cut_and_restart_are_exported_again(tmp_path):
+    manifest = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    finish(manifest, 0)
+    moved = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), [(0, 9), (9, 20)])
+    assert moved.pending() == [0, 1]
+    finish(moved, 0)
+    restarted = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), [(0, 9), (9, 20)],
+                                                resume=False)
+    assert restarted.pending() == [0, 1]
+
+
+def test_leftover_part_files_are_removed(tmp_path):
+    part = vidManifest.part_path(str(tmp_path / "1.mp4"))
+    with open(part, "wb") as f:
+        f.write(b"half")
+    vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    assert not os.path.exists(part)
+
+
+def test_remove(tmp_path):
+    manifest = vidManifest.ExportManifest.open(str(tmp_path), PARAMS, outputs(tmp_path), CUTS)
+    manifest.remove()
+    assert not os.path.exists(manifest.path)
+    manifest.remove()
@@ -0,0 +1,70 @@
+import json
+import subprocess
+from fractions import Fraction
+import vidProbe
+import vidProcess
+
+FFPROBE_OUTPUT = {
+    "format": {"duration": "10.010000"},
+    "streams": [
+        {"index": 0, "codec_type": "video", "codec_name": "h264", "profile": "High", "level": 41,
+         "pix_fmt": "yuv420p", "width": 1920, "height": 1080, "avg_frame_rate": "30000/1001",
+         "r_frame_rate": "30000/1001", "time_base": "1/30000",
+         "side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]},
+        {"index": 1, "codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2,
+         "bit_rate": "128000"},
+    ],
+}
+
+
+def fake_ffprobe(monkeypatch, output=FFPROBE_OUTPUT):
+    calls = []
+
+    def run_ffmpeg(cmd, group=None):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, json.dumps(output).encode(), b"")
+
+    monkeypatch.setattr(vidProcess, "run_ffmpeg", run_ffmpeg)
+    return calls
+
+
+def test_parse_rate_is_exact_and_zero_when_unknown():
+    assert vidProbe.parse_rate("30000/1001") == Fraction(30000, 1001)
+    assert vidProbe.parse_rate("25") == 25
+    assert vidProbe.parse_rate("0/0") == 0
+    assert vidProbe.parse_rate(None) == 0
+    assert vidProbe.parse_rate("-1/1") == 0
+
+
+def test_display_size_applies_rotation():
+    info = {"width": 1920, "height": 1080, "rotation": 0}
+    assert vidProbe.display_size(info) == (1920, 1080)
+    assert vidProbe.display_size(dict(info, rotation=-90)) == (1080, 1920)
+    assert vidProbe.display_size(dict(info, rotation=180)) == (1920, 1080)
+
+
+def test_read_probe_reduces_ffprobe_output(monkeypatch):
+    fake_ffprobe(monkeypatch)
+    info = vidProbe.read_probe("in.mp4")
+    assert info["duration"] == 10.01
+    assert (info["fps_num"], info["fps_den"]) == (30000, 1001)
+    # No nb_frames: counted from the duration
+    assert info["frame_count"] == 300
+    assert info["rotation"] == -90
+    assert info["video_timescale"] == 30000
+    assert info["has_audio"] and info["audio_sample_rate"] == 48000
+
+
+def test_probe_runs_ffprobe_once_per_file_version(tmp_path, monkeypatch):
+    calls = fake_ffprobe(monkeypatch)
+    monkeypatch.setattr(vidProbe, "_memory_cache", {})
+    video = tmp_path / "in.mp4"
+    video.write_bytes(b"first")
+    assert vidProbe.probe(str(video))["width"] == 1920
+    vidProbe._memory_cache.clear()
+    # Read back from the disk cache
+    vidProbe.probe(str(video))
+    assert len(calls) == 1
+    video.write_bytes(b"second version")
+    vidProbe.probe(str(video))
+    assert len(calls) == 2
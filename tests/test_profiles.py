@@ -0,0 +1,46 @@
+import vidProfiles
+
+
+def test_tune_uses_cores_for_parallel_encodes():
+    assert vidProfiles.tune([10] * 8, cores=8) == (4, 2)
+
+
+def test_tune_stops_at_the_longest_segment():
+    # One long segment bounds the export; two encodes are enough to finish the short ones alongside it
+    assert vidProfiles.tune([100, 10, 10, 10], cores=16) == (2, 8)
+
+
+def test_tune_respects_max_workers_and_empty_input():
+    assert vidProfiles.tune([10] * 8, cores=16, max_workers=2) == (2, 8)
+    assert vidProfiles.tune([], cores=6) == (1, 6)
+    assert vidProfiles.tune([10], cores=1) == (1, 1)
+
+
+def test_matching_args_reproduce_the_source_streams():
+    info = {"video_codec": "h264", "video_profile": "High", "video_level": 41, "pix_fmt": "yuv420p",
+            "video_timescale": 15360, "has_audio": True, "audio_codec": "aac", "audio_sample_rate": 48000,
+            "audio_channels": 2, "audio_bit_rate": 0}
+    args = vidProfiles.matching_args(info, "draft", threads=2)
+    options = dict(zip(args[::2], args[1::2]))
+    assert options["-c:v"] == "libx264"
+    assert options["-profile:v"] == "high"
+    assert options["-level"] == "4.1"
+    assert options["-video_track_timescale"] == "15360"
+    assert options["-ar"] == "48000"
+    assert options["-b:a"] == "96k"
+    assert options["-threads"] == "2"
+
+
+def test_matching_args_give_up_on_unknown_streams():
+    info = {"video_codec": "vp9", "video_profile": "Profile 0", "pix_fmt": "yuv420p", "video_timescale": 1000,
+            "has_audio": False}
+    assert vidProfiles.matching_args(info) is None
+    info.update(video_codec="h264", video_profile="High", has_audio=True, audio_codec="flac",
+                audio_sample_rate=48000, audio_channels=2)
+    assert vidProfiles.matching_args(info) is None
+
+
+def test_parallel_encodes_leave_each_encode_enough_threads():
+    assert vidProfiles.parallel_encodes(8) == 4
+    assert vidProfiles.parallel_encodes(1) == 1
+    assert vidProfiles.tune([10] * 20, cores=8)[0] == vidProfiles.parallel_encodes(8)
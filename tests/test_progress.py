@@ -0,0 +1,58 @@
+import vidEngine
+import vidProcess
+
+
+def progress(seconds, state="continue", frame=None):
+    fields = {"out_time_us": str(int(seconds * 1000000)), "progress": state}
+    if frame is not None:
+        fields["frame"] = str(frame)
+    return fields
+
+
+def test_segment_tracker_reports_each_passed_end():
+    finished = []
+    tracker = vidEngine.SegmentTracker([10, 5, 20], finished.append)
+    tracker.update(progress(4))
+    tracker.update({"progress": "continue"})
+    tracker.update(progress(12))
+    assert finished == [1, 2]
+    tracker.finish()
+    assert finished == [1, 2, 3]
+
+
+def test_progress_meter_adds_up_concurrent_jobs():
+    updates = []
+    meter = vidProcess.ProgressMeter(40, segments=2, on_stats=updates.append)
+    first = meter.tracker(0, 20)
+    second = meter.tracker(1, 20)
+    first(progress(5, frame=150))
+    second(progress(10, frame=300))
+    stats = updates[-1]
+    assert stats["seconds"] == 15
+    assert stats["frames"] == 450
+    assert stats["fraction"] == 15 / 40
+    assert stats["eta"] is not None
+
+
+def test_progress_meter_caps_a_job_at_its_limit():
+    meter = vidProcess.ProgressMeter(10)
+    tracker = meter.tracker(0, 10)
+    # A smart cut: the head, then the tail, then a concat that rewrites the whole segment
+    tracker(progress(3, "end"))
+    tracker(progress(7, "end"))
+    tracker(progress(6))
+    assert meter.snapshot()["seconds"] == 10
+
+
+def test_progress_meter_segments():
+    updates = []
+    meter = vidProcess.ProgressMeter(10, segments=3, on_stats=updates.append)
+    meter.segment_finished(2)
+    assert (updates[-1]["segments_done"], updates[-1]["segments"]) == (2, 3)
+    assert "2/3 segments" in vidProcess.format_stats(updates[-1])
+
+
+def test_progress_seconds():
+    assert vidProcess.progress_seconds({"out_time_us": "1500000"}) == 1.5
+    assert vidProcess.progress_seconds({"out_time_us": "N/A"}) is None
+    assert vidProcess.progress_seconds({}) is None
@@ -0,0 +1,59 @@
+import os
+import shutil
+import pytest
+import vidProject
+
+PROBE = {"duration": 60.0, "fps": 30.0, "width": 1920, "height": 1080, "frame_count": 1800}
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"video" * 1000)
+    return path
+
+
+def test_make_project_records_the_edit_and_settings(video):
+    project = vidProject.make_project(str(video), PROBE, [30, 10], [(10, 30)], mode="smart", crop=False, merge=True)
+    assert project["split_points"] == [10, 30]
+    assert project["deactivated_segments"] == [[10, 30]]
+    assert project["export"] == {"mode": "smart", "profile": "balanced", "crop": False, "merge": True}
+    assert project["source"]["path"] == os.path.abspath(str(video))
+    assert project["source"]["probe"] == PROBE
+    assert vidProject.project_path(str(video)) == str(video.parent / "clip.vsplit.json")
+
+
+def test_saved_project_loads_back(video):
+    project = vidProject.make_project(str(video), PROBE, [10], [])
+    path = vidProject.project_path(str(video))
+    vidProject.save_project(path, project)
+    assert vidProject.load_project(path) == project
+
+
+def test_load_project_rejects_other_files_and_versions(tmp_path, video):
+    other = tmp_path / "other.json"
+    other.write_text("not json")
+    with pytest.raises(ValueError):
+        vidProject.load_project(str(other))
+    project = vidProject.make_project(str(video), PROBE, [10], [])
+    project["version"] = vidProject.PROJECT_VERSION + 1
+    vidProject.save_project(str(other), project)
+    with pytest.raises(ValueError):
+        vidProject.load_project(str(other))
+
+
+def test_resolve_source_follows_a_moved_project(tmp_path, video):
+    project = vidProject.make_project(str(video), PROBE, [10], [])
+    assert vidProject.resolve_source(project, str(tmp_path / "clip.vsplit.json")) == os.path.abspath(str(video))
+
+    # Video and project moved together: the video is found next to the project
+    moved = tmp_path / "moved"
+    moved.mkdir()
+    shutil.move(str(video), str(moved / "clip.mp4"))
+    assert vidProject.resolve_source(project, str(moved / "clip.vsplit.json")) == str(moved / "clip.mp4")
+
+    (moved / "clip.mp4").write_bytes(b"other video")
+    with pytest.raises(ValueError):
+        vidProject.resolve_source(project, str(moved / "clip.vsplit.json"))
+    with pytest.raises(ValueError):
+        vidProject.resolve_source(project, str(tmp_path / "elsewhere" / "clip.vsplit.json"))
@@ -0,0 +1,15 @@
+import vidProxy
+
+
+def test_playlist_seconds_count_only_listed_segments(tmp_path):
+    playlist = tmp_path / vidProxy.PLAYLIST_NAME
+    assert vidProxy.playlist_seconds(str(playlist)) == 0
+    playlist.write_text("#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:2\n#EXT-X-PLAYLIST-TYPE:EVENT\n")
+    assert vidProxy.playlist_seconds(str(playlist)) == 0
+    playlist.write_text(playlist.read_text() + "#EXTINF:2.000000,\nproxy_00000.ts\n#EXTINF:1.966667,\nproxy_00001.ts\n#EXTINF:")
+    assert abs(vidProxy.playlist_seconds(str(playlist)) - 3.966667) < 1e-6
+
+
+def test_proxies_only_for_sources_above_1080p():
+    assert not vidProxy.needs_proxy(1920, 1080)
+    assert vidProxy.needs_proxy(3840, 2160)
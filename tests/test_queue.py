@@ -0,0 +1,107 @@
+import sys
+import time
+import threading
+import subprocess
+import pytest
+import vidQueue
+
+
+def test_second_queue_is_read_only(tmp_path):
+    path = str(tmp_path / "queue.json")
+    owner = vidQueue.ExportQueue(path=path, budget=1)
+    owner.jobs.append(vidQueue.ExportJob(1, "a.mp4", "a.mp4", [10], [], 60, status="done"))
+    owner.save()
+
+    viewer = vidQueue.ExportQueue(path=path, budget=1)
+    assert owner.owned and not viewer.owned
+    assert [job.job_id for job in viewer.jobs] == [1]
+    with pytest.raises(vidQueue.QueueLocked):
+        viewer.start()
+    with pytest.raises(vidQueue.QueueLocked):
+        viewer.submit("b.mp4", "b.mp4", [5], [], 60)
+    viewer.clear_finished()
+    assert vidQueue.ExportQueue(path=path, budget=1).jobs[0].job_id == 1
+
+    owner.close()
+    assert vidQueue.ExportQueue(path=path, budget=1).owned
+
+
+def test_lock_of_a_dead_process_is_taken_over(tmp_path):
+    path = str(tmp_path / "queue.json")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with open(path + vidQueue.LOCK_SUFFIX, "w") as f:
+        f.write(str(dead.pid))
+    assert vidQueue.ExportQueue(path=path, budget=1).owned
+
+
+class BlockingExports:
+    """Stands in for vidEngine.export_segments: records each job's workers and holds it until released."""
+
+    def __init__(self):
+        self.started = []
+        self.release = threading.Event()
+
+    def __call__(self, video_path, original_path, *args, workers=1, **kwargs):
+        self.started.append((original_path, workers))
+        self.release.wait(5)
+        return 1
+
+
+def wait_for(condition):
+    deadline = time.time() + 5
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_jobs_start_by_priority_then_submission(tmp_path, monkeypatch):
+    exports = BlockingExports()
+    monkeypatch.setattr(vidQueue.vidEngine, "export_segments", exports)
+    queue = vidQueue.ExportQueue(path=str(tmp_path / "queue.json"), budget=1)
+    first = queue.submit("a.mp4", "a.mp4", [10], [], 60)
+    second = queue.submit("b.mp4", "b.mp4", [10], [], 60)
+    urgent = queue.submit("c.mp4", "c.mp4", [10], [], 60, priority=1)
+    queue.set_priority(second.job_id, 2)
+    exports.release.set()
+    try:
+        queue.start()
+        wait_for(lambda: not queue.pending())
+    finally:
+        exports.release.set()
+        queue.close()
+    # With one worker, jobs run one at a time: highest priority first, then in submission order
+    assert [name for name, _ in exports.started] == ["b.mp4", "c.mp4", "a.mp4"]
+    assert all(job.status == "done" for job in (first, second, urgent))
+
+
+def test_free_workers_are_shared_among_waiting_jobs(tmp_path, monkeypatch):
+    exports = BlockingExports()
+    monkeypatch.setattr(vidQueue.vidEngine, "export_segments", exports)
+    queue = vidQueue.ExportQueue(path=str(tmp_path / "queue.json"), budget=4)
+    queue.submit("long.mp4", "long.mp4", list(range(10, 100, 10)), [], 100)
+    queue.submit("short.mp4", "short.mp4", [10], [], 20)
+    queue.submit("single.mp4", "single.mp4", [], [], 20)
+    try:
+        queue.start()
+        wait_for(lambda: len(exports.started) == 3)
+        # ceil(4 free / 3 waiting) for the first, then what is left, never more than a job's segments
+        assert dict(exports.started) == {"long.mp4": 2, "short.mp4": 1, "single.mp4": 1}
+        assert queue.busy_workers() == 4
+    finally:
+        exports.release.set()
+        queue.close()
+
+
+def test_a_lone_job_gets_the_whole_budget(tmp_path, monkeypatch):
+    exports = BlockingExports()
+    monkeypatch.setattr(vidQueue.vidEngine, "export_segments", exports)
+    queue = vidQueue.ExportQueue(path=str(tmp_path / "queue.json"), budget=3)
+    queue.submit("a.mp4", "a.mp4", [10, 20, 30, 40], [], 60)
+    try:
+        queue.start()
+        wait_for(lambda: exports.started)
+        assert exports.started == [("a.mp4", 3)]
+    finally:
+        exports.release.set()
+        queue.close()
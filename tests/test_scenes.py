@@ -0,0 +1,21 @@
+import vidScenes
+
+METADATA_OUTPUT = """frame:0    pts:61440  pts_time:4
+lavfi.scene_score=0.812000
+frame:1    pts:97280  pts_time:6.333333
+lavfi.scene_score=0.150000
+frame:2    pts:110080 pts_time:7.166667
+lavfi.scene_score=0.460000
+"""
+
+
+def test_parse_scores_pair_times_with_scores():
+    assert vidScenes.parse_scores(METADATA_OUTPUT) == [(4.0, 0.812), (6.333333, 0.15), (7.166667, 0.46)]
+    assert vidScenes.parse_scores("lavfi.scene_score=0.9\n") == []
+
+
+def test_suggest_splits_prefer_the_strongest_changes_min_gap_apart():
+    index = {"times": [1.0, 4.0, 5.0, 7.0, 9.5], "scores": [0.9, 0.5, 0.8, 0.2, 0.9]}
+    # 1.0 and 9.5 are too close to the ends, 4.0 too close to the stronger 5.0, 7.0 below the threshold
+    assert vidScenes.suggest_splits(index, 10.0, threshold=0.3, min_gap=2.0) == [5.0]
+    assert vidScenes.suggest_splits(index, 10.0, threshold=0.1, min_gap=0.5) == [1.0, 4.0, 5.0, 7.0, 9.5]
@@ -0,0 +1,57 @@
+import vidSilence
+import vidTimeline
+
+
+def feed(finder, levels, step=vidSilence.WINDOW_SECONDS):
+    for i, level in enumerate(levels):
+        finder.line(f"frame:{i}    pts:{i * 800}  pts_time:{i * step:.2f}")
+        finder.line(f"lavfi.astats.Overall.RMS_level={level}")
+    return finder.finish()
+
+
+def test_silence_finder_keeps_long_quiet_stretches():
+    finder = vidSilence.SilenceFinder(-40, 0.5)
+    levels = [-20] * 10 + [-60] * 20 + [-20] * 10 + [-50] * 4 + [-20] * 5
+    assert feed(finder, levels, 0.1) == [(1.0, 3.0)]
+
+
+def test_silence_finder_closes_silence_at_the_end():
+    finder = vidSilence.SilenceFinder(-40, 0.5)
+    silences = feed(finder, [-20] * 10 + ["-inf"] * 10, 0.1)
+    assert len(silences) == 1
+    start, end = silences[0]
+    assert start == 1.0
+    assert abs(end - (1.9 + vidSilence.WINDOW_SECONDS)) < 1e-9
+
+
+def test_silence_finder_ignores_levels_before_a_frame():
+    finder = vidSilence.SilenceFinder(-40, 0)
+    finder.line("lavfi.astats.Overall.RMS_level=-90")
+    assert finder.finish() == []
+
+
+def test_silence_edit_splits_in_the_middle_of_inner_pauses():
+    timeline = vidTimeline.Timeline(60)
+    timeline.execute(vidSilence.silence_edit(timeline, [(0, 2), (10, 12), (58, 60)]))
+    assert timeline.split_points == [11]
+
+
+def test_silence_edit_removes_pauses_with_padding():
+    timeline = vidTimeline.Timeline(60)
+    batch = vidSilence.silence_edit(timeline, [(0, 2), (10, 12), (58, 60)], remove=True, padding=0.5)
+    assert timeline.execute(batch)
+    # Padding is kept next to the speech, also at the very start and end
+    assert timeline.split_points == [1.5, 10.5, 11.5, 58.5]
+    assert timeline.deactivated_segments() == [(0, 1.5), (10.5, 11.5), (58.5, 60)]
+    timeline.undo()
+    assert timeline.split_points == []
+    assert timeline.deactivated_segments() == []
+
+
+def test_silence_edit_skips_pauses_shorter_than_the_padding_and_deactivated_ones():
+    timeline = vidTimeline.Timeline(60)
+    timeline.execute(vidTimeline.AddSplit(20))
+    timeline.execute(vidTimeline.AddSplit(30))
+    timeline.execute(vidTimeline.ToggleSegment(25))
+    batch = vidSilence.silence_edit(timeline, [(10, 10.2), (22, 28)], remove=True, padding=0.15)
+    assert not timeline.execute(batch)
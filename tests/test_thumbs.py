@@ -0,0 +1,39 @@
+import vidThumbs
+
+
+def make_store(tmp_path, duration, **kwargs):
+    source = tmp_path / "in.mp4"
+    source.write_bytes(b"video")
+    return vidThumbs.ThumbnailStore(str(source), duration, workers=0, **kwargs)
+
+
+def test_thumbnails_sit_on_a_fixed_grid(tmp_path):
+    store = make_store(tmp_path, 25.0)
+    assert (store.interval, store.count, store.sheet_count) == (2.0, 13, 2)
+    assert store.thumb_at(7.1) == 4
+    assert store.thumb_at(99) == 12
+    assert store.sheet_of(12) == (1, 2)
+    assert store.sheet_size(1) == 3
+    # Long videos get fewer thumbnails per second
+    assert make_store(tmp_path, 3000.0).interval == 10.0
+
+
+def test_eviction_drops_least_recently_used_sheets(tmp_path):
+    store = make_store(tmp_path, 100.0, max_bytes=25)
+    for sheet in range(3):
+        store.sheets[sheet] = (f"sheet {sheet}", 10)
+    store.used_bytes = 30
+    store.get(0)
+    with store.condition:
+        store.evict(keep=0)
+    assert list(store.sheets) == [2, 0]
+    assert store.used_bytes == 20
+
+
+def test_cached_sheets_are_loaded_without_ffmpeg(tmp_path):
+    store = make_store(tmp_path, 100.0)
+    path = tmp_path / "cache" / "sheet.jpg"
+    store.folder = str(path.parent)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    (path.parent / "0.jpg").write_bytes(b"jpeg")
+    assert store.load(0) == b"jpeg"
@@ -0,0 +1,127 @@
+import vidTimeline
+
+
+def make_timeline(*splits, duration=60):
+    timeline = vidTimeline.Timeline(duration)
+    for position in splits:
+        timeline.execute(vidTimeline.AddSplit(position))
+    return timeline
+
+
+def test_segments_follow_sorted_splits():
+    timeline = make_timeline(40, 10, 25)
+    assert timeline.split_points == [10, 25, 40]
+    assert timeline.segments() == [(0, 10), (10, 25), (25, 40), (40, 60)]
+    assert timeline.segment_at(30) == (25, 40)
+    assert timeline.segment_at(10) == (10, 25)
+
+
+def test_add_split_rejects_duplicates_and_ends():
+    timeline = make_timeline(10)
+    assert not timeline.execute(vidTimeline.AddSplit(10))
+    assert not timeline.execute(vidTimeline.AddSplit(0))
+    assert not timeline.execute(vidTimeline.AddSplit(60))
+    assert len(timeline.undo_stack) == 1
+
+
+def test_undo_redo_add_split_keeps_segment_ids():
+    timeline = make_timeline(10, 30)
+    ids = list(timeline.segment_ids)
+    assert timeline.undo()
+    assert timeline.split_points == [10]
+    assert timeline.redo()
+    assert timeline.split_points == [10, 30]
+    assert timeline.segment_ids == ids
+    assert not timeline.redo()
+
+
+def test_splitting_a_deactivated_segment_deactivates_both_halves():
+    timeline = make_timeline(10)
+    timeline.execute(vidTimeline.ToggleSegment(5))
+    timeline.execute(vidTimeline.AddSplit(5))
+    assert timeline.deactivated_segments() == [(0, 5), (5, 10)]
+
+
+def test_toggle_follows_the_segment_across_later_splits():
+    timeline = make_timeline(10)
+    timeline.execute(vidTimeline.ToggleSegment(20))
+    timeline.execute(vidTimeline.AddSplit(5))
+    timeline.undo()
+    timeline.undo()
+    assert timeline.deactivated_segments() == []
+    timeline.redo()
+    assert timeline.deactivated_segments() == [(10, 60)]
+
+
+def test_remove_split_keeps_left_state_and_restores_right_on_undo():
+    timeline = make_timeline(10, 20)
+    timeline.execute(vidTimeline.ToggleSegment(15))
+    assert timeline.execute(vidTimeline.RemoveSplit(10))
+    # The merged segment is the left one, which was active
+    assert timeline.split_points == [20]
+    assert timeline.deactivated_segments() == []
+    assert timeline.undo()
+    assert timeline.split_points == [10, 20]
+    assert timeline.deactivated_segments() == [(10, 20)]
+
+
+def test_remove_split_into_deactivated_left_segment():
+    timeline = make_timeline(10)
+    timeline.execute(vidTimeline.ToggleSegment(5))
+    timeline.execute(vidTimeline.RemoveSplit(10))
+    assert timeline.deactivated_segments() == [(0, 60)]
+    timeline.undo()
+    assert timeline.deactivated_segments() == [(0, 10)]
+
+
+def test_remove_missing_split_changes_nothing():
+    timeline = make_timeline(10)
+    assert not timeline.execute(vidTimeline.RemoveSplit(11))
+    assert timeline.split_points == [10]
+
+
+def test_batch_is_one_undo_step():
+    timeline = make_timeline()
+    batch = vidTimeline.Batch([vidTimeline.AddSplit(10), vidTimeline.AddSplit(10), vidTimeline.AddSplit(20),
+                               vidTimeline.ToggleSegment(15)])
+    assert timeline.execute(batch)
+    assert timeline.split_points == [10, 20]
+    assert timeline.deactivated_segments() == [(10, 20)]
+    assert timeline.undo()
+    assert timeline.split_points == []
+    assert timeline.deactivated_segments() == []
+    assert timeline.redo()
+    assert timeline.deactivated_segments() == [(10, 20)]
+
+
+def test_empty_batch_is_not_recorded():
+    timeline = make_timeline(10)
+    assert not timeline.execute(vidTimeline.Batch([vidTimeline.AddSplit(10)]))
+    assert len(timeline.undo_stack) == 1
+
+
+def test_restore():
+    timeline = vidTimeline.Timeline.restore(60, [30, 10, 10, 70], [(10, 30)])
+    assert timeline.split_points == [10, 30]
+    assert timeline.deactivated_segments() == [(10, 30)]
+    assert not timeline.undo_stack
+
+
+def test_suggestions():
+    timeline = make_timeline(10)
+    timeline.set_suggestions([10, 25, 5, 80, 25])
+    assert timeline.suggestions == [5, 25]
+    assert timeline.nearest_suggestion(24.8, 0.5) == 25
+    assert timeline.nearest_suggestion(24, 0.5) is None
+    assert timeline.next_suggestion(5) == 25
+    assert timeline.next_suggestion(25) is None
+
+    assert timeline.execute(vidTimeline.AcceptSuggestion(25))
+    assert timeline.split_points == [10, 25]
+    assert timeline.suggestions == [5]
+    assert timeline.execute(vidTimeline.RejectSuggestion(5))
+    assert timeline.suggestions == []
+    timeline.undo()
+    timeline.undo()
+    assert timeline.split_points == [10]
+    assert timeline.suggestions == [5, 25]
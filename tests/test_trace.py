@@ -0,0 +1,63 @@
+import os
+import sys
+import subprocess
+import pytest
+import vidProcess
+import vidTrace
+
+
+def test_summarize_groups_stages_and_commands():
+    records = [
+        {"type": "stage", "stage": "segment", "status": "ok", "wall_seconds": 1.0},
+        {"type": "stage", "stage": "segment", "status": "ok", "wall_seconds": 3.0},
+        {"type": "stage", "stage": "segment", "status": "cancelled", "wall_seconds": 2.0},
+        {"type": "command", "stage": "segment", "returncode": 1, "wall_seconds": 0.5},
+        {"type": "command", "stage": None, "returncode": 0, "wall_seconds": 0.25},
+    ]
+    summary = vidTrace.summarize(records)
+    assert list(summary) == ["- (ffmpeg)", "segment", "segment (ffmpeg)"]
+    segment = summary["segment"]
+    assert segment["count"] == 3
+    assert segment["failed"] == 1
+    assert segment["p50_seconds"] == 2.0
+    assert segment["p95_seconds"] == 3.0
+    assert segment["total_seconds"] == 6.0
+    assert summary["segment (ffmpeg)"]["failed"] == 1
+    assert summary["- (ffmpeg)"]["failed"] == 0
+
+
+def test_spans_nest_and_record_errors():
+    records = []
+    vidTrace.add_sink(records.append)
+    try:
+        with vidTrace.span("export"):
+            try:
+                with vidTrace.span("segment", output="1.mp4"):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+    finally:
+        vidTrace.remove_sink(records.append)
+    segment, export = records
+    assert segment["parent"] == export["id"]
+    assert segment["status"] == "error"
+    assert segment["output"] == "1.mp4"
+    assert export["status"] == "ok"
+
+
+def test_commands_report_usage_only_while_tracing():
+    cmd = [sys.executable, "-c", "import sys; sys.exit(3)"]
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        vidProcess.run_ffmpeg(cmd)
+    assert error.value.returncode == 3
+
+    records = []
+    vidTrace.add_sink(records.append)
+    try:
+        vidProcess.run_ffmpeg([sys.executable, "-c", "pass"])
+    finally:
+        vidTrace.remove_sink(records.append)
+    command, = records
+    assert command["returncode"] == 0
+    if hasattr(os, "wait4"):
+        assert command["cpu_user_seconds"] is not None
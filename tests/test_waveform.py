@@ -0,0 +1,54 @@
+import array
+import sys
+import vidWaveform
+
+
+def pcm(samples):
+    values = array.array("h", samples)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def test_peak_reducer_buckets_across_chunk_boundaries():
+    samples = list(range(vidWaveform.BUCKET_SAMPLES)) + [-5] * 10
+    data = pcm(samples)
+    reducer = vidWaveform.PeakReducer()
+    # Split in the middle of a sample
+    reducer.chunk(data[:101])
+    reducer.chunk(data[101:])
+    peaks = reducer.finish()
+    assert list(peaks) == [0, vidWaveform.BUCKET_SAMPLES - 1, -5, -5]
+
+
+def test_coarser_merges_neighbouring_buckets():
+    assert list(vidWaveform.coarser(array.array("h", [-1, 2, -3, 1, 0, 5]))) == [-3, 2, 0, 5]
+
+
+def test_peaks_per_column():
+    bucket = vidWaveform.BUCKET_SAMPLES / vidWaveform.SAMPLE_RATE
+    values = array.array("h", [-16384, 16384, -8192, 8192, 0, 0, -32768, 32767])
+    waveform = vidWaveform.Waveform([values])
+    assert waveform.peaks(0, 4 * bucket, 2) == [(-0.5, 0.5), (-1.0, 32767 / 32768)]
+    assert waveform.peaks(0, 8 * bucket, 4)[2:] == [(0.0, 0.0), (0.0, 0.0)]
+    assert waveform.peaks(1, 1, 10) == []
+
+
+def test_peaks_read_from_a_coarser_level_when_zoomed_out():
+    fine = array.array("h", [-1, 1] * 1024)
+    coarse = vidWaveform.coarser(fine)
+    coarse[0] = -100
+    waveform = vidWaveform.Waveform([fine, coarse])
+    duration = 1024 * waveform.bucket_seconds(0)
+    assert waveform.peaks(0, duration, 512)[0][0] == -100 / vidWaveform.FULL_SCALE
+    assert waveform.peaks(0, duration, 1024)[0][0] == -1 / vidWaveform.FULL_SCALE
+
+
+def test_saved_waveform_reads_back(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"video")
+    fine = array.array("h", [-1, 1, -2, 2, -3, 3, -4, 4])
+    waveform = vidWaveform.Waveform([fine, vidWaveform.coarser(fine)])
+    vidWaveform.save(waveform, str(video))
+    cached = vidWaveform.read_cached(str(video))
+    assert [list(level) for level in cached.levels] == [list(level) for level in waveform.levels]
@@ -1,17 +1,35 @@
 import sys
-import cv2
+import logging
 import ffmpeg
 import os
-import tempfile
 import subprocess
-from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QLabel, QFileDialog, QVBoxLayout, QSlider, QHBoxLayout, QProgressBar, QMessageBox, QStackedLayout, QSizePolicy, QSpacerItem, QDialog, QLineEdit
-from PyQt6.QtGui import QPixmap, QIcon, QPainter, QColor
-from PyQt6.QtCore import Qt, QTimer, QUrl, QPropertyAnimation, QThread, pyqtSignal
+import vidCache
+import vidEngine
+import vidFrames
+import vidKeyframes
+import vidProcess
+import vidProbe
+import vidProfiles
+import vidProject
+import vidProxy
+import vidQueue
+import vidScenes
+import vidSilence
+import vidOverlay
+import vidThumbs
+import vidTimeline
+import vidWaveform
+from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QLabel, QFileDialog, QVBoxLayout, QSlider, QHBoxLayout, QProgressBar, QMessageBox, QStackedLayout, QSizePolicy, QSpacerItem, QDialog, QLineEdit, QListWidget, QListWidgetItem
+from PyQt6.QtGui import QPixmap, QIcon, QImage
+from PyQt6.QtCore import Qt, QTimer, QUrl, QPropertyAnimation, QThread, QObject, pyqtSignal
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 
+logger = logging.getLogger(__name__)
+
+
 class VideoEditorApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -23,28 +41,51 @@ class VideoEditorApp(QWidget):
         
         self.video_path = None
         self.original_video_path = None
-        self.cap = None
+        self.preview_path = None
+        self.proxy_cache = vidCache.ProxyCache()
+        self.proxy_cache.evict()  # Drop proxies left half-built by crashed sessions
+        self.proxy_key = None
+        self.held_proxy_key = None  # Cache entry of the proxy being played, held against eviction
+        self.proxy_available = None  # Seconds of proxy playable so far while it's being generated
+        self.proxy_generator = None
         self.frame_count = 0
         self.fps = 30
-        self.split_points = []
-        self.deactivated_segments = []
-        self.undo_stack = []
-        self.redo_stack = []
+        self.duration = 0
+        self.video_width = 0
+        self.video_height = 0
+        self.keyframes = []
+        self.keyframe_loader = None
+        self.scene_analyzer = None
+        self.silence_detector = None
+        self.silences = None  # Pauses of the current video, once detected
+        self.waveform_loader = None
+        self.thumbnail_store = None
+        self.thumb_bridge = self.ThumbBridge()
+        self.frame_buffer = None
+        self.frame_bridge = self.FrameBridge()
+        self.frame_bridge.ready.connect(self.on_frame_decoded)
+        self.scrub_frame = None  # Latest frame the slider was dragged to, until it is shown
+        self.scrub_timer = QTimer(self)
+        self.scrub_timer.setSingleShot(True)
+        self.scrub_timer.setInterval(self.SCRUB_INTERVAL_MS)
+        self.scrub_timer.timeout.connect(self.showScrubFrame)
+        self.preview_frame = None  # Frame shown from the frame buffer while paused, or None while the player drives
+        self.export_mode = "encode"
+        self.export_profile = vidProfiles.DEFAULT_PROFILE
+        self.export_merge = False  # Whether the last export, or the opened project, merges the segments
+        self.timeline = vidTimeline.Timeline(0)
         self.paused = False
         
         self.full_ui_setup = False
-        self.loading_label = QLabel("Loading", self)
-        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.loading_label.hide()
-        self.loading_timer = QTimer(self)
-        self.loading_timer.timeout.connect(self.update_loading_text)
-        self.loading_state = 0
-        
-        # Download animation setup
-        self.download_timer = QTimer(self)
-        self.download_timer.timeout.connect(self.update_download_text)
-        self.download_state = 0
-        self.active_download_button = None  # Track which button is animating
+        
+        # Exports run in the background queue so the next video can be edited right away
+        self.reported_failures = set()  # Ids of failed exports already shown in an error box
+        self.queue_monitor = self.QueueMonitor()
+        self.queue_monitor.changed.connect(self.on_queue_changed)
+        self.export_queue = vidQueue.ExportQueue(on_change=self.queue_monitor.changed.emit)
+        # Another open editor runs the queue already; this one only shows it
+        if self.export_queue.owned:
+            self.export_queue.start()
         
         self.initUI()
 
@@ -58,13 +99,9 @@ class VideoEditorApp(QWidget):
         self.openButton.setFixedSize(100, 100)
         self.openButton.clicked.connect(self.openFile)
         
-        # Ensure loading label matches button size for consistent centering
-        self.loading_label.setFixedSize(100, 100)
-        
         layout = QVBoxLayout()
         layout.addStretch()
         layout.addWidget(self.openButton, alignment=Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.loading_label, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addStretch()
         self.setLayout(layout)
 
@@ -80,16 +117,21 @@ class VideoEditorApp(QWidget):
                     item.widget().deleteLater()
             QWidget().setLayout(self.layout())
         
-        # Video container with flexible layout
+        # Video container; the crop frame clips the full-size video to the 9:16 export window
         self.videoContainer = QWidget(self)
-        videoLayout = QVBoxLayout(self.videoContainer)
-        videoLayout.setContentsMargins(0, 0, 0, 0)
-        self.videoWidget = QVideoWidget(self.videoContainer)
+        self.videoContainer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.cropFrame = QWidget(self.videoContainer)
+        self.videoWidget = QVideoWidget(self.cropFrame)
         self.videoWidget.setStyleSheet("background: transparent;")
-        videoLayout.addWidget(self.videoWidget)
+        # Exact frames from the frame buffer are drawn over the video while stepping and scrubbing
+        self.framePreview = QLabel(self.cropFrame)
+        self.framePreview.setScaledContents(True)
+        self.framePreview.hide()
+        self.videoContainer.resizeEvent = lambda event: self.updateCropPreview()
         
         self.mediaPlayer.setVideoOutput(self.videoWidget)
         self.videoWidget.show()
+        self.cropFrame.show()
         self.videoContainer.show()
         
         self.videoContainer.setMouseTracking(True)
@@ -101,12 +143,39 @@ class VideoEditorApp(QWidget):
         self.deactivateButton = QPushButton("Deactivate Segment", self)
         self.deactivateButton.clicked.connect(self.deactivateSegment)
         
+        # Splits suggested at scene changes are only applied once accepted
+        self.nextSuggestionButton = QPushButton("Next Suggestion", self)
+        self.nextSuggestionButton.clicked.connect(self.nextSuggestion)
+        self.acceptSuggestionButton = QPushButton("Accept Split", self)
+        self.acceptSuggestionButton.clicked.connect(self.acceptSuggestion)
+        self.rejectSuggestionButton = QPushButton("Reject Split", self)
+        self.rejectSuggestionButton.clicked.connect(self.rejectSuggestion)
+        self.splitPausesButton = QPushButton("Split at Pauses", self)
+        self.splitPausesButton.clicked.connect(lambda: self.editPauses(remove=False))
+        self.cutPausesButton = QPushButton("Cut Pauses", self)
+        self.cutPausesButton.clicked.connect(lambda: self.editPauses(remove=True))
+        suggestionLayout = QHBoxLayout()
+        suggestionLayout.addWidget(self.nextSuggestionButton)
+        suggestionLayout.addWidget(self.acceptSuggestionButton)
+        suggestionLayout.addWidget(self.rejectSuggestionButton)
+        suggestionLayout.addWidget(self.splitPausesButton)
+        suggestionLayout.addWidget(self.cutPausesButton)
+        
         self.splitButton = QPushButton("Download", self)
         self.splitButton.clicked.connect(lambda: self.splitVideo(merge=False))
         
         self.mergeButton = QPushButton("Merge & Download", self)
         self.mergeButton.clicked.connect(lambda: self.splitVideo(merge=True))
         
+        self.exportModeButton = QPushButton(self.EXPORT_MODE_LABELS[self.export_mode], self)
+        self.exportModeButton.clicked.connect(self.cycleExportMode)
+        
+        self.profileButton = QPushButton(self.PROFILE_LABELS[self.export_profile], self)
+        self.profileButton.clicked.connect(self.cycleExportProfile)
+        
+        self.saveProjectButton = QPushButton("Save Project", self)
+        self.saveProjectButton.clicked.connect(self.saveProject)
+        
         self.backPoint1Button = QPushButton("<< .1s", self)
         self.backPoint1Button.clicked.connect(lambda: self.seek(-0.1))
         
@@ -139,17 +208,43 @@ class VideoEditorApp(QWidget):
         
         self.clipStartLabel = QLabel("0.0 - 0.0")
         self.clipEndLabel = QLabel("| D: 0.0s")
+        self.snapLabel = QLabel("")
+        self.proxyLabel = QLabel("")
+        self.proxyLabel.setVisible(False)
         clipInfoLayout = QHBoxLayout()
         clipInfoLayout.addWidget(self.clipStartLabel)
         clipInfoLayout.addWidget(self.clipEndLabel)
+        clipInfoLayout.addWidget(self.snapLabel)
         clipInfoLayout.addStretch()
+        clipInfoLayout.addWidget(self.proxyLabel)
         
         self.progressBar = QProgressBar(self)
         self.progressBar.setStyleSheet("QProgressBar { height: 8px; } QProgressBar::chunk { background-color: blue; }")
         self.progressBar.setMinimum(0)
-        # Remove setMaximum(100) - set dynamically in splitVideo
+        # Filled from the encoded fraction of the export, in steps of 0.1%
+        self.progressBar.setMaximum(1000)
         self.progressBar.setValue(0)
         self.progressBar.setVisible(False)
+        self.statsLabel = QLabel("")
+        self.statsLabel.setVisible(False)
+        
+        self.queueList = QListWidget(self)
+        self.queueList.setMaximumHeight(90)
+        self.queueCancelButton = QPushButton("Cancel Export", self)
+        self.queueCancelButton.clicked.connect(self.cancelQueuedExport)
+        self.queueNextButton = QPushButton("Run Next", self)
+        self.queueNextButton.clicked.connect(self.prioritizeQueuedExport)
+        self.queueClearButton = QPushButton("Clear Finished", self)
+        self.queueClearButton.clicked.connect(self.clearFinishedExports)
+        queueButtonsLayout = QHBoxLayout()
+        queueButtonsLayout.addWidget(self.queueCancelButton)
+        queueButtonsLayout.addWidget(self.queueNextButton)
+        queueButtonsLayout.addWidget(self.queueClearButton)
+        self.queuePanel = QWidget(self)
+        queuePanelLayout = QVBoxLayout(self.queuePanel)
+        queuePanelLayout.setContentsMargins(0, 0, 0, 0)
+        queuePanelLayout.addWidget(self.queueList)
+        queuePanelLayout.addLayout(queueButtonsLayout)
         
         timeContainer = QWidget(self)
         timeContainerLayout = QStackedLayout(timeContainer)
@@ -164,6 +259,7 @@ class VideoEditorApp(QWidget):
         self.slider.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         self.slider.setMinimumHeight(25)
         self.slider.sliderReleased.connect(self.sliderReleased)
+        self.slider.sliderMoved.connect(self.scrubTo)
         
         self.thumb_width = 5
         
@@ -176,6 +272,8 @@ class VideoEditorApp(QWidget):
         self.splitSlider.setStyleSheet("background: transparent;")
         self.splitSlider.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         self.splitSlider.setFixedHeight(20)
+        self.splitOverlay = vidOverlay.SplitOverlay(self.splitSlider)
+        self.splitSlider.resizeEvent = lambda event: self.splitOverlay.resized()
         
         splitLayout.addSpacerItem(QSpacerItem(self.thumb_width - 1, 0, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum))
         splitLayout.addWidget(self.splitSlider)
@@ -183,18 +281,38 @@ class VideoEditorApp(QWidget):
         timeContainerLayout.addWidget(self.slider)
         timeContainerLayout.addWidget(splitContainer)
         
+        # Filmstrip of thumbnails under the slider, lined up with its groove like the split overlay
+        filmstripContainer = QWidget(self)
+        filmstripLayout = QHBoxLayout(filmstripContainer)
+        filmstripLayout.setContentsMargins(0, 0, 0, 0)
+        filmstripLayout.setSpacing(0)
+        self.filmstripLabel = QLabel(filmstripContainer)
+        self.filmstripLabel.setFixedHeight(vidThumbs.THUMB_HEIGHT)
+        self.filmstrip = vidOverlay.Filmstrip(self.filmstripLabel)
+        self.filmstripLabel.resizeEvent = lambda event: self.filmstrip.resized()
+        self.thumb_bridge.loaded.connect(self.filmstrip.sheetLoaded)
+        filmstripLayout.addSpacerItem(QSpacerItem(self.thumb_width - 1, 0, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum))
+        filmstripLayout.addWidget(self.filmstripLabel)
+        filmstripLayout.addStretch()
+        
         def resizeOverlay(event):
             groove_width = self.slider.width() - 2 * self.thumb_width - 3
             self.splitSlider.setFixedWidth(groove_width)
+            self.filmstripLabel.setFixedWidth(groove_width)
         
         self.slider.resizeEvent = resizeOverlay
         
         self.currentTimeLabel = QLabel("0:00:00.0")
         self.totalTimeLabel = QLabel("0:00:00.0")
         
+        timelineLayout = QVBoxLayout()
+        timelineLayout.setSpacing(2)
+        timelineLayout.addWidget(timeContainer)
+        timelineLayout.addWidget(filmstripContainer)
+        
         timeLayout = QHBoxLayout()
         timeLayout.addWidget(self.currentTimeLabel)
-        timeLayout.addWidget(timeContainer, stretch=1)
+        timeLayout.addLayout(timelineLayout, stretch=1)
         timeLayout.addWidget(self.totalTimeLabel)
         
         controlsLayout = QHBoxLayout()
@@ -216,48 +334,76 @@ class VideoEditorApp(QWidget):
         layout.addLayout(timeLayout)
         layout.addLayout(controlsLayout)
         layout.addWidget(self.addSplitButton)
+        layout.addLayout(suggestionLayout)
         layout.addWidget(self.deactivateButton)
         layout.addWidget(self.mergeButton)
         layout.addWidget(self.splitButton)
+        exportOptionsLayout = QHBoxLayout()
+        exportOptionsLayout.addWidget(self.exportModeButton)
+        exportOptionsLayout.addWidget(self.profileButton)
+        exportOptionsLayout.addWidget(self.saveProjectButton)
+        layout.addLayout(exportOptionsLayout)
         layout.addWidget(self.progressBar)
+        layout.addWidget(self.statsLabel)
+        layout.addWidget(self.queuePanel)
         self.setLayout(layout)
         
         self.updateGeometry()
         self.show()
         
-        self.mediaPlayer.positionChanged.connect(self.updateSliderPosition)
-        self.mediaPlayer.positionChanged.connect(self.updateClipInfo)
+        self.mediaPlayer.positionChanged.connect(self.playerPositionChanged)
         
         self.full_ui_setup = True
+        self.updateQueueView()
+
+    PROFILE_LABELS = {
+        "draft": "Quality: Draft (fastest)",
+        "balanced": "Quality: Balanced",
+        "archive": "Quality: Archive (slowest)",
+    }
+
+    # How far from the playhead a suggestion is still the one to accept or reject, in seconds
+    SUGGESTION_TOLERANCE = 0.5
+
+    # Dragging the slider shows at most one new frame per interval
+    SCRUB_INTERVAL_MS = 40
+
+    EXPORT_MODE_LABELS = {
+        "encode": "Export: Re-encode",
+        "copy": "Export: Fast (keyframe cuts, uncropped)",
+        "smart": "Export: Smart Cut (uncropped)",
+    }
 
     def undoAction(self):
-        if self.split_points:
-            last_action = self.split_points.pop()
-            self.redo_stack.append(last_action)
+        if self.timeline.undo():
             self.updateSplitOverlay()
+            self.updateClipInfo(self.playheadMs())
     
     def redoAction(self):
-        if self.redo_stack:
-            last_redo = self.redo_stack.pop()
-            self.split_points.append(last_redo)
+        if self.timeline.redo():
             self.updateSplitOverlay()
+            self.updateClipInfo(self.playheadMs())
     
     def deactivateSegment(self):
-        position = self.mediaPlayer.position() / 1000
-        nearest_splits = sorted(self.split_points + [0, self.frame_count / self.fps])
-        for i in range(len(nearest_splits) - 1):
-            if nearest_splits[i] <= position < nearest_splits[i + 1]:
-                segment = (nearest_splits[i], nearest_splits[i + 1])
-                if segment in self.deactivated_segments:
-                    self.deactivated_segments.remove(segment)
-                else:
-                    self.deactivated_segments.append(segment)
-                self.updateSplitOverlay()
-                break
+        position = self.playheadMs() / 1000
+        self.timeline.execute(vidTimeline.ToggleSegment(position))
+        self.updateSplitOverlay(*self.timeline.segment_at(position))
+    
+    def playheadMs(self):
+        # A frame shown from the frame buffer is ahead of the paused player
+        if self.preview_frame is not None:
+            return self.preview_frame / self.fps * 1000
+        return self.mediaPlayer.position()
+    
+    def playerPositionChanged(self, position):
+        if self.preview_frame is None:
+            self.updateSliderPosition(position)
+            self.updateClipInfo(position)
     
     def updateSliderPosition(self, position):
-        if self.frame_count > 0 and self.mediaPlayer.duration() > 0:
-            frame_number = int((position / self.mediaPlayer.duration()) * self.frame_count)
+        # Positions map to frames through the source fps: a growing proxy reports a partial duration
+        if self.frame_count > 0:
+            frame_number = int(position / 1000 * self.fps)
             self.slider.setValue(frame_number)
             self.currentTimeLabel.setText(self.formatTime(position / 1000))
     
@@ -294,249 +440,472 @@ class VideoEditorApp(QWidget):
     def updateDurationFromPlayer(self):
         duration = self.mediaPlayer.duration() / 1000  # Convert ms to seconds
         if duration > 0:
+            self.duration = duration
+            self.timeline.duration = duration
             self.frame_count = int(duration * self.fps)  # Estimate frames
             self.slider.setMaximum(self.frame_count)
             self.totalTimeLabel.setText(self.formatTime(duration))
         else:
-            print("Warning: Could not determine video duration from QMediaPlayer")
+            logger.warning("Could not determine video duration from QMediaPlayer")
+
+    class ThumbBridge(QObject):
+        # Carries loaded sprite sheet numbers from the thumbnail workers to the GUI thread
+        loaded = pyqtSignal(int)
 
-    class VideoProcessor(QThread):
-        finished = pyqtSignal(str)
+    class FrameBridge(QObject):
+        # Carries decoded frame numbers from the frame buffer's decoder thread to the GUI thread
+        ready = pyqtSignal(int)
+
+    class QueueMonitor(QObject):
+        # Carries queue updates from the export threads to the GUI thread
+        changed = pyqtSignal(object)
+
+    class ProxyGenerator(QThread):
+        ready = pyqtSignal(str)
+        progress = pyqtSignal(float)
+        stats = pyqtSignal(dict)
+        # Not "finished", which would shadow QThread.finished
+        completed = pyqtSignal(str)
         error = pyqtSignal(str)
         
-        def __init__(self, file_path):
+        def __init__(self, source_path, output_dir):
             super().__init__()
-            self.file_path = file_path
+            self.source_path = source_path
+            self.output_dir = output_dir
+            self.group = vidProcess.ProcessGroup()
         
         def run(self):
-            temp_output = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4").name
             try:
-                # Build FFmpeg command manually
-                ffmpeg_cmd = [
-                    "ffmpeg",
-                    "-i", self.file_path,
-                    "-vf", "scale=-2:1920,crop=1080:1920",
-                    "-vcodec", "libx264",
-                    "-acodec", "aac",
-                    "-pix_fmt", "yuv420p",
-                    "-preset", "veryfast",
-                    "-f", "mp4",
-                    "-y",  # Overwrite output
-                    temp_output
-                ]
-                # Hide FFmpeg console on Windows
-                creation_flags = 0x08000000 if os.name == "nt" else 0  # CREATE_NO_WINDOW
-                subprocess.run(
-                    ffmpeg_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    check=True,
-                    creationflags=creation_flags
+                playlist_path = vidProxy.generate_proxy(
+                    self.source_path, self.output_dir,
+                    on_ready=self.ready.emit, on_progress=self.progress.emit, group=self.group,
+                    on_stats=self.stats.emit
                 )
-                print(f"VideoProcessor: Processed {temp_output}")
-                self.finished.emit(temp_output)
+                self.completed.emit(playlist_path)
+            except vidProcess.ExportCancelled:
+                pass
             except subprocess.CalledProcessError as e:
                 error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
-                print(f"VideoProcessor Error: {error_msg}")
+                logger.error(f"ProxyGenerator Error: {error_msg}")
                 self.error.emit(error_msg)
-                if os.path.exists(temp_output):
-                    os.remove(temp_output)
+        
+        def stop(self):
+            self.group.kill()
 
-    class DownloadProcessor(QThread):
-        progress = pyqtSignal(int)
-        finished = pyqtSignal(int)
-        error = pyqtSignal(str)
+    class BackgroundTask(QThread):
+        # The result of work, or None when it failed
+        completed = pyqtSignal(str, object)
         
-        def __init__(self, video_path, original_path, split_points, deactivated_segments, merge):
+        def __init__(self, name, video_path, work):
             super().__init__()
+            self.name = name
             self.video_path = video_path
-            self.original_path = original_path
-            self.split_points = split_points
-            self.deactivated_segments = deactivated_segments
-            self.merge = merge
-            self.frame_count = None
-            self.fps = None
+            self.work = work
+            self.group = vidProcess.ProcessGroup()
         
         def run(self):
             try:
-                source_dir = os.path.dirname(self.original_path)
-                source_name, _ = os.path.splitext(os.path.basename(self.original_path))
-                output_folder = os.path.join(source_dir, source_name)
-                os.makedirs(output_folder, exist_ok=True)
-
-                split_times = sorted([0] + self.split_points + [self.frame_count / self.fps])
-                active_segments = []
-                for i in range(len(split_times) - 1):
-                    segment = (split_times[i], split_times[i + 1])
-                    if segment not in self.deactivated_segments:
-                        active_segments.append(segment)
-
-                if not active_segments:
-                    self.finished.emit(0)
-                    return
-
-                creation_flags = 0x08000000 if os.name == "nt" else 0  # CREATE_NO_WINDOW
-
-                if self.merge:
-                    merged_file_path = os.path.join(output_folder, f"{source_name}_merged.mp4")
-                    temp_list = tempfile.NamedTemporaryFile(delete=False, suffix=".txt")
-                    file_list_path = temp_list.name
-
-                    split_files = []
-                    for i, (start, end) in enumerate(active_segments):
-                        end -= 0.1
-                        segment_path = os.path.join(output_folder, f"{i+1}.mp4")
-                        split_files.append(segment_path)
-
-                        duration = end - start
-                        print(f"Cutting segment {i+1}: {start:.1f}s - {end:.1f}s, Duration: {duration:.1f}s")
-                        ffmpeg_cmd = [
-                            "ffmpeg",
-                            "-i", self.video_path,
-                            "-ss", str(start),
-                            "-t", str(duration),
-                            "-vcodec", "libx264",
-                            "-acodec", "aac",
-                            "-f", "mp4",
-                            "-y",
-                            segment_path
-                        ]
-                        subprocess.run(
-                            ffmpeg_cmd,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            check=True,
-                            creationflags=creation_flags
-                        )
-                        temp_list.write(f"file '{segment_path}'\n".encode())
-                        self.progress.emit(i + 1)
-
-                    temp_list.close()
-
-                    print(f"Merging {len(active_segments)} segments into {merged_file_path}")
-                    ffmpeg_cmd = [
-                        "ffmpeg",
-                        "-f", "concat",
-                        "-safe", "0",
-                        "-i", file_list_path,
-                        "-c", "copy",
-                        "-y",
-                        merged_file_path
-                    ]
-                    subprocess.run(
-                        ffmpeg_cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        check=True,
-                        creationflags=creation_flags
-                    )
-
-                    os.remove(file_list_path)
-                    for part in split_files:
-                        os.remove(part)
-                else:
-                    for i, (start, end) in enumerate(active_segments):
-                        end -= 0.1
-                        output_path = os.path.join(output_folder, f"{i+1}.mp4")
-                        duration = end - start
-                        print(f"Extracting segment {i+1}: {start:.1f}s - {end:.1f}s, Duration: {duration:.1f}s")
-                        ffmpeg_cmd = [
-                            "ffmpeg",
-                            "-i", self.video_path,
-                            "-ss", str(start),
-                            "-t", str(duration),
-                            "-vcodec", "libx264",
-                            "-acodec", "aac",
-                            "-f", "mp4",
-                            "-y",
-                            output_path
-                        ]
-                        subprocess.run(
-                            ffmpeg_cmd,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            check=True,
-                            creationflags=creation_flags
-                        )
-                        self.progress.emit(i + 1)
-
-                self.finished.emit(len(active_segments))
+                result = self.work(self.group)
+            except vidProcess.ExportCancelled:
+                # Only stopTask cancels, and it has disconnected already
+                return
             except subprocess.CalledProcessError as e:
                 error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
-                print(f"DownloadProcessor Error: {error_msg}")
-                self.error.emit(error_msg)
-
-    def update_loading_text(self):
-        base_text = "Loading"
-        dots = "." * (self.loading_state % 4)
-        self.loading_label.setText(base_text + dots)
-        self.loading_state += 1
-
-    def update_download_text(self):
-        base_text = "Downloading"
-        dots = "." * (self.download_state % 4)  # 0, 1, 2, 3 dots
-        if self.active_download_button:
-            self.active_download_button.setText(base_text + dots)
-        self.download_state += 1
+                logger.error(f"{self.name} Error: {error_msg}")
+                result = None
+            except OSError as e:
+                logger.error(f"{self.name} Error: {e}")
+                result = None
+            self.completed.emit(self.video_path, result)
+        
+        def stop(self):
+            self.group.kill()
 
     def openFile(self):
         options = QFileDialog.Option.ReadOnly
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open Video File", "", "Video Files (*.mp4 *.avi *.mov)", options=options)
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Open Video File", "", f"Video Files (*.mp4 *.avi *.mov);;Projects (*{vidProject.PROJECT_SUFFIX})",
+            options=options
+        )
         
-        if file_path:
-            # Clean up previous temp file if it exists
-            if self.video_path and os.path.exists(self.video_path):
-                os.remove(self.video_path)
-            
-            # Hide button, show loading
-            self.openButton.hide()
-            self.loading_label.show()
-            self.loading_timer.start(1000)  # 1-second interval
-            
-            # Start processing in thread
-            self.processor = self.VideoProcessor(file_path)
-            self.processor.finished.connect(self.on_processing_finished)
-            self.processor.error.connect(self.on_processing_error)
-            self.processor.start()
-            self.original_video_path = file_path  # Store original path
-
-    def on_processing_finished(self, temp_output):
-        self.loading_timer.stop()
-        self.loading_label.hide()
-        
-        self.video_path = temp_output
-        self.cap = cv2.VideoCapture(self.video_path)
-        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
-        print(f"Processed 9:16 video: {temp_output}, Size: {os.path.getsize(temp_output)} bytes")
-        print(f"Frame count: {self.frame_count}, FPS: {self.fps}")
+        if file_path.endswith(vidProject.PROJECT_SUFFIX):
+            self.openProject(file_path)
+        elif file_path:
+            self.loadVideo(file_path)
+
+    def openProject(self, project_path):
+        try:
+            project = vidProject.load_project(project_path)
+            source_path = vidProject.resolve_source(project, project_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Project Error: {e}")
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        if not self.loadVideo(source_path):
+            return
+        self.timeline = vidTimeline.Timeline.restore(self.duration, project["split_points"], project["deactivated_segments"])
+        settings = project["export"]
+        self.export_mode = settings["mode"]
+        self.export_profile = settings["profile"]
+        self.export_merge = settings["merge"]
+        self.exportModeButton.setText(self.EXPORT_MODE_LABELS[self.export_mode])
+        self.profileButton.setText(self.PROFILE_LABELS[self.export_profile])
+        self.profileButton.setEnabled(self.export_mode != "copy")
+        self.updateSplitOverlay()
+        self.updateClipInfo(self.playheadMs())
+
+    def saveProject(self):
+        if not self.video_path:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Project", vidProject.project_path(self.original_video_path),
+            f"Projects (*{vidProject.PROJECT_SUFFIX})"
+        )
+        if not path:
+            return
+        if not path.endswith(vidProject.PROJECT_SUFFIX):
+            path += vidProject.PROJECT_SUFFIX
+        # The editor crops exactly the re-encoded exports
+        try:
+            project = vidProject.make_project(
+                self.original_video_path, vidProbe.probe(self.original_video_path), self.timeline.split_points,
+                self.timeline.deactivated_segments(), self.export_mode, self.export_profile,
+                crop=self.export_mode == "encode", merge=self.export_merge
+            )
+            vidProject.save_project(path, project)
+        except OSError as e:
+            logger.error(f"Project Error: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to save the project: {e}")
+            return
+        logger.info(f"Project saved: {path}")
+
+    def loadVideo(self, file_path):
+        try:
+            info = vidProbe.probe(file_path)
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr.decode() if e.stderr else "Unknown FFprobe error"
+            logger.error(f"Probe Error: {error_msg}")
+            QMessageBox.critical(self, "Error", "Failed to read the video.")
+            return False
+        width, height = vidProbe.display_size(info)
+        if not width or not height:
+            # Audio-only and unreadable files have no frame to show, scale or crop
+            logger.error(f"Probe Error: {file_path} has no video stream")
+            QMessageBox.critical(self, "Error", "The file has no video stream.")
+            return False
+        # The original is played as-is; the 9:16 crop is previewed live and applied on export
+        self.video_path = file_path
+        self.original_video_path = file_path
+        self.frame_count = info["frame_count"]
+        self.fps = info["fps"] or 30
+        self.duration = info["duration"] or self.frame_count / self.fps
+        self.video_width, self.video_height = width, height
+        logger.info(f"Opened video: {file_path}, Size: {os.path.getsize(file_path)} bytes")
+        logger.info(f"Frame count: {self.frame_count}, FPS: {info['fps_num']}/{info['fps_den']}, Duration: {self.duration:.3f}s, Frame: {self.video_width}x{self.video_height}")
         
         self.setupFullUI()
-        self.mediaPlayer.setSource(QUrl.fromLocalFile(self.video_path))
+        self.updateCropPreview()
+        self.hideFramePreview()
+        if self.frame_buffer:
+            self.frame_buffer.close()
+        # Frames for stepping and scrubbing are decoded from the original, so they are exact even on a proxy
+        self.frame_buffer = vidFrames.FrameBuffer(
+            self.video_path, self.fps, self.video_width, self.video_height,
+            self.frame_count if self.frame_count > 0 else round(self.duration * self.fps),
+            on_frame=self.frame_bridge.ready.emit
+        )
+        self.stopProxy()
+        self.scene_analyzer = self.stopTask(self.scene_analyzer)
+        if vidProxy.needs_proxy(self.video_width, self.video_height):
+            self.openProxy()
+        else:
+            self.setPreviewSource(self.video_path)
+            self.analyzeScenes(self.video_path)
+        
         if self.frame_count <= 0:
             QTimer.singleShot(100, self.updateDurationFromPlayer)
         else:
             self.slider.setMaximum(self.frame_count)
-            total_time = self.frame_count / self.fps
-            self.totalTimeLabel.setText(self.formatTime(total_time))
-        self.mediaPlayer.play()
+            self.totalTimeLabel.setText(self.formatTime(self.duration))
         
-        self.split_points = []
-        self.deactivated_segments = []
-        self.undo_stack = []
-        self.redo_stack = []
+        self.timeline = vidTimeline.Timeline(self.duration)
+        self.keyframes = []
         self.updateSplitOverlay()
         self.updateClipInfo(0)
         
+        # Keyframes are only needed for fast export, read them in the background
+        video_path = self.video_path
+        self.keyframe_loader = self.stopTask(self.keyframe_loader)
+        self.keyframe_loader = self.startTask(
+            "Keyframes", lambda group: vidKeyframes.read_keyframes(video_path, group), self.on_keyframes_loaded
+        )
+        
+        self.silence_detector = self.stopTask(self.silence_detector)
+        self.splitPausesButton.setEnabled(True)
+        self.cutPausesButton.setEnabled(True)
+        self.silences = None
+        
+        if self.thumbnail_store:
+            self.thumbnail_store.close()
+        self.thumbnail_store = vidThumbs.ThumbnailStore(
+            self.video_path, self.duration, decode=self.decodeSheet, on_sheet=self.thumb_bridge.loaded.emit
+        )
+        self.filmstrip.setStore(self.thumbnail_store, self.video_width / self.video_height if self.video_height else 16 / 9)
+        
+        # The waveform is decoded once per file and drawn under the split markers
+        self.waveform_loader = self.stopTask(self.waveform_loader)
+        self.splitOverlay.setWaveform(None)
+        self.waveform_loader = self.startTask(
+            "Waveform", lambda group: vidWaveform.load(video_path, group), self.on_waveform_loaded
+        )
+        
         # Make window fullscreen
         self.showMaximized()
+        return True
+
+    def openProxy(self):
+        # Edit on a low-resolution proxy: reused from the cache, or playable as soon as its first part is encoded
+        key = self.proxy_cache.key(self.video_path, vidProxy.PROXY_PARAMS)
+        cached = self.proxy_cache.lookup(key)
+        if cached:
+            logger.info(f"Proxy cache hit: {cached}")
+            self.held_proxy_key = key
+            self.setPreviewSource(os.path.join(cached, vidProxy.PLAYLIST_NAME))
+            self.analyzeScenes(os.path.join(cached, vidProxy.PLAYLIST_NAME))
+            return
+        proxy_dir = self.proxy_cache.reserve(key)
+        if proxy_dir is None:
+            # Another window is generating this proxy right now
+            self.setPreviewSource(self.video_path)
+            self.analyzeScenes(self.video_path)
+            return
+        # Scenes are scored once the proxy is done, instead of decoding the original alongside its encode
+        self.proxy_key = key
+        self.proxy_available = 0
+        self.proxy_generator = self.ProxyGenerator(self.video_path, proxy_dir)
+        self.proxy_generator.ready.connect(self.on_proxy_ready)
+        self.proxy_generator.progress.connect(self.on_proxy_progress)
+        self.proxy_generator.stats.connect(self.on_proxy_stats)
+        self.proxy_generator.completed.connect(self.on_proxy_finished)
+        self.proxy_generator.error.connect(self.on_proxy_error)
+        self.proxy_generator.start()
+
+    def setPreviewSource(self, path):
+        self.preview_path = path
+        self.hideFramePreview()
+        self.mediaPlayer.setSource(QUrl.fromLocalFile(path))
+        self.mediaPlayer.play()
+
+    def on_proxy_ready(self, playlist_path):
+        logger.info(f"Proxy ready: {playlist_path}")
+        self.setPreviewSource(playlist_path)
+
+    def on_proxy_progress(self, seconds):
+        self.proxy_available = seconds
+
+    def on_proxy_stats(self, stats):
+        self.proxyLabel.setText(f"| Proxy: {vidProcess.format_stats(stats)}")
+        self.proxyLabel.setVisible(True)
+
+    def on_proxy_finished(self, playlist_path):
+        logger.info(f"Proxy finished: {playlist_path}")
+        self.proxyLabel.setVisible(False)
+        self.proxy_available = None
+        # The signal arrives just before run() returns; the thread must be done before it's dropped
+        self.proxy_generator.wait()
+        self.proxy_generator = None
+        self.proxy_cache.commit(self.proxy_key)
+        self.held_proxy_key = self.proxy_key
+        self.proxy_key = None
+        self.analyzeScenes(playlist_path)
 
-    def on_processing_error(self, error_message):
-        self.loading_timer.stop()
-        self.loading_label.hide()
-        self.openButton.show()
-        print(f"Video Loading Error: {error_message}")
-        QMessageBox.critical(self, "Error", "Failed to process video to 9:16.")
+    def on_proxy_error(self, error_message):
+        logger.error(f"Proxy Error: {error_message}")
+        self.proxyLabel.setVisible(False)
+        self.proxy_available = None
+        self.proxy_generator.wait()
+        self.proxy_generator = None
+        self.proxy_cache.abandon(self.proxy_key)
+        self.proxy_key = None
+        self.setPreviewSource(self.video_path)
+        self.analyzeScenes(self.video_path)
+
+    def stopProxy(self):
+        if self.proxy_generator:
+            for signal in (self.proxy_generator.ready, self.proxy_generator.progress, self.proxy_generator.stats,
+                           self.proxy_generator.completed, self.proxy_generator.error):
+                signal.disconnect()
+            self.proxy_generator.stop()
+            self.proxy_generator.wait()
+            self.proxy_generator = None
+            # An unfinished proxy can't be reused
+            self.mediaPlayer.setSource(QUrl())
+            self.proxy_cache.abandon(self.proxy_key)
+            self.proxy_key = None
+        self.proxyLabel.setVisible(False)
+        if self.held_proxy_key:
+            self.proxy_cache.release(self.held_proxy_key)
+            self.held_proxy_key = None
+        self.proxy_available = None
+
+    def startTask(self, name, work, on_completed):
+        # work is called on the task's thread with its ProcessGroup; on_completed gets (video path, result or None)
+        task = self.BackgroundTask(name, self.video_path, work)
+        task.completed.connect(on_completed)
+        task.start()
+        return task
+
+    def stopTask(self, task):
+        # Also called on a task that has completed: its thread may still be running when the result arrives.
+        # Returns None, to be assigned over the attribute that held the task
+        if task:
+            task.completed.disconnect()
+            task.stop()
+            task.wait()
+        return None
+
+    def on_waveform_loaded(self, video_path, waveform):
+        if video_path != self.video_path:
+            return
+        self.waveform_loader = self.stopTask(self.waveform_loader)
+        self.splitOverlay.setWaveform(waveform)
+
+    def decodeSheet(self, data):
+        # Runs on a thumbnail worker; QImage, unlike QPixmap, can be built off the GUI thread
+        image = QImage.fromData(data, "JPG")
+        return None if image.isNull() else (image, image.sizeInBytes())
+
+    def closeEvent(self, event):
+        if self.thumbnail_store:
+            self.thumbnail_store.close()
+        self.stopProxy()
+        self.keyframe_loader = self.stopTask(self.keyframe_loader)
+        self.scene_analyzer = self.stopTask(self.scene_analyzer)
+        self.silence_detector = self.stopTask(self.silence_detector)
+        self.waveform_loader = self.stopTask(self.waveform_loader)
+        if self.frame_buffer:
+            self.frame_buffer.close()
+        # Running exports keep their finished segments and resume on the next start
+        self.export_queue.close()
+        super().closeEvent(event)
+
+    def on_keyframes_loaded(self, video_path, keyframes):
+        # A result for a video that has since been replaced is dropped
+        if video_path != self.video_path:
+            return
+        self.keyframe_loader = self.stopTask(self.keyframe_loader)
+        if keyframes is None:
+            return
+        self.keyframes = keyframes
+        logger.info(f"Keyframes: {len(keyframes)}")
+        self.updateSplitOverlay()
+        self.updateClipInfo(self.playheadMs())
+
+    def analyzeScenes(self, analysis_path):
+        # Scene changes are scored once per file; reopening reads them from the cache.
+        # analysis_path is the proxy of a large video, which decodes far faster than the original.
+        video_path, duration = self.video_path, self.duration
+        self.scene_analyzer = self.stopTask(self.scene_analyzer)
+        self.scene_analyzer = self.startTask(
+            "Scene Analysis",
+            lambda group: vidScenes.suggest_splits(vidScenes.load_index(video_path, group, analysis_path), duration),
+            self.on_scenes_loaded
+        )
+
+    def on_scenes_loaded(self, video_path, suggestions):
+        if video_path != self.video_path:
+            return
+        self.scene_analyzer = self.stopTask(self.scene_analyzer)
+        if suggestions is None:
+            return
+        self.timeline.set_suggestions(suggestions)
+        logger.info(f"Scene change suggestions: {len(self.timeline.suggestions)}")
+        self.updateSplitOverlay()
+
+    def nextSuggestion(self):
+        suggestion = self.timeline.next_suggestion(self.playheadMs() / 1000 + 1 / self.fps)
+        if suggestion is not None:
+            self.moveTo(suggestion)
+
+    def acceptSuggestion(self):
+        position = self.timeline.nearest_suggestion(self.playheadMs() / 1000, self.SUGGESTION_TOLERANCE)
+        if position is not None and self.timeline.execute(vidTimeline.AcceptSuggestion(position)):
+            self.updateSplitOverlay(position, position)
+            self.updateClipInfo(self.playheadMs())
+
+    def rejectSuggestion(self):
+        position = self.timeline.nearest_suggestion(self.playheadMs() / 1000, self.SUGGESTION_TOLERANCE)
+        if position is not None and self.timeline.execute(vidTimeline.RejectSuggestion(position)):
+            self.updateSplitOverlay(position, position)
+
+    def editPauses(self, remove):
+        if not self.video_path or self.silence_detector:
+            return
+        if self.silences is not None:
+            self.applyPauses(remove)
+            return
+        if not vidProbe.probe(self.video_path)["has_audio"]:
+            QMessageBox.information(self, "Pauses", "This video has no audio track to find pauses in.")
+            return
+        # Detection streams the audio in the background; the edit is applied when it's done
+        self.splitPausesButton.setEnabled(False)
+        self.cutPausesButton.setEnabled(False)
+        video_path = self.video_path
+        self.silence_detector = self.startTask(
+            "Silence Detection", lambda group: vidSilence.detect_silences(video_path, group=group),
+            lambda video_path, silences: self.on_silences_detected(video_path, remove, silences)
+        )
+
+    def on_silences_detected(self, video_path, remove, silences):
+        if video_path != self.video_path:
+            return
+        self.silence_detector = self.stopTask(self.silence_detector)
+        self.splitPausesButton.setEnabled(True)
+        self.cutPausesButton.setEnabled(True)
+        if silences is None:
+            QMessageBox.critical(self, "Error", "Failed to analyze the audio of the video.")
+            return
+        self.silences = silences
+        logger.info(f"Pauses: {len(silences)}")
+        self.applyPauses(remove)
+
+    def applyPauses(self, remove):
+        if self.timeline.execute(vidSilence.silence_edit(self.timeline, self.silences, remove)):
+            self.updateSplitOverlay()
+            self.updateClipInfo(self.playheadMs())
+
+    def cycleExportMode(self):
+        modes = vidEngine.EXPORT_MODES
+        self.export_mode = modes[(modes.index(self.export_mode) + 1) % len(modes)]
+        self.exportModeButton.setText(self.EXPORT_MODE_LABELS[self.export_mode])
+        # Fast exports only copy streams, nothing is encoded
+        self.profileButton.setEnabled(self.export_mode != "copy")
+        self.updateSplitOverlay()
+        self.updateClipInfo(self.playheadMs())
+
+    def cycleExportProfile(self):
+        profiles = list(vidProfiles.PROFILES)
+        self.export_profile = profiles[(profiles.index(self.export_profile) + 1) % len(profiles)]
+        self.profileButton.setText(self.PROFILE_LABELS[self.export_profile])
+
+    def updateCropPreview(self):
+        container_width = self.videoContainer.width()
+        container_height = self.videoContainer.height()
+        if not self.video_width or not self.video_height or container_height <= 0:
+            self.cropFrame.setGeometry(0, 0, container_width, container_height)
+            self.videoWidget.setGeometry(0, 0, container_width, container_height)
+            self.framePreview.setGeometry(self.videoWidget.geometry())
+            return
+        
+        # Same framing as the export: scale to full height, keep the centred 9:16 window
+        frame_aspect = self.video_width / self.video_height
+        crop_aspect = min(frame_aspect, vidEngine.VERTICAL_ASPECT)
+        height = min(container_height, int(container_width / crop_aspect))
+        crop_width = int(height * crop_aspect)
+        video_width = int(height * frame_aspect)
+        self.cropFrame.setGeometry((container_width - crop_width) // 2, (container_height - height) // 2, crop_width, height)
+        self.videoWidget.setGeometry((crop_width - video_width) // 2, 0, video_width, height)
+        self.framePreview.setGeometry(self.videoWidget.geometry())
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -544,44 +913,81 @@ class VideoEditorApp(QWidget):
             self.centerPlayPauseIcon()
 
     def sliderReleased(self):
-        if self.mediaPlayer:
-            position = (self.slider.value() / self.frame_count) * self.mediaPlayer.duration()
+        if self.frame_buffer and not self.mediaPlayer.isPlaying():
+            self.showFrame(self.slider.value())
+        elif self.mediaPlayer:
+            position = self.clampToAvailable(self.slider.value() / self.fps * 1000)
             self.mediaPlayer.setPosition(int(position))
             self.updateClipInfo(int(position))  # Update clip info after manual slide
 
+    def scrubTo(self, frame_number):
+        # Scrubbing while paused renders from the frame buffer instead of re-seeking the player.
+        # sliderMoved fires for every pixel of a drag, so only the latest position is shown once per interval.
+        if self.frame_buffer and not self.mediaPlayer.isPlaying():
+            self.scrub_frame = frame_number
+            if not self.scrub_timer.isActive():
+                self.scrub_timer.start()
+
+    def showScrubFrame(self):
+        frame_number, self.scrub_frame = self.scrub_frame, None
+        if frame_number is not None and self.frame_buffer and not self.mediaPlayer.isPlaying():
+            self.showFrame(frame_number)
+
+    def showFrame(self, frame_number):
+        frame_number = max(0, min(frame_number, self.frame_buffer.frame_count - 1))
+        self.preview_frame = frame_number
+        frame = self.frame_buffer.request(frame_number)
+        if frame is not None:
+            self.drawFrame(frame)
+        # Until it is decoded, the previous frame stays on screen but the position is already exact
+        self.slider.setValue(frame_number)
+        self.currentTimeLabel.setText(self.formatTime(frame_number / self.fps))
+        self.updateClipInfo(self.playheadMs())
+
+    def drawFrame(self, frame):
+        width, height = self.frame_buffer.frame_width, self.frame_buffer.frame_height
+        image = QImage(frame, width, height, width * vidFrames.BYTES_PER_PIXEL, QImage.Format.Format_RGB888)
+        self.framePreview.setPixmap(QPixmap.fromImage(image))
+        self.framePreview.show()
+        self.framePreview.raise_()
+
+    def on_frame_decoded(self, frame_number):
+        if frame_number == self.preview_frame:
+            frame = self.frame_buffer.get(frame_number)
+            if frame is not None:
+                self.drawFrame(frame)
+
+    def hideFramePreview(self):
+        self.preview_frame = None
+        self.scrub_frame = None
+        self.framePreview.hide()
+
+    def resumeFromFrame(self):
+        # The player only catches up with the frame buffer when playback starts again
+        if self.preview_frame is not None:
+            self.mediaPlayer.setPosition(int(self.clampToAvailable(self.playheadMs())))
+            self.hideFramePreview()
+
     def addSplitPoint(self):
-        position = self.mediaPlayer.position() / 1000  # Convert to seconds
-        self.split_points.append(position)
-        self.split_points.sort()  # Keep split points ordered
-        self.undo_stack.append(('split', position))
-        self.redo_stack.clear()  # Clear redo stack when new action is performed
-        self.updateSplitOverlay()
+        position = self.playheadMs() / 1000  # Convert to seconds
+        if self.export_mode == "copy" and self.keyframes:
+            # Keyframe cuts can only happen on keyframes, so place the split there
+            position = vidKeyframes.snap_to_keyframe(self.keyframes, position)
+        if self.timeline.execute(vidTimeline.AddSplit(position)):
+            index = self.timeline.segment_index(position)
+            if self.timeline.is_deactivated(index):
+                # Both halves of a deactivated segment get their own block
+                self.updateSplitOverlay(self.timeline.segment_bounds(index - 1)[0], self.timeline.segment_bounds(index)[1])
+            else:
+                self.updateSplitOverlay(position, position)
         self.updateClipInfo(int(position * 1000))
 
-    def updateSplitOverlay(self):
-        if not self.splitSlider.width():
-            return
-            
-        pixmap = QPixmap(self.splitSlider.width(), self.splitSlider.height())
-        pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pixmap)
-        
-        # Draw deactivated segments
-        painter.setBrush(QColor(200, 100, 100, 150))
-        for start, end in self.deactivated_segments:
-            x_start = int((start / (self.frame_count / self.fps)) * self.splitSlider.width())
-            x_end = int((end / (self.frame_count / self.fps)) * self.splitSlider.width())
-            painter.drawRect(x_start, 0, x_end - x_start, self.splitSlider.height())
-        
-        # Draw split points
-        painter.setPen(QColor(0, 0, 255))
-        painter.setBrush(QColor(0, 0, 255))
-        for split in self.split_points:
-            x_pos = int((split / (self.frame_count / self.fps)) * self.splitSlider.width())
-            painter.drawRect(x_pos-1, 0, 1, self.splitSlider.height())
-        
-        painter.end()
-        self.splitSlider.setPixmap(pixmap)
+    def updateSplitOverlay(self, start=None, end=None):
+        # Full redraw by default; a time range only repaints the columns it covers
+        if start is None:
+            self.splitOverlay.setSource(self.duration, self.timeline, self.keyframes, self.export_mode != "encode")
+        else:
+            self.splitOverlay.updateRange(start, end)
 
     def updateClipInfo(self, position):
         if not self.video_path or self.frame_count <= 0:
@@ -592,17 +998,9 @@ class VideoEditorApp(QWidget):
         # Convert position from milliseconds to seconds
         current_time = position / 1000
 
-        # Get all split points including video start and end
-        split_times = sorted([0] + self.split_points + [self.frame_count / self.fps])
-
         # Find the clip boundaries (nearest split points)
-        clip_start = 0
-        clip_end = self.frame_count / self.fps
-        for i in range(len(split_times) - 1):
-            if split_times[i] <= current_time < split_times[i + 1]:
-                clip_start = split_times[i]
-                clip_end = split_times[i + 1] - 0.1
-                break
+        clip_start, clip_end = self.timeline.segment_at(current_time)
+        clip_end -= 0.1
 
         # Calculate duration
         clip_duration = clip_end - clip_start
@@ -611,6 +1009,18 @@ class VideoEditorApp(QWidget):
         self.clipStartLabel.setText(f"{self.formatTimeCompact(clip_start)} - {self.formatTimeCompact(clip_end)}")
         self.clipEndLabel.setText(f"| D: {self.formatDuration(clip_duration)}")
 
+        # Show how far fast export moves the cuts of this clip
+        if self.export_mode == "copy" and self.keyframes:
+            snapped = vidKeyframes.snap_segments([(clip_start, clip_end + 0.1)], self.keyframes, self.duration)
+            if snapped:
+                start_shift = snapped[0][0] - clip_start
+                end_shift = snapped[0][1] - (clip_end + 0.1)
+                self.snapLabel.setText(f"| Snap: {start_shift:+.2f}s / {end_shift:+.2f}s")
+            else:
+                self.snapLabel.setText("| Snap: clip dropped (no keyframe inside)")
+        else:
+            self.snapLabel.setText("")
+
     class GotoDialog(QDialog):
         def __init__(self, parent=None):
             super().__init__(parent)
@@ -693,17 +1103,18 @@ class VideoEditorApp(QWidget):
     def showGotoDialog(self):
         dialog = self.GotoDialog(self)
         if dialog.exec():  # If "Go" is clicked (accept)
-            time_seconds = dialog.getTime()
+            self.moveTo(dialog.getTime())
+
+    def moveTo(self, time_seconds):
+        if self.frame_buffer and not self.mediaPlayer.isPlaying():
+            self.showFrame(int(round(time_seconds * self.fps)))
+        elif self.mediaPlayer and self.frame_count > 0:
             # Convert to milliseconds and seek
-            if self.mediaPlayer and self.frame_count > 0:
-                position_ms = int(time_seconds * 1000)
-                # Clamp to video duration
-                duration_ms = self.mediaPlayer.duration()
-                position_ms = max(0, min(position_ms, duration_ms))
-                self.mediaPlayer.setPosition(position_ms)
-                # Update slider manually
-                frame_number = int((position_ms / duration_ms) * self.frame_count)
-                self.slider.setValue(frame_number)
+            position_ms = int(self.clampToAvailable(time_seconds * 1000))
+            self.mediaPlayer.setPosition(position_ms)
+            # Update slider manually
+            frame_number = int(position_ms / 1000 * self.fps)
+            self.slider.setValue(frame_number)
 
     def togglePlayPauseOnClick(self, event):
         if self.mediaPlayer:
@@ -712,6 +1123,7 @@ class VideoEditorApp(QWidget):
                 self.pauseButton.setText("Play")
                 self.showPlayPauseIcon("play")
             else:
+                self.resumeFromFrame()
                 self.mediaPlayer.play()
                 self.pauseButton.setText("Pause")
                 self.showPlayPauseIcon("pause")
@@ -739,7 +1151,7 @@ class VideoEditorApp(QWidget):
         
         pixmap = QPixmap(icon_path)
         if pixmap.isNull():
-            print(f"Error: Could not load icon at {icon_path}")
+            logger.error(f"Could not load icon at {icon_path}")
             return
         
         pixmap = pixmap.scaled(64, 64, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
@@ -771,68 +1183,121 @@ class VideoEditorApp(QWidget):
             self.pauseButton.setText("Play")
             self.showPlayPauseIcon("play")
         else:
+            self.resumeFromFrame()
             self.mediaPlayer.play()
             self.pauseButton.setText("Pause")
             self.showPlayPauseIcon("pause")
 
     def seek(self, seconds):
-        if self.mediaPlayer:
+        if self.frame_buffer and not self.mediaPlayer.isPlaying():
+            # Paused stepping lands on exact frames from memory
+            current_frame = int(round(self.playheadMs() / 1000 * self.fps))
+            self.showFrame(current_frame + round(seconds * self.fps))
+        elif self.mediaPlayer:
             current_pos = self.mediaPlayer.position()
-            new_position = max(0, current_pos + (seconds * 1000))
+            new_position = self.clampToAvailable(current_pos + (seconds * 1000))
             self.mediaPlayer.setPosition(int(new_position))
 
+    def clampToAvailable(self, position_ms):
+        # While the proxy is still being generated only its encoded part can be played
+        if self.proxy_available is not None:
+            limit_ms = self.proxy_available * 1000
+        elif self.frame_count > 0:
+            limit_ms = self.duration * 1000
+        else:
+            limit_ms = self.mediaPlayer.duration()
+        return max(0, min(position_ms, limit_ms))
+
     def splitVideo(self, merge=False):
-        if not self.video_path or not self.split_points:
+        if not self.video_path or not self.timeline.split_points:
             return
-
-        # Determine which button was clicked
-        self.active_download_button = self.mergeButton if merge else self.splitButton
+        
+        mode = self.export_mode
+        if mode != "encode" and not self.keyframes:
+            QMessageBox.information(self, "Export", "Keyframes are still being read, try again in a moment.")
+            return
+        if mode != "encode":
+            # Only re-encoding applies the 9:16 crop; stream copies keep the landscape frame
+            answer = QMessageBox.question(
+                self, "Export",
+                f"{self.EXPORT_MODE_LABELS[mode]} keeps the full uncropped frame instead of cropping to 9:16.\n\n"
+                "Export uncropped clips?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                return
         
         # Calculate active segments
-        split_times = sorted([0] + self.split_points + [self.frame_count / self.fps])
-        active_segments = [seg for i, seg in enumerate(zip(split_times[:-1], split_times[1:])) if seg not in self.deactivated_segments]
+        active_segments = vidEngine.export_plan(
+            self.video_path, self.timeline.split_points, self.timeline.deactivated_segments(),
+            self.duration, mode, self.keyframes
+        )
         
         if not active_segments:
             return
+        if not self.export_queue.owned:
+            QMessageBox.warning(
+                self, "Export", "Another 12MVideoSplitter window is running the export queue. "
+                "Export from that window, or close it and reopen this one."
+            )
+            return
+        self.export_merge = merge
         
-        # Set progress bar maximum to number of segments
-        self.progressBar.setMaximum(len(active_segments))
-        self.active_download_button.setEnabled(False)
-        self.download_timer.start(1000)
-        self.progressBar.setVisible(True)
-
-        # Start processing in thread
-        self.download_processor = self.DownloadProcessor(
-            self.video_path, self.original_video_path, self.split_points.copy(),
-            self.deactivated_segments.copy(), merge
+        self.export_queue.submit(
+            self.video_path, self.original_video_path, self.timeline.split_points.copy(),
+            self.timeline.deactivated_segments(), self.duration, merge, mode,
+            vidEngine.VERTICAL_FILTER if mode == "encode" else None, self.export_profile
         )
-        self.download_processor.frame_count = self.frame_count
-        self.download_processor.fps = self.fps
-        self.download_processor.progress.connect(self.update_progress)
-        self.download_processor.finished.connect(self.on_download_finished)
-        self.download_processor.error.connect(self.on_download_error)
-        self.download_processor.start()
-
-    def update_progress(self, value):
-        self.progressBar.setValue(value)
-
-    def on_download_finished(self, num_files):
-        self.download_timer.stop()
-        self.active_download_button.setText("Merge & Download" if self.active_download_button == self.mergeButton else "Download")
-        self.active_download_button.setEnabled(True)
-        self.progressBar.setVisible(False)
-        if num_files > 0:
-            QMessageBox.information(self, "Success", f"Video processing completed! Processed {num_files} segment{'s' if num_files != 1 else ''}.")
 
-    def on_download_error(self, error_message):
-        self.download_timer.stop()
-        self.active_download_button.setText("Merge & Download" if self.active_download_button == self.mergeButton else "Download")
-        self.active_download_button.setEnabled(True)
-        self.progressBar.setVisible(False)
-        print(f"An error occurred: {error_message}")
-        QMessageBox.critical(self, "Error", "An error occurred while processing the video.")
+    def selectedExport(self):
+        item = self.queueList.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def cancelQueuedExport(self):
+        job_id = self.selectedExport()
+        if job_id is not None:
+            self.export_queue.cancel(job_id)
+
+    def prioritizeQueuedExport(self):
+        job_id = self.selectedExport()
+        if job_id is not None:
+            top = max((job.priority for job in self.export_queue.jobs), default=0)
+            self.export_queue.set_priority(job_id, top + 1)
+
+    def clearFinishedExports(self):
+        self.export_queue.clear_finished()
+        self.updateQueueView()
+
+    def on_queue_changed(self, job):
+        if job.status == "failed" and job.job_id not in self.reported_failures:
+            self.reported_failures.add(job.job_id)
+            logger.error(f"An error occurred: {job.error}")
+            QMessageBox.critical(self, "Error", f"An error occurred while processing {job.name}.")
+        if self.full_ui_setup:
+            self.updateQueueView()
+
+    def updateQueueView(self):
+        selected = self.selectedExport()
+        jobs = self.export_queue.jobs
+        self.queueList.clear()
+        for job in jobs:
+            item = QListWidgetItem(vidQueue.describe(job))
+            item.setData(Qt.ItemDataRole.UserRole, job.job_id)
+            self.queueList.addItem(item)
+            if job.job_id == selected:
+                self.queueList.setCurrentItem(item)
+        self.queuePanel.setVisible(bool(jobs))
+        
+        running = [job for job in jobs if job.status == "running"]
+        queued = sum(1 for job in jobs if job.status == "queued")
+        fractions = [job.stats["fraction"] if job.stats else 0 for job in running]
+        self.progressBar.setVisible(bool(running))
+        self.statsLabel.setVisible(bool(running or queued))
+        if running:
+            self.progressBar.setValue(int(sum(fractions) / len(fractions) * self.progressBar.maximum()))
+        self.statsLabel.setText(f"Exports: {len(running)} running, {queued} queued")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app = QApplication(sys.argv)
     window = VideoEditorApp()
     window.show()
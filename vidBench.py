@@ -0,0 +1,316 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import vidCache
+import vidEngine
+import vidKeyframes
+import vidProcess
+import vidProfiles
+import vidProbe
+import vidProxy
+
+REPORT_VERSION = 1
+
+DEFAULT_DURATIONS = (10, 30)
+DEFAULT_RESOLUTIONS = ("1280x720", "3840x2160")
+DEFAULT_RATES = (30,)
+
+SAMPLE_INTERVAL = 0.05
+
+
+def media_name(width, height, fps, duration):
+    return f"testsrc_{width}x{height}_{fps}fps_{duration}s.mp4"
+
+
+def generate_command(output_path, width, height, fps, duration):
+    # testsrc2 and sine are generated, not captured, so every run produces the same frames
+    return [
+        "ffmpeg",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        "-vcodec", "libx264",
+        "-preset", "veryfast",
+        "-g", str(fps * 2),
+        "-pix_fmt", "yuv420p",
+        "-acodec", "aac",
+        "-shortest",
+        "-fflags", "+bitexact",
+        "-y",
+        output_path
+    ]
+
+
+def generate_media(media_dir, width, height, fps, duration):
+    """Return the path of a synthetic test video, generating it on first use."""
+    path = os.path.join(media_dir, media_name(width, height, fps, duration))
+    if not os.path.exists(path):
+        partial_path = path + ".part.mp4"
+        vidProcess.run_ffmpeg(generate_command(partial_path, width, height, fps, duration))
+        os.replace(partial_path, path)
+    return path
+
+
+def process_rss(pid):
+    """Resident memory of a process in bytes, or None where /proc isn't available."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ResourceSampler:
+    """Samples the size of a folder and the memory of a ProcessGroup's FFmpeg processes, keeping the peaks."""
+
+    def __init__(self, folder, group):
+        self.folder = folder
+        self.group = group
+        self.peak_disk = 0
+        self.peak_rss = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.done.set()
+        self.thread.join()
+        self.sample()
+
+    def run(self):
+        while not self.done.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def sample(self):
+        self.peak_disk = max(self.peak_disk, vidCache.directory_size(self.folder))
+        sizes = [size for size in map(process_rss, self.group.pids()) if size is not None]
+        if sizes:
+            self.peak_rss = max(self.peak_rss or 0, sum(sizes))
+
+
+def reset_caches(cache_root):
+    """Point every cache at an empty folder so each measurement starts cold.
+
+    Callers restore vidCache.CACHE_ROOT when they are done.
+    """
+    shutil.rmtree(cache_root, ignore_errors=True)
+    os.makedirs(cache_root)
+    vidCache.CACHE_ROOT = cache_root
+    vidProbe._memory_cache.clear()
+
+
+def bench_open(video_path, work_dir):
+    """Time what opening a video in the editor waits for: probing, keyframes and the proxy."""
+    result = {}
+    started = time.perf_counter()
+    info = vidProbe.probe(video_path)
+    result["probe_seconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vidKeyframes.read_keyframes(video_path)
+    result["keyframes_seconds"] = time.perf_counter() - started
+
+    result["needs_proxy"] = vidProxy.needs_proxy(info["width"], info["height"])
+    result["proxy_ready_seconds"] = None
+    result["proxy_seconds"] = None
+    if result["needs_proxy"]:
+        proxy_dir = os.path.join(work_dir, "proxy")
+        ready = []
+        started = time.perf_counter()
+        vidProxy.generate_proxy(video_path, proxy_dir, on_ready=lambda path: ready.append(time.perf_counter()))
+        result["proxy_ready_seconds"] = ready[0] - started
+        result["proxy_seconds"] = time.perf_counter() - started
+        shutil.rmtree(proxy_dir, ignore_errors=True)
+
+    # The editor is usable once the probe is done and, for large sources, the proxy can play
+    result["editable_seconds"] = result["probe_seconds"] + (result["proxy_ready_seconds"] or 0)
+    return result
+
+
+def bench_export(video_path, work_dir, duration, segment_seconds, mode, merge, workers, profile):
+    split_points = [t for t in range(segment_seconds, int(duration), segment_seconds)]
+    original_path = os.path.join(work_dir, "export.mp4")
+    output_folder, _ = vidEngine.output_location(original_path)
+    group = vidProcess.ProcessGroup()
+    finished = []
+
+    started = time.perf_counter()
+    with ResourceSampler(work_dir, group) as sampler:
+        count = vidEngine.export_segments(
+            video_path, original_path, split_points, [], duration,
+            merge=merge, video_filter=vidEngine.VERTICAL_FILTER if mode == "encode" else None,
+            progress=lambda done: finished.append(time.perf_counter()), workers=workers, mode=mode,
+            single_pass=workers == 1, group=group, resume=False, use_cache=False, profile=profile
+        )
+    total = time.perf_counter() - started
+    shutil.rmtree(output_folder, ignore_errors=True)
+
+    marks = [started] + finished
+    return {
+        "mode": mode,
+        "merge": merge,
+        "workers": workers,
+        "profile": profile,
+        "segments": count,
+        "total_seconds": total,
+        "segment_seconds": [end - start for start, end in zip(marks[:-1], marks[1:])],
+        "realtime_factor": duration / total if total else None,
+        "peak_disk_bytes": sampler.peak_disk,
+        "peak_rss_bytes": sampler.peak_rss,
+    }
+
+
+def ffmpeg_version():
+    try:
+        return vidProcess.run_ffmpeg(["ffmpeg", "-version"]).stdout.decode().splitlines()[0]
+    except (OSError, IndexError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(media_dir, work_dir, durations, resolutions, rates, modes, workers, segment_seconds,
+                   profile=vidProfiles.DEFAULT_PROFILE, on_result=None):
+    results = []
+    cache_root = vidCache.CACHE_ROOT
+    try:
+        for width, height in resolutions:
+            for fps in rates:
+                for duration in durations:
+                    video_path = generate_media(media_dir, width, height, fps, duration)
+                    case_dir = os.path.join(work_dir, "case")
+                    reset_caches(os.path.join(work_dir, "cache"))
+                    os.makedirs(case_dir, exist_ok=True)
+                    result = {
+                        "media": {"name": os.path.basename(video_path), "width": width, "height": height,
+                                  "fps": fps, "duration": duration},
+                        "open": bench_open(video_path, case_dir),
+                        "exports": [],
+                    }
+                    for mode in modes:
+                        for merge in (False, True):
+                            result["exports"].append(
+                                bench_export(video_path, case_dir, duration, segment_seconds, mode, merge, workers,
+                                             profile)
+                            )
+                    shutil.rmtree(case_dir, ignore_errors=True)
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+    finally:
+        # Probes of the throwaway cache must not be served from memory afterwards either
+        vidCache.CACHE_ROOT = cache_root
+        vidProbe._memory_cache.clear()
+    return results
+
+
+def timings(report):
+    """Flatten a report into {(media, measurement): seconds} for comparison."""
+    flat = {}
+    for result in report["results"]:
+        name = result["media"]["name"]
+        for key in ("editable_seconds", "probe_seconds", "keyframes_seconds", "proxy_seconds"):
+            if result["open"].get(key) is not None:
+                flat[(name, f"open.{key}")] = result["open"][key]
+        for export in result["exports"]:
+            label = f"{export['mode']}{'+merge' if export['merge'] else ''} x{export['workers']}"
+            if export.get("profile", vidProfiles.DEFAULT_PROFILE) != vidProfiles.DEFAULT_PROFILE:
+                label += f" {export['profile']}"
+            flat[(name, f"export.{label}")] = export["total_seconds"]
+    return flat
+
+
+def compare(baseline, report):
+    """Lines describing how every timing in report changed against baseline."""
+    before = timings(baseline)
+    lines = []
+    for key, seconds in sorted(timings(report).items()):
+        if key not in before or not before[key]:
+            continue
+        change = (seconds - before[key]) / before[key] * 100
+        lines.append(f"{key[0]} {key[1]}: {before[key]:.3f}s -> {seconds:.3f}s ({change:+.1f}%)")
+    return lines
+
+
+def parse_resolution(value):
+    width, _, height = value.partition("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark opening and exporting synthetic test videos.")
+    parser.add_argument("-o", "--output", default="bench.json", help="JSON report to write (default: bench.json)")
+    parser.add_argument("--compare", metavar="REPORT", help="earlier report to compare the timings with")
+    parser.add_argument("--media-dir", help="folder for the generated test videos (default: cache folder)")
+    parser.add_argument("--duration", type=int, action="append", metavar="SECONDS",
+                        help=f"test video duration (repeatable, default: {', '.join(map(str, DEFAULT_DURATIONS))})")
+    parser.add_argument("--resolution", action="append", metavar="WxH",
+                        help=f"test video size (repeatable, default: {', '.join(DEFAULT_RESOLUTIONS)})")
+    parser.add_argument("--fps", type=int, action="append", help="test video frame rate (repeatable, default: 30)")
+    parser.add_argument("--mode", action="append", choices=vidEngine.EXPORT_MODES,
+                        help="export mode to measure (repeatable, default: encode)")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="segments to encode at once (default: based on CPU cores)")
+    parser.add_argument("--segment-seconds", type=int, default=5, help="length of the exported segments")
+    parser.add_argument("-p", "--profile", choices=sorted(vidProfiles.PROFILES), default=vidProfiles.DEFAULT_PROFILE,
+                        help=f"encoding profile of the exports (default: {vidProfiles.DEFAULT_PROFILE})")
+    args = parser.parse_args(argv)
+
+    media_dir = args.media_dir or vidCache.cache_dir("bench")
+    os.makedirs(media_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="vidbench-")
+    try:
+        results = run_benchmarks(
+            media_dir, work_dir,
+            args.duration or DEFAULT_DURATIONS,
+            [parse_resolution(value) for value in args.resolution or DEFAULT_RESOLUTIONS],
+            args.fps or DEFAULT_RATES,
+            args.mode or ["encode"],
+            args.jobs or vidProfiles.parallel_encodes(),
+            args.segment_seconds,
+            profile=args.profile,
+            on_result=lambda result: print(
+                f"{result['media']['name']}: editable in {result['open']['editable_seconds']:.2f}s, "
+                + ", ".join(f"{'merge' if export['merge'] else 'split'} ({export['mode']}) {export['total_seconds']:.2f}s"
+                            for export in result["exports"])
+            )
+        )
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
+        print(f"Benchmark Error: {error_msg}", file=sys.stderr)
+        return 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "version": REPORT_VERSION,
+        "created": time.time(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": ffmpeg_version(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for line in compare(baseline, report):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
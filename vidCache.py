@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+# Everything derived from a video (indexes, probes, ...) is kept here between sessions
+CACHE_ROOT = os.environ.get(
+    "VIDSPLITTER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "12MVideoSplitter")
+)
+
+
+def cache_dir(kind):
+    path = os.path.join(CACHE_ROOT, kind)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# Default byte budget of the proxy cache
+PROXY_CACHE_BYTES = int(os.environ.get("VIDSPLITTER_PROXY_CACHE_BYTES", 4 * 1024 ** 3))
+
+# Default byte budget of the finished segment cache
+SEGMENT_CACHE_BYTES = int(os.environ.get("VIDSPLITTER_SEGMENT_CACHE_BYTES", 8 * 1024 ** 3))
+
+# Bytes hashed from the start, middle and end of a file for its content hash
+HASH_SAMPLE_BYTES = 1024 * 1024
+
+
+def file_key(path):
+    """Cheap identity of a file on disk: changes whenever it is moved, resized or rewritten."""
+    stat = os.stat(path)
+    identity = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(identity.encode()).hexdigest()
+
+
+def content_hash(path):
+    """Hash of a file's size and sampled content, independent of its name and location.
+
+    Hashing the whole file would read every byte of a multi-gigabyte source
+    on each open; sampling its start, middle and end is enough to tell
+    different recordings apart.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in (0, max(0, size // 2 - HASH_SAMPLE_BYTES // 2), max(0, size - HASH_SAMPLE_BYTES)):
+            f.seek(offset)
+            digest.update(f.read(HASH_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def params_key(source_hash, params):
+    """Key for data derived from a source with the given processing parameters."""
+    encoded = json.dumps(params, sort_keys=True)
+    return hashlib.sha1(f"{source_hash}|{encoded}".encode()).hexdigest()
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def process_alive(pid):
+    if os.name == "nt":
+        # No cheap portable check; a lock only counts as stale once it's a day old
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProxyCache:
+    """On-disk editing proxies keyed by source content and proxy parameters.
+
+    Each entry is a directory. While it is being built it holds a lock file
+    with the builder's pid; a "complete" marker is written when it's done.
+    A process playing a completed entry holds it with a reader file of its
+    own pid, from lookup() or commit() until release(). Completed entries
+    that no live process holds are evicted least recently used first once
+    the cache grows past max_bytes, and builds left behind by crashed
+    processes are removed on the next eviction pass.
+    """
+
+    LOCK_NAME = ".lock"
+    READER_PREFIX = ".reader-"
+    COMPLETE_NAME = ".complete"
+    STALE_LOCK_SECONDS = 24 * 3600
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or cache_dir("proxies")
+        self.max_bytes = PROXY_CACHE_BYTES if max_bytes is None else max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, source_path, params):
+        return params_key(content_hash(source_path), params)
+
+    def entry_path(self, key):
+        return os.path.join(self.root, key)
+
+    def lookup(self, key):
+        """Return the directory of a completed entry, marking it as recently used and holding it."""
+        entry = self.entry_path(key)
+        if not os.path.exists(os.path.join(entry, self.COMPLETE_NAME)):
+            return None
+        try:
+            self.hold(entry)
+            os.utime(entry)
+        except OSError:
+            # Evicted by another process in between
+            return None
+        return entry
+
+    def reader_path(self, entry):
+        return os.path.join(entry, f"{self.READER_PREFIX}{os.getpid()}")
+
+    def hold(self, entry):
+        with open(self.reader_path(entry), "w") as f:
+            f.write(str(os.getpid()))
+
+    def release(self, key):
+        """Stop holding an entry this process got from lookup() or commit()."""
+        self.remove_lock(self.reader_path(self.entry_path(key)))
+
+    def held(self, entry):
+        """True while a live process holds the entry; reader files of dead ones are removed."""
+        try:
+            names = os.listdir(entry)
+        except OSError:
+            return False
+        held = False
+        for name in names:
+            if name.startswith(self.READER_PREFIX):
+                reader_path = os.path.join(entry, name)
+                if self.lock_is_stale(reader_path):
+                    self.remove_lock(reader_path)
+                else:
+                    held = True
+        return held
+
+    def reserve(self, key):
+        """Lock an entry for building and return its empty directory.
+
+        Returns None when another live process is already building it.
+        """
+        entry = self.entry_path(key)
+        os.makedirs(entry, exist_ok=True)
+        lock_path = os.path.join(entry, self.LOCK_NAME)
+        if self.lock_is_stale(lock_path):
+            self.remove_lock(lock_path)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        except FileNotFoundError:
+            # Another process evicted the empty directory in between
+            os.makedirs(entry, exist_ok=True)
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        # Whatever a crashed build left behind is not trustworthy
+        for name in os.listdir(entry):
+            if name != self.LOCK_NAME:
+                path = os.path.join(entry, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+        return entry
+
+    def commit(self, key):
+        entry = self.entry_path(key)
+        open(os.path.join(entry, self.COMPLETE_NAME), "w").close()
+        # The builder goes on playing it
+        self.hold(entry)
+        self.remove_lock(os.path.join(entry, self.LOCK_NAME))
+        self.evict(keep=key)
+
+    def abandon(self, key):
+        shutil.rmtree(self.entry_path(key), ignore_errors=True)
+
+    def lock_is_stale(self, lock_path):
+        try:
+            with open(lock_path, "r") as f:
+                pid = int(f.read().strip() or 0)
+            age = time.time() - os.path.getmtime(lock_path)
+        except (OSError, ValueError):
+            return os.path.exists(lock_path)
+        return not process_alive(pid) or age > self.STALE_LOCK_SECONDS
+
+    def remove_lock(self, lock_path):
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self, keep=None):
+        """Drop abandoned builds, then least recently used entries nobody holds until under budget."""
+        entries = []
+        held_bytes = 0
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if not os.path.isdir(entry) or name == keep:
+                continue
+            lock_path = os.path.join(entry, self.LOCK_NAME)
+            if os.path.exists(lock_path):
+                if self.lock_is_stale(lock_path):
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            if not os.path.exists(os.path.join(entry, self.COMPLETE_NAME)):
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            # Read before held() cleans up, which touches the directory
+            used = os.path.getmtime(entry)
+            if self.held(entry):
+                held_bytes += directory_size(entry)
+                continue
+            entries.append((used, directory_size(entry), entry))
+
+        total = held_bytes + sum(size for _, size, _ in entries)
+        if keep:
+            total += directory_size(self.entry_path(keep))
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+class SegmentCache:
+    """Finished segment exports keyed by source content, cut and export settings.
+
+    Each entry is a directory holding one segment file. Segments are
+    copied in and out rather than linked, so changing or replacing an
+    exported file never changes the cached one. Entries are evicted least
+    recently used first once the cache grows past max_bytes.
+    """
+
+    SEGMENT_NAME = "segment.mp4"
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or cache_dir("segments")
+        self.max_bytes = SEGMENT_CACHE_BYTES if max_bytes is None else max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def source_id(self, source_path):
+        """Identity of a source for key(): its file key and its sampled content hash.
+
+        The sampled hash alone could match a different file that only
+        differs outside the sampled blocks; the file key pins the entry to
+        this exact file version.
+        """
+        return f"{file_key(source_path)}|{content_hash(source_path)}"
+
+    def key(self, source_id, params):
+        return params_key(source_id, params)
+
+    def entry_path(self, key):
+        return os.path.join(self.root, key)
+
+    def fetch(self, key, target_path):
+        """Place the cached segment at target_path; returns False when there is none."""
+        entry = self.entry_path(key)
+        segment_path = os.path.join(entry, self.SEGMENT_NAME)
+        try:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            shutil.copyfile(segment_path, target_path)
+            os.utime(entry)
+        except OSError:
+            return False
+        return True
+
+    def store(self, key, segment_path):
+        # Filled under a temporary name and renamed, so an entry is never seen half-written
+        temp_entry = tempfile.mkdtemp(dir=self.root, suffix=".tmp")
+        try:
+            shutil.copyfile(segment_path, os.path.join(temp_entry, self.SEGMENT_NAME))
+            os.replace(temp_entry, self.entry_path(key))
+        except OSError:
+            # Stored by another export in the meantime, or the source is gone
+            shutil.rmtree(temp_entry, ignore_errors=True)
+
+    def evict(self):
+        """Drop leftover temporary entries, then least recently used ones until under budget."""
+        entries = []
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if not os.path.isdir(entry):
+                continue
+            if name.endswith(".tmp"):
+                if time.time() - os.path.getmtime(entry) > ProxyCache.STALE_LOCK_SECONDS:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            entries.append((os.path.getmtime(entry), directory_size(entry), entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(path, data):
+    # Write next to the target and rename so readers never see a partial file
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
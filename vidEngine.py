@@ -0,0 +1,554 @@
+import os
+import sys
+import logging
+import argparse
+import tempfile
+import subprocess
+import vidCache
+import vidProbe
+import vidProcess
+import vidTrace
+import vidManifest
+import vidProfiles
+import vidKeyframes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+# Resize/crop applied to exports (and previewed live in the editor)
+VERTICAL_FILTER = "scale=-2:1920,crop=1080:1920"
+VERTICAL_ASPECT = 1080 / 1920
+
+# Gap left at the end of every segment so neighbouring clips don't share a frame
+SEGMENT_END_GAP = 0.1
+
+# "encode" re-encodes every segment, "copy" stream-copies keyframe-aligned cuts,
+# "smart" re-encodes only up to the first keyframe of a segment and copies the rest
+EXPORT_MODES = ("encode", "copy", "smart")
+
+# A cut this close to a keyframe is treated as being on it
+KEYFRAME_TOLERANCE = 0.01
+
+# Part of every segment cache key; bump whenever the segment commands change their output
+SEGMENT_CACHE_VERSION = 1
+
+
+def output_location(original_path):
+    """Return (output_folder, source_name) for exports of original_path."""
+    source_dir = os.path.dirname(original_path)
+    source_name, _ = os.path.splitext(os.path.basename(original_path))
+    return os.path.join(source_dir, source_name), source_name
+
+
+def active_segments(split_points, deactivated_segments, total_duration):
+    """Return the (start, end) segments between split points that are not deactivated."""
+    split_times = sorted([0] + list(split_points) + [total_duration])
+    deactivated = set(deactivated_segments)
+    segments = []
+    for i in range(len(split_times) - 1):
+        segment = (split_times[i], split_times[i + 1])
+        if segment not in deactivated:
+            segments.append(segment)
+    return segments
+
+
+def segment_command(video_path, start, duration, output_path, video_filter=None, threads=None,
+                    profile=vidProfiles.DEFAULT_PROFILE, codec_args=None):
+    # Input seeking jumps straight to start instead of decoding everything before it
+    ffmpeg_cmd = [
+        "ffmpeg",
+        "-ss", str(start),
+        "-i", video_path,
+        "-t", str(duration),
+    ]
+    if video_filter:
+        ffmpeg_cmd += ["-vf", video_filter]
+    ffmpeg_cmd += codec_args or vidProfiles.encode_args(profile, threads)
+    ffmpeg_cmd += [
+        "-f", "mp4",
+        "-y",
+        output_path
+    ]
+    return ffmpeg_cmd
+
+
+class SegmentTracker:
+    """Turns the position of a single FFmpeg run into "segments finished" progress."""
+
+    def __init__(self, ends, progress=None):
+        self.ends = sorted(ends)
+        self.progress = progress
+        self.finished = 0
+
+    def update(self, fields):
+        position = vidProcess.progress_seconds(fields)
+        if position is None:
+            return
+        while self.finished < len(self.ends) and self.ends[self.finished] <= position:
+            self.advance()
+
+    def finish(self):
+        while self.finished < len(self.ends):
+            self.advance()
+
+    def advance(self):
+        self.finished += 1
+        if self.progress:
+            self.progress(self.finished)
+
+
+def combine_progress(*callbacks):
+    callbacks = [callback for callback in callbacks if callback]
+    return lambda fields: [callback(fields) for callback in callbacks]
+
+
+def trim_graph(segments, video_filter=None, has_audio=True):
+    """Filtergraph lines that cut each segment out of input 0 as [vo<i>] / [ao<i>]."""
+    count = len(segments)
+    graph = [f"[0:v]split={count}" + "".join(f"[v{i}]" for i in range(count))]
+    if has_audio:
+        graph.append(f"[0:a]asplit={count}" + "".join(f"[a{i}]" for i in range(count)))
+    for i, (start, end) in enumerate(segments):
+        chain = f"[v{i}]trim=start={start}:end={end},setpts=PTS-STARTPTS"
+        if video_filter:
+            chain += "," + video_filter
+        graph.append(chain + f"[vo{i}]")
+        if has_audio:
+            graph.append(f"[a{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[ao{i}]")
+    return graph
+
+
+def single_pass_command(video_path, segments, output_paths, video_filter=None, has_audio=True,
+                        profile=vidProfiles.DEFAULT_PROFILE):
+    """One FFmpeg command that decodes video_path once and encodes every segment to its output."""
+    graph = trim_graph(segments, video_filter, has_audio)
+    ffmpeg_cmd = ["ffmpeg", "-i", video_path, "-filter_complex", ";".join(graph)]
+    for i, output_path in enumerate(output_paths):
+        ffmpeg_cmd += ["-map", f"[vo{i}]"]
+        if has_audio:
+            ffmpeg_cmd += ["-map", f"[ao{i}]"]
+        ffmpeg_cmd += vidProfiles.encode_args(profile) + ["-f", "mp4", "-y", output_path]
+    # Untrimmed null output: its timestamps follow the source, so progress reports the decode position
+    ffmpeg_cmd += ["-map", "0:v", "-t", str(max(end for _, end in segments)), "-f", "null", "-"]
+    return ffmpeg_cmd
+
+
+def merge_command(video_path, segments, output_path, video_filter=None, has_audio=True,
+                  profile=vidProfiles.DEFAULT_PROFILE):
+    """One FFmpeg command that trims the segments, concatenates them and encodes the result once."""
+    graph = trim_graph(segments, None, has_audio)
+    count = len(segments)
+    if has_audio:
+        inputs = "".join(f"[vo{i}][ao{i}]" for i in range(count))
+        graph.append(f"{inputs}concat=n={count}:v=1:a=1[vm][am]")
+    else:
+        inputs = "".join(f"[vo{i}]" for i in range(count))
+        graph.append(f"{inputs}concat=n={count}:v=1:a=0[vm]")
+    if video_filter:
+        graph.append(f"[vm]{video_filter}[vf]")
+
+    ffmpeg_cmd = ["ffmpeg", "-i", video_path, "-filter_complex", ";".join(graph)]
+    ffmpeg_cmd += ["-map", "[vf]" if video_filter else "[vm]"]
+    if has_audio:
+        ffmpeg_cmd += ["-map", "[am]"]
+    ffmpeg_cmd += vidProfiles.encode_args(profile) + ["-f", "mp4", "-y", output_path]
+    return ffmpeg_cmd
+
+
+def run_merge(video_path, segments, output_path, video_filter=None, progress=None, meter=None, group=None,
+              profile=vidProfiles.DEFAULT_PROFILE):
+    """Encode the concatenation of segments straight into output_path, reporting each finished segment."""
+    # The merged output's clock reaches a segment's cumulative end once that segment is written
+    ends = []
+    elapsed = 0
+    for start, end in segments:
+        elapsed += end - start
+        ends.append(elapsed)
+    tracker = SegmentTracker(ends, progress)
+
+    cmd = merge_command(video_path, segments, output_path, video_filter, vidProbe.probe(video_path)["has_audio"], profile)
+    with vidTrace.span("merge", output=output_path, segments=len(segments)):
+        vidProcess.run_ffmpeg(cmd, group, on_progress=combine_progress(tracker.update, meter and meter.tracker(0)))
+    tracker.finish()
+
+
+def run_single_pass(video_path, segments, output_paths, video_filter=None, progress=None, meter=None, group=None,
+                    profile=vidProfiles.DEFAULT_PROFILE):
+    """Encode all segments in one decode of video_path, reporting each finished segment."""
+    ends = [end for _, end in segments]
+    tracker = SegmentTracker(ends, progress)
+
+    cmd = single_pass_command(
+        video_path, segments, output_paths, video_filter, vidProbe.probe(video_path)["has_audio"], profile
+    )
+    with vidTrace.span("single_pass", segments=len(segments)):
+        vidProcess.run_ffmpeg(cmd, group, on_progress=combine_progress(tracker.update, meter and meter.tracker(0)))
+    tracker.finish()
+
+
+def copy_segment_command(video_path, start, duration, output_path):
+    # Input seeking with stream copy starts exactly on the keyframe at start
+    return [
+        "ffmpeg",
+        "-ss", str(start),
+        "-i", video_path,
+        "-t", str(duration),
+        "-c", "copy",
+        "-avoid_negative_ts", "make_zero",
+        "-f", "mp4",
+        "-y",
+        output_path
+    ]
+
+
+def smart_segment_commands(video_path, start, end, output_path, keyframes, threads=None,
+                           profile=vidProfiles.DEFAULT_PROFILE):
+    """Return (commands, temp_files) that cut [start, end) frame-accurately.
+
+    Only the partial GOP between start and the next keyframe is re-encoded,
+    with the codec and stream parameters of the source; from that keyframe
+    on the segment is stream-copied and both parts are joined with the
+    concat demuxer. Sources whose streams can't be matched by an encode
+    are re-encoded as a whole instead.
+    """
+    keyframe = vidKeyframes.next_keyframe(keyframes, start - KEYFRAME_TOLERANCE)
+    if keyframe is not None and abs(keyframe - start) <= KEYFRAME_TOLERANCE:
+        return [copy_segment_command(video_path, keyframe, end - keyframe, output_path)], []
+    head_args = vidProfiles.matching_args(vidProbe.probe(video_path), profile, threads)
+    if keyframe is None or keyframe >= end or head_args is None:
+        return [segment_command(video_path, start, end - start, output_path, threads=threads, profile=profile)], []
+
+    base, _ = os.path.splitext(output_path)
+    head_path = base + ".head.mp4"
+    tail_path = base + ".tail.mp4"
+    list_path = base + ".parts.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write(f"file '{head_path}'\nfile '{tail_path}'\n")
+    commands = [
+        segment_command(video_path, start, keyframe - start, head_path, codec_args=head_args),
+        copy_segment_command(video_path, keyframe, end - keyframe, tail_path),
+        concat_command(list_path, output_path),
+    ]
+    return commands, [head_path, tail_path, list_path]
+
+
+def export_plan(video_path, split_points, deactivated_segments, total_duration, mode="encode", keyframes=None):
+    """Return the (start, end) segments an export in mode will actually cut."""
+    segments = active_segments(split_points, deactivated_segments, total_duration)
+    if mode == "copy":
+        if keyframes is None:
+            keyframes = vidKeyframes.read_keyframes(video_path)
+        segments = vidKeyframes.snap_segments(segments, keyframes, total_duration)
+    return segments
+
+
+def concat_command(file_list_path, output_path):
+    return [
+        "ffmpeg",
+        "-f", "concat",
+        "-safe", "0",
+        "-i", file_list_path,
+        "-c", "copy",
+        "-y",
+        output_path
+    ]
+
+
+def run_job(commands, group=None, on_progress=None, on_done=None):
+    # The last command writes the job's output
+    with vidTrace.span("segment", output=commands[-1][-1], commands=len(commands)):
+        for cmd in commands:
+            vidProcess.run_ffmpeg(cmd, group, on_progress)
+        if on_done:
+            on_done()
+
+
+def encode_segments(jobs, workers=1, progress=None, trackers=None, finishers=None, group=None):
+    """Run jobs (lists of FFmpeg commands run in order) on at most workers threads.
+
+    progress is called with the number of finished jobs, in completion
+    order; trackers optionally holds an FFmpeg progress callback per job
+    and finishers a callback run as soon as that job has succeeded.
+    If any job fails, or group is killed, the remaining ones are killed or
+    skipped and the first error is raised.
+    """
+    trackers = trackers or [None] * len(jobs)
+    finishers = finishers or [None] * len(jobs)
+    group = group or vidProcess.ProcessGroup()
+    if workers <= 1:
+        for done, (commands, tracker, finisher) in enumerate(zip(jobs, trackers, finishers), start=1):
+            run_job(commands, group, tracker, finisher)
+            if progress:
+                progress(done)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_job, commands, group, tracker, finisher)
+            for commands, tracker, finisher in zip(jobs, trackers, finishers)
+        ]
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                if progress:
+                    progress(done)
+        except BaseException:
+            group.kill()
+            for future in futures:
+                future.cancel()
+            raise
+
+
+@vidTrace.traced("export")
+def export_segments(video_path, original_path, split_points, deactivated_segments, total_duration,
+                    merge=False, video_filter=None, progress=None, workers=1, mode="encode", keyframes=None,
+                    single_pass=False, on_stats=None, group=None, resume=True, use_cache=True,
+                    profile=vidProfiles.DEFAULT_PROFILE, cores=None):
+    """Cut the active segments of video_path into the export folder of original_path.
+
+    Writes <source_name>/<n>.mp4 for every active segment, or a single
+    <source_name>/<source_name>_merged.mp4 when merge is set. Encodes use
+    the named vidProfiles profile. Up to workers segments are encoded at
+    once, as many as vidProfiles.tune finds worthwhile for the segment
+    lengths, sharing cores (default: all) CPU cores between them.
+    In "copy" mode the cuts snap to the nearest keyframes and segments are
+    stream-copied instead of re-encoded; "smart" mode keeps the cuts exact
+    and only re-encodes up to the first keyframe of each segment. With
+    single_pass, "encode" mode decodes the source once and writes all
+    segments from that one FFmpeg process instead of one per segment.
+    Merging in "encode" mode trims and concatenates the segments in a
+    single filtergraph, without writing the segments to disk first.
+    Finished segments are recorded in a vidManifest.ExportManifest; with
+    resume, segments a previous interrupted run of the same export already
+    finished are skipped. A single pass and an "encode" merge are one
+    FFmpeg run that finishes every segment at once, so interrupting them
+    keeps nothing and they start over when run again. With use_cache,
+    segments exported before from the same source with the same cut and
+    settings are copied from the vidCache.SegmentCache instead of being
+    exported again. Killing group cancels the export with
+    vidProcess.ExportCancelled.
+    progress is called with the number of finished segments and on_stats
+    with vidProcess.ProgressMeter statistics on every FFmpeg progress
+    update. Returns the number of exported segments; FFmpeg failures raise
+    subprocess.CalledProcessError.
+    """
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode: {mode}")
+    if mode != "encode" and video_filter:
+        raise ValueError("Stream copy export cannot apply a video filter")
+    if mode != "encode" and keyframes is None:
+        keyframes = vidKeyframes.read_keyframes(video_path)
+
+    segments = export_plan(video_path, split_points, deactivated_segments, total_duration, mode, keyframes)
+    if not segments:
+        return 0
+
+    output_folder, source_name = output_location(original_path)
+    os.makedirs(output_folder, exist_ok=True)
+    merged_file_path = os.path.join(output_folder, f"{source_name}_merged.mp4")
+    group = group or vidProcess.ProcessGroup()
+
+    cuts = []
+    for start, end in segments:
+        if mode != "copy":
+            end -= SEGMENT_END_GAP
+        cuts.append((start, end))
+
+    if merge and mode == "encode":
+        meter = vidProcess.ProgressMeter(sum(end - start for start, end in cuts), len(cuts), on_stats)
+
+        def merged_segment_finished(done):
+            meter.segment_finished(done)
+            if progress:
+                progress(done)
+
+        logger.info(f"Merging {len(segments)} segments into {merged_file_path}")
+        merged_part_path = vidManifest.part_path(merged_file_path)
+        try:
+            run_merge(video_path, cuts, merged_part_path, video_filter, merged_segment_finished, meter, group, profile)
+            os.replace(merged_part_path, merged_file_path)
+        finally:
+            # Left behind only when the merge failed or was cancelled
+            if os.path.exists(merged_part_path):
+                os.remove(merged_part_path)
+        return len(segments)
+
+    split_files = [os.path.join(output_folder, f"{i+1}.mp4") for i in range(len(cuts))]
+    manifest = vidManifest.ExportManifest.open(
+        output_folder,
+        {"source": vidCache.file_key(video_path), "mode": mode, "video_filter": video_filter, "merge": merge,
+         "profile": profile},
+        split_files, cuts, resume
+    )
+    pending = manifest.pending()
+
+    segment_cache = vidCache.SegmentCache() if use_cache else None
+    cache_keys = {}
+    if segment_cache and pending:
+        source_id = segment_cache.source_id(video_path)
+        for i in pending:
+            start, end = cuts[i]
+            cache_keys[i] = segment_cache.key(source_id, {
+                "version": SEGMENT_CACHE_VERSION, "start": start, "end": end, "mode": mode,
+                "video_filter": video_filter, "profile": profile
+            })
+        reused = [i for i in pending if segment_cache.fetch(cache_keys[i], vidManifest.part_path(split_files[i]))]
+        for i in reused:
+            logger.info(f"Reusing segment {i+1} from the segment cache")
+            manifest.complete(i)
+        pending = [i for i in pending if i not in reused]
+    skipped = len(cuts) - len(pending)
+
+    def finish_segment(i):
+        manifest.complete(i)
+        if segment_cache:
+            segment_cache.store(cache_keys[i], split_files[i])
+
+    workers, threads = vidProfiles.tune([cuts[i][1] - cuts[i][0] for i in pending], cores, workers)
+    if workers == 1 and not cores:
+        threads = None  # A lone encode with the whole machine lets libx264 choose
+
+    temp_files = []
+    jobs = []
+    for i in pending:
+        start, end = cuts[i]
+        segment_path = vidManifest.part_path(split_files[i])
+        duration = end - start
+        logger.info(f"{'Cutting' if merge else 'Extracting'} segment {i+1}: {start:.1f}s - {end:.1f}s, Duration: {duration:.1f}s")
+        if mode == "copy":
+            jobs.append([copy_segment_command(video_path, start, duration, segment_path)])
+        elif mode == "smart":
+            commands, parts = smart_segment_commands(video_path, start, end, segment_path, keyframes, threads, profile)
+            jobs.append(commands)
+            temp_files += parts
+        else:
+            jobs.append([segment_command(video_path, start, duration, segment_path, video_filter, threads, profile)])
+    if skipped:
+        logger.info(f"{skipped} segment{'s' if skipped != 1 else ''} already exported")
+
+    # A single pass is measured by its decode position, everything else by encoded output time
+    single_pass = single_pass and mode == "encode" and not merge and pending
+    pending_cuts = [cuts[i] for i in pending]
+    total_seconds = pending_cuts[-1][1] if single_pass else sum(end - start for start, end in pending_cuts)
+    meter = vidProcess.ProgressMeter(total_seconds, len(cuts), on_stats)
+    meter.segments_done = skipped
+
+    def segment_finished(done):
+        meter.segment_finished(skipped + done)
+        if progress:
+            progress(skipped + done)
+
+    try:
+        if single_pass:
+            part_paths = [vidManifest.part_path(split_files[i]) for i in pending]
+            run_single_pass(video_path, pending_cuts, part_paths, video_filter, segment_finished, meter, group, profile)
+            for i in pending:
+                finish_segment(i)
+        else:
+            trackers = [meter.tracker(i, end - start) for i, (start, end) in enumerate(pending_cuts)]
+            finishers = [lambda i=i: finish_segment(i) for i in pending]
+            encode_segments(jobs, workers, segment_finished, trackers, finishers, group)
+    finally:
+        with vidTrace.span("cleanup", files=len(temp_files)):
+            for part in temp_files:
+                if os.path.exists(part):
+                    os.remove(part)
+
+    if merge:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as temp_list:
+            for segment_path in split_files:
+                temp_list.write(f"file '{segment_path}'\n".encode())
+            file_list_path = temp_list.name
+
+        logger.info(f"Merging {len(segments)} segments into {merged_file_path}")
+        merged_part_path = vidManifest.part_path(merged_file_path)
+        try:
+            with vidTrace.span("concat", output=merged_file_path, segments=len(split_files)):
+                vidProcess.run_ffmpeg(concat_command(file_list_path, merged_part_path), group)
+            os.replace(merged_part_path, merged_file_path)
+        finally:
+            os.remove(file_list_path)
+            if os.path.exists(merged_part_path):
+                os.remove(merged_part_path)
+
+    with vidTrace.span("cleanup", files=len(split_files) if merge else 0):
+        if merge:
+            for part in split_files:
+                os.remove(part)
+        manifest.remove()
+        if segment_cache:
+            segment_cache.evict()
+    return len(segments)
+
+
+def segments_from_indices(split_points, indices, total_duration):
+    """Map 1-based segment numbers (as shown in the editor) to (start, end) tuples."""
+    split_times = sorted([0] + list(split_points) + [total_duration])
+    segments = list(zip(split_times[:-1], split_times[1:]))
+    return [segments[i - 1] for i in indices if 1 <= i <= len(segments)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split a video into segments without opening the editor.")
+    parser.add_argument("source", help="video file to split")
+    parser.add_argument("-s", "--split", type=float, action="append", default=[], metavar="SECONDS",
+                        help="split point in seconds (repeatable)")
+    parser.add_argument("-d", "--deactivate", type=int, action="append", default=[], metavar="N",
+                        help="1-based segment number to leave out (repeatable)")
+    parser.add_argument("-m", "--merge", action="store_true", help="merge the active segments into one file")
+    parser.add_argument("--duration", type=float, help="source duration in seconds (probed if omitted)")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="most segments to encode at once (default: tuned to the CPU cores and segment lengths)")
+    parser.add_argument("--single-pass", action="store_true",
+                        help="decode the source once and encode all segments from that pass")
+    parser.add_argument("--no-crop", action="store_true", help="keep the source frame instead of cropping to 9:16")
+    parser.add_argument("--copy", action="store_true",
+                        help="stream-copy keyframe-aligned cuts instead of re-encoding (implies --no-crop)")
+    parser.add_argument("--smart", action="store_true",
+                        help="exact cuts that only re-encode up to each segment's first keyframe (implies --no-crop)")
+    parser.add_argument("--restart", action="store_true",
+                        help="export every segment again instead of resuming an interrupted export")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="encode every segment instead of reusing identical segments from earlier exports")
+    parser.add_argument("-p", "--profile", choices=sorted(vidProfiles.PROFILES), default=vidProfiles.DEFAULT_PROFILE,
+                        help=f"encoding profile (default: {vidProfiles.DEFAULT_PROFILE})")
+    parser.add_argument("--trace", metavar="FILE", help="append pipeline trace records to FILE as JSON lines")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    mode = "copy" if args.copy else "smart" if args.smart else "encode"
+    if args.trace:
+        vidTrace.add_sink(vidTrace.JsonLinesSink(args.trace))
+    try:
+        total_duration = args.duration or vidProbe.probe(args.source)["duration"]
+        deactivated = segments_from_indices(args.split, args.deactivate, total_duration)
+        count = export_segments(
+            args.source, args.source, args.split, deactivated, total_duration,
+            merge=args.merge, video_filter=None if args.no_crop or mode != "encode" else VERTICAL_FILTER,
+            on_stats=lambda stats: print(f"\r{vidProcess.format_stats(stats)}", end="", flush=True),
+            workers=args.jobs,
+            mode=mode,
+            single_pass=args.single_pass,
+            resume=not args.restart,
+            use_cache=not args.no_cache,
+            profile=args.profile
+        )
+    except (KeyboardInterrupt, vidProcess.ExportCancelled):
+        if args.single_pass or (args.merge and mode == "encode"):
+            print("\nExport cancelled.", file=sys.stderr)
+        else:
+            print("\nExport cancelled; run the same command again to resume it.", file=sys.stderr)
+        return 130
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
+        print(f"\nExport Error: {error_msg}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"\nExport Error: {e}", file=sys.stderr)
+        return 1
+    print(f"\nProcessed {count} segment{'s' if count != 1 else ''}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
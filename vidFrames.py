@@ -0,0 +1,148 @@
+import os
+import threading
+import vidProcess
+
+# Frames are kept at editing-preview size, like the proxy
+FRAME_HEIGHT = 360
+BYTES_PER_PIXEL = 3  # rgb24
+
+# Default memory cap of the decoded frames of one video
+FRAME_BUFFER_BYTES = int(os.environ.get("VIDSPLITTER_FRAME_BUFFER_BYTES", 256 * 1024 ** 2))
+
+# Share of the buffer kept behind the playhead; stepping and scrubbing mostly go forward
+BEHIND_FRACTION = 0.25
+
+
+def frame_size(width, height, frame_height=FRAME_HEIGHT):
+    """Even (width, height) of a decoded frame: the display size scaled down to frame_height."""
+    out_height = max(2, min(frame_height, height) // 2 * 2)
+    out_width = max(2, round(width * out_height / height / 2) * 2)
+    return out_width, out_height
+
+
+def decode_command(source_path, start_seconds, count, width, height, fps):
+    # Input seeking is frame-accurate when transcoding: output starts at the first frame at or after start.
+    # The fps filter puts the frames on the constant-rate grid the frame indices assume, also for
+    # variable-frame-rate sources, repeating or dropping frames where the source's timing differs.
+    return [
+        "ffmpeg",
+        "-v", "error",
+        "-ss", f"{start_seconds:.6f}",
+        "-i", source_path,
+        "-an", "-sn",
+        "-vf", f"fps={fps},scale={width}:{height}",
+        "-frames:v", str(count),
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "pipe:1"
+    ]
+
+
+class FrameBuffer:
+    """Decoded, downscaled frames around the playhead of one video, decoded in the background.
+
+    request() moves the playhead and returns the frame if it is already in
+    memory; otherwise a background FFmpeg decodes a window of frames
+    around it, a little behind and mostly ahead, and on_frame is called
+    with the index of every frame as it arrives (from the decoder thread).
+    At most max_bytes of frames are held; frames outside the window, then
+    the ones farthest from the playhead, are dropped first. Frames are
+    rgb24 bytes of frame_width x frame_height pixels, indexed by frame
+    number at the source's average fps, so frame i shows the video at
+    i / fps seconds.
+    """
+
+    def __init__(self, source_path, fps, width, height, frame_count, max_bytes=None, on_frame=None):
+        self.source_path = source_path
+        self.fps = fps
+        self.frame_count = frame_count
+        self.frame_width, self.frame_height = frame_size(width, height)
+        self.frame_bytes = self.frame_width * self.frame_height * BYTES_PER_PIXEL
+        self.capacity = max(2, (max_bytes or FRAME_BUFFER_BYTES) // self.frame_bytes)
+        # Eviction drops a batch at a time; the decode window always fits in what it keeps
+        self.batch = max(1, self.capacity // 8)
+        self.window_size = self.capacity - self.batch
+        self.on_frame = on_frame
+        self.lock = threading.Lock()
+        self.frames = {}
+        self.playhead = 0
+        self.window = (0, 0)  # Frames [first, last) decoded or being decoded
+        self.generation = 0
+        self.group = None
+
+    def get(self, index):
+        with self.lock:
+            return self.frames.get(index)
+
+    def request(self, index):
+        """Move the playhead to frame index, decoding around it if needed; returns the frame if in memory."""
+        index = max(0, min(index, self.frame_count - 1))
+        with self.lock:
+            self.playhead = index
+            frame = self.frames.get(index)
+            first, last = self.window
+            # Refill before the decoder falls behind a playhead moving forward
+            margin = self.batch
+            if first <= index < last and (last >= self.frame_count or index < last - margin):
+                return frame
+
+            start = max(0, index - int(self.window_size * BEHIND_FRACTION))
+            end = min(self.frame_count, start + self.window_size)
+            # Frames already in memory at the start of the window don't have to be decoded again
+            decode_from = start
+            while decode_from < end and decode_from in self.frames:
+                decode_from += 1
+            self.window = (start, end)
+            self.generation += 1
+            generation = self.generation
+            if self.group:
+                self.group.kill()
+            self.group = vidProcess.ProcessGroup()
+            group = self.group
+        if decode_from < end:
+            threading.Thread(target=self.decode, args=(generation, group, decode_from, end), daemon=True).start()
+        return frame
+
+    def decode(self, generation, group, first, last):
+        # Half a frame early, so rounding can't push the first frame to the next one
+        start_seconds = max(0, (first - 0.5) / self.fps)
+        cmd = decode_command(self.source_path, start_seconds, last - first, self.frame_width, self.frame_height,
+                             self.fps)
+        try:
+            process = group.start(cmd)
+        except vidProcess.ExportCancelled:
+            return
+        stderr_reader, _ = vidProcess.read_stderr(process)
+        try:
+            for index in range(first, last):
+                data = process.stdout.read(self.frame_bytes)
+                if len(data) < self.frame_bytes:
+                    break
+                with self.lock:
+                    if generation != self.generation:
+                        break
+                    self.frames[index] = data
+                    self.evict()
+                if self.on_frame:
+                    self.on_frame(index)
+        finally:
+            group.kill()
+            stderr_reader.join()
+            vidProcess.wait_process(process)
+            group.release(process)
+
+    def evict(self):
+        # Called with the lock held: frames outside the decode window go first, farthest from the playhead first
+        if len(self.frames) <= self.capacity:
+            return
+        first, last = self.window
+        ranked = sorted(self.frames, key=lambda index: (not first <= index < last, abs(index - self.playhead)))
+        self.frames = {index: self.frames[index] for index in ranked[:self.window_size]}
+
+    def close(self):
+        with self.lock:
+            self.generation += 1
+            self.frames = {}
+            self.window = (0, 0)
+            if self.group:
+                self.group.kill()
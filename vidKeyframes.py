@@ -0,0 +1,73 @@
+import os
+import bisect
+import vidCache
+import vidProcess
+import vidTrace
+
+INDEX_VERSION = 1
+
+
+@vidTrace.traced("keyframes")
+def build_index(video_path, group=None):
+    """Read the keyframe times (seconds) of the first video stream."""
+    # Packet flags are read from the container, nothing has to be decoded
+    result = vidProcess.run_ffmpeg([
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=print_section=0",
+        video_path
+    ], group)
+    keyframes = []
+    for line in result.stdout.decode().splitlines():
+        fields = line.split(",")
+        if len(fields) < 2 or "K" not in fields[1] or fields[0] in ("", "N/A"):
+            continue
+        keyframes.append(float(fields[0]))
+    return {
+        "version": INDEX_VERSION,
+        "keyframes": sorted(keyframes),
+    }
+
+
+def load_index(video_path, group=None):
+    """Return the keyframe index of video_path, building and storing it on first use."""
+    index_path = os.path.join(vidCache.cache_dir("keyframes"), vidCache.file_key(video_path) + ".json")
+    index = vidCache.load_json(index_path)
+    if index and index.get("version") == INDEX_VERSION:
+        return index
+    index = build_index(video_path, group)
+    vidCache.save_json(index_path, index)
+    return index
+
+
+def read_keyframes(video_path, group=None):
+    """Return the sorted presentation times (seconds) of the video keyframes."""
+    return load_index(video_path, group)["keyframes"]
+
+
+def snap_to_keyframe(keyframes, position):
+    """Return the keyframe time closest to position (position itself if there are none)."""
+    if not keyframes:
+        return position
+    i = bisect.bisect_left(keyframes, position)
+    candidates = keyframes[max(0, i - 1):i + 1]
+    return min(candidates, key=lambda keyframe: abs(keyframe - position))
+
+
+def next_keyframe(keyframes, position):
+    """Return the first keyframe at or after position, or None past the last one."""
+    i = bisect.bisect_left(keyframes, position)
+    return keyframes[i] if i < len(keyframes) else None
+
+
+def snap_segments(segments, keyframes, total_duration):
+    """Move segment boundaries onto keyframes, dropping segments that collapse."""
+    snapped = []
+    for start, end in segments:
+        start = snap_to_keyframe(keyframes, start) if start > 0 else 0
+        end = snap_to_keyframe(keyframes, end) if end < total_duration else total_duration
+        if end > start:
+            snapped.append((start, end))
+    return snapped
@@ -0,0 +1,88 @@
+import os
+import threading
+import vidCache
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = ".export.json"
+
+
+def part_path(output_path):
+    """Where an output is written until it is complete; FFmpeg still sees the real extension."""
+    base, ext = os.path.splitext(output_path)
+    return base + ".part" + ext
+
+
+def file_state(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class ExportManifest:
+    """Planned and completed outputs of one export, stored in its output folder.
+
+    Outputs are written to a .part file and only renamed and recorded once
+    FFmpeg has finished them. Opening the manifest of an interrupted export
+    with the same parameters keeps every output whose file still has the
+    recorded size and modification time, so the export resumes where it
+    stopped.
+    """
+
+    def __init__(self, path, params, outputs):
+        self.path = path
+        self.params = params
+        self.outputs = outputs  # [{"path", "start", "end", "done"}] in segment order
+        self.lock = threading.Lock()
+
+    @classmethod
+    def open(cls, output_folder, params, output_paths, cuts, resume=True):
+        path = os.path.join(output_folder, MANIFEST_NAME)
+        params = dict(params, version=MANIFEST_VERSION)
+        previous = vidCache.load_json(path) if resume else None
+        previous_outputs = previous.get("outputs", []) if previous and previous.get("params") == params else []
+
+        outputs = []
+        for i, (output_path, (start, end)) in enumerate(zip(output_paths, cuts)):
+            output = {"path": os.path.basename(output_path), "start": start, "end": end, "done": None}
+            if i < len(previous_outputs):
+                old = previous_outputs[i]
+                same_cut = (old.get("path"), old.get("start"), old.get("end")) == (output["path"], start, end)
+                if same_cut and old.get("done") and cls.verify(output_path, old["done"]):
+                    output["done"] = old["done"]
+            if not output["done"] and os.path.exists(part_path(output_path)):
+                os.remove(part_path(output_path))
+            outputs.append(output)
+
+        manifest = cls(path, params, outputs)
+        manifest.save()
+        return manifest
+
+    @staticmethod
+    def verify(output_path, done):
+        try:
+            return file_state(output_path) == done
+        except OSError:
+            return False
+
+    def output_path(self, index):
+        return os.path.join(os.path.dirname(self.path), self.outputs[index]["path"])
+
+    def is_complete(self, index):
+        return self.outputs[index]["done"] is not None
+
+    def pending(self):
+        return [i for i in range(len(self.outputs)) if not self.is_complete(i)]
+
+    def complete(self, index):
+        """Move the finished .part file of output index into place and record it."""
+        output_path = self.output_path(index)
+        os.replace(part_path(output_path), output_path)
+        with self.lock:
+            self.outputs[index]["done"] = file_state(output_path)
+            self.save()
+
+    def save(self):
+        vidCache.save_json(self.path, {"params": self.params, "outputs": self.outputs})
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,214 @@
+import bisect
+import math
+from PyQt6.QtGui import QPixmap, QPainter, QColor
+from PyQt6.QtCore import Qt, QTimer, QRect
+
+
+class SplitOverlay:
+    """Draws the audio waveform, deactivated segments, keyframe ticks, split suggestions and split lines onto a QLabel.
+
+    Each kind of marker lives on its own cached layer. An edit repaints only
+    the pixel columns of the time range it touched, and markers are looked
+    up with bisect and collapsed to one draw per pixel column, so the cost
+    follows the width of the dirty range instead of the number of markers.
+    While the label is being resized the last image is stretched and the
+    layers are rebuilt once the size settles.
+    """
+
+    LAYERS = ("waveform", "deactivated", "keyframes", "suggestions", "splits")
+    REBUILD_DELAY_MS = 150
+
+    def __init__(self, label):
+        self.label = label
+        self.duration = 0
+        self.timeline = None
+        self.keyframes = []
+        self.show_keyframes = False
+        self.waveform = None
+        self.layers = {}
+        self.pixmap = None
+        self.rebuild_timer = QTimer()
+        self.rebuild_timer.setSingleShot(True)
+        self.rebuild_timer.timeout.connect(self.rebuild)
+        self.painters = {
+            "waveform": self.drawWaveform,
+            "deactivated": self.drawDeactivated,
+            "keyframes": self.drawKeyframes,
+            "suggestions": self.drawSuggestions,
+            "splits": self.drawSplits,
+        }
+
+    def setSource(self, duration, timeline, keyframes, show_keyframes):
+        self.duration = duration
+        self.timeline = timeline
+        self.keyframes = keyframes
+        self.show_keyframes = show_keyframes
+        self.rebuild()
+
+    def setWaveform(self, waveform):
+        self.waveform = waveform
+        if self.pixmap is not None and self.pixmap.width() == self.label.width():
+            self.repaint(0, self.pixmap.width() - 1, ("waveform",))
+
+    def resized(self):
+        if self.pixmap is not None and not self.pixmap.isNull():
+            self.label.setPixmap(self.pixmap.scaled(
+                self.label.width(), self.label.height(),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation
+            ))
+        self.rebuild_timer.start(self.REBUILD_DELAY_MS)
+
+    def rebuild(self):
+        width, height = self.label.width(), self.label.height()
+        if width <= 0 or height <= 0 or self.duration <= 0 or self.timeline is None:
+            return
+        self.layers = {}
+        for name in self.LAYERS:
+            layer = QPixmap(width, height)
+            layer.fill(Qt.GlobalColor.transparent)
+            self.layers[name] = layer
+        self.pixmap = QPixmap(width, height)
+        self.repaint(0, width - 1, self.LAYERS)
+
+    def updateRange(self, start, end, layers=LAYERS):
+        """Repaint the pixel columns covering start..end seconds on the given layers."""
+        if self.pixmap is None or self.pixmap.width() != self.label.width():
+            self.rebuild()
+            return
+        self.repaint(self.toX(start) - 2, self.toX(end) + 2, layers)
+
+    def toX(self, seconds):
+        return int((seconds / self.duration) * self.pixmap.width())
+
+    def toSeconds(self, x):
+        return x / self.pixmap.width() * self.duration
+
+    def repaint(self, x0, x1, layers):
+        x0 = max(0, x0)
+        x1 = min(self.pixmap.width() - 1, x1)
+        if x1 < x0:
+            return
+        strip = QRect(x0, 0, x1 - x0 + 1, self.pixmap.height())
+        for name in layers:
+            painter = QPainter(self.layers[name])
+            painter.setClipRect(strip)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            painter.fillRect(strip, Qt.GlobalColor.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+            self.painters[name](painter, x0, x1)
+            painter.end()
+
+        painter = QPainter(self.pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(strip, Qt.GlobalColor.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        for name in self.LAYERS:
+            painter.drawPixmap(strip, self.layers[name], strip)
+        painter.end()
+        self.label.setPixmap(self.pixmap)
+
+    def drawWaveform(self, painter, x0, x1):
+        if self.waveform is None:
+            return
+        # Peaks come from the pyramid level matching the pixel width, nothing is decoded again
+        middle = self.pixmap.height() / 2
+        painter.setPen(QColor(150, 150, 150))
+        peaks = self.waveform.peaks(self.toSeconds(x0), self.toSeconds(x1 + 1), x1 - x0 + 1)
+        for x_pos, (low, high) in enumerate(peaks, x0):
+            painter.drawLine(x_pos, int(middle - high * middle), x_pos, int(middle - low * middle))
+
+    def drawDeactivated(self, painter, x0, x1):
+        height = self.pixmap.height()
+        painter.setBrush(QColor(200, 100, 100, 150))
+        first = self.timeline.segment_index(self.toSeconds(x0 - 1))
+        last = self.timeline.segment_index(self.toSeconds(x1 + 1))
+        for index in range(first, last + 1):
+            if index <= len(self.timeline.split_points) and self.timeline.is_deactivated(index):
+                start, end = self.timeline.segment_bounds(index)
+                x_start = self.toX(start)
+                x_end = self.toX(end)
+                painter.drawRect(x_start, 0, x_end - x_start, height)
+
+    def drawKeyframes(self, painter, x0, x1):
+        if not self.show_keyframes:
+            return
+        height = self.pixmap.height()
+        painter.setPen(QColor(120, 120, 120))
+        for x_pos in self.columns(self.keyframes, x0, x1):
+            painter.drawLine(x_pos, height - 4, x_pos, height)
+
+    def drawSuggestions(self, painter, x0, x1):
+        height = self.pixmap.height()
+        painter.setPen(QColor(255, 170, 0))
+        for x_pos in self.columns(self.timeline.suggestions, x0, x1):
+            painter.drawLine(x_pos, 0, x_pos, height // 2)
+
+    def drawSplits(self, painter, x0, x1):
+        height = self.pixmap.height()
+        painter.setPen(QColor(0, 0, 255))
+        painter.setBrush(QColor(0, 0, 255))
+        for x_pos in self.columns(self.timeline.split_points, x0, x1):
+            painter.drawRect(x_pos - 1, 0, 1, height)
+
+    def columns(self, times, x0, x1):
+        """Distinct pixel columns of the sorted times that fall within x0..x1 (with a margin)."""
+        i = bisect.bisect_left(times, self.toSeconds(x0 - 2))
+        last = bisect.bisect_right(times, self.toSeconds(x1 + 2))
+        while i < last:
+            x_pos = self.toX(times[i])
+            yield x_pos
+            # Skip the other markers that land on the same column
+            i = max(i + 1, bisect.bisect_left(times, self.toSeconds(x_pos + 1), i, last))
+
+
+class Filmstrip:
+    """Draws thumbnails from a vidThumbs.ThumbnailStore across a QLabel, one cell per thumbnail width.
+
+    Cells whose sprite sheet isn't in memory are left blank and their
+    sheets are requested in cell order, replacing earlier requests, so
+    what is on screen loads first; sheetLoaded() redraws when one arrives.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.store = None
+        self.aspect = 16 / 9
+
+    def setStore(self, store, aspect):
+        self.store = store
+        self.aspect = aspect
+        self.redraw()
+
+    def resized(self):
+        self.redraw()
+
+    def sheetLoaded(self, sheet):
+        self.redraw()
+
+    def redraw(self):
+        width, height = self.label.width(), self.label.height()
+        if width <= 0 or height <= 0:
+            return
+        pixmap = QPixmap(width, height)
+        pixmap.fill(QColor(40, 40, 40))
+        if self.store is None or self.store.count == 0:
+            self.label.setPixmap(pixmap)
+            return
+        cell_width = max(1, int(height * self.aspect))
+        cells = math.ceil(width / cell_width)
+        missing = []
+        painter = QPainter(pixmap)
+        for cell in range(cells):
+            x_pos = cell * cell_width
+            thumb = self.store.thumb_at((x_pos + cell_width / 2) / width * self.store.duration)
+            sheet, position = self.store.sheet_of(thumb)
+            image = self.store.get(sheet)
+            if image is None:
+                missing.append(sheet)
+                continue
+            thumb_width = image.width() // self.store.sheet_size(sheet)
+            painter.drawImage(QRect(x_pos, 0, cell_width, height), image,
+                              QRect(position * thumb_width, 0, thumb_width, image.height()))
+        painter.end()
+        self.label.setPixmap(pixmap)
+        self.store.request(missing)
@@ -0,0 +1,103 @@
+import os
+import json
+import vidCache
+import vidProcess
+import vidTrace
+from fractions import Fraction
+
+PROBE_VERSION = 1
+
+# Probed in this process already, keyed by vidCache.file_key
+_memory_cache = {}
+
+
+def parse_rate(rate):
+    """Parse an FFprobe rate such as "30000/1001" into an exact Fraction (0 if unknown)."""
+    try:
+        value = Fraction(rate)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return Fraction(0)
+    return value if value > 0 else Fraction(0)
+
+
+@vidTrace.traced("probe")
+def read_probe(video_path):
+    """Run FFprobe once and reduce its output to the fields the editor and engine use."""
+    result = vidProcess.run_ffmpeg([
+        "ffprobe",
+        "-v", "error",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        video_path
+    ])
+    data = json.loads(result.stdout.decode() or "{}")
+    streams = data.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), {})
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), {})
+
+    rate = parse_rate(video.get("avg_frame_rate")) or parse_rate(video.get("r_frame_rate"))
+    duration = float(data.get("format", {}).get("duration") or video.get("duration") or 0)
+    frame_count = int(video.get("nb_frames") or 0)
+    if not frame_count and rate and duration:
+        frame_count = round(duration * rate)
+
+    rotation = 0
+    for side_data in video.get("side_data_list", []):
+        if "rotation" in side_data:
+            rotation = int(side_data["rotation"])
+    rotation = int(video.get("tags", {}).get("rotate", rotation))
+
+    # The MP4 track timescale is the denominator of the stream time base, e.g. "1/15360"
+    time_base = parse_rate(video.get("time_base"))
+
+    return {
+        "version": PROBE_VERSION,
+        "duration": duration,
+        "fps_num": rate.numerator,
+        "fps_den": rate.denominator,
+        "fps": float(rate),
+        "frame_count": frame_count,
+        "width": int(video.get("width") or 0),
+        "height": int(video.get("height") or 0),
+        "rotation": rotation,
+        "video_codec": video.get("codec_name"),
+        "video_profile": video.get("profile"),
+        "video_level": video.get("level"),
+        "pix_fmt": video.get("pix_fmt"),
+        "video_timescale": time_base.denominator if time_base else None,
+        "has_audio": bool(audio),
+        "audio_codec": audio.get("codec_name"),
+        "audio_sample_rate": int(audio.get("sample_rate") or 0),
+        "audio_channels": int(audio.get("channels") or 0),
+        "audio_bit_rate": int(audio.get("bit_rate") or 0),
+        "streams": [
+            {
+                "index": stream.get("index"),
+                "codec_type": stream.get("codec_type"),
+                "codec_name": stream.get("codec_name"),
+            }
+            for stream in streams
+        ],
+    }
+
+
+def probe(video_path):
+    """Return the media info of video_path, probing it only once per file version."""
+    key = vidCache.file_key(video_path)
+    if key in _memory_cache:
+        return _memory_cache[key]
+    probe_path = os.path.join(vidCache.cache_dir("probes"), key + ".json")
+    info = vidCache.load_json(probe_path)
+    if not info or info.get("version") != PROBE_VERSION:
+        info = read_probe(video_path)
+        vidCache.save_json(probe_path, info)
+    _memory_cache[key] = info
+    return info
+
+
+def display_size(info):
+    """(width, height) of the frame as shown, with rotation metadata applied."""
+    if info["rotation"] % 180:
+        return info["height"], info["width"]
+    return info["width"], info["height"]
@@ -0,0 +1,257 @@
+import os
+import time
+import threading
+import subprocess
+import vidTrace
+
+# Hide FFmpeg console on Windows
+CREATE_NO_WINDOW = 0x08000000 if os.name == "nt" else 0
+
+# Block size of binary FFmpeg output streamed to on_chunk
+CHUNK_BYTES = 64 * 1024
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ProcessGroup:
+    """Tracks running FFmpeg processes so a failing or cancelled job can stop its siblings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self.cancelled = False
+
+    def start(self, cmd):
+        with self._lock:
+            if self.cancelled:
+                raise ExportCancelled()
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                creationflags=CREATE_NO_WINDOW
+            )
+            self._processes.add(process)
+        return process
+
+    def release(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+    def pids(self):
+        """Process ids of the commands running right now."""
+        with self._lock:
+            return [process.pid for process in self._processes]
+
+    def kill(self):
+        with self._lock:
+            self.cancelled = True
+            for process in self._processes:
+                if process.poll() is None:
+                    process.kill()
+
+
+def run_ffmpeg(cmd, group=None, on_progress=None, on_line=None, on_chunk=None):
+    """Run an FFmpeg/FFprobe command, raising CalledProcessError when it fails.
+
+    With on_progress, FFmpeg writes machine-readable progress to stdout and
+    on_progress is called with the key/value fields of every update. With
+    on_line, every line of stdout is passed to it as it arrives instead of
+    being collected, so long outputs are processed in constant memory;
+    on_chunk does the same for binary output, in blocks of CHUNK_BYTES.
+    """
+    group = group or ProcessGroup()
+    if on_progress:
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats"] + cmd[1:]
+    process = group.start(cmd)
+    started = time.perf_counter()
+    try:
+        if on_progress:
+            stdout, stderr = read_progress(process, on_progress)
+        elif on_line:
+            stdout, stderr = read_lines(process, on_line)
+        elif on_chunk:
+            stdout, stderr = read_chunks(process, on_chunk)
+        else:
+            stdout, stderr = read_output(process)
+        usage = wait_process(process)
+    finally:
+        group.release(process)
+    vidTrace.command(cmd, time.perf_counter() - started, usage, process.returncode)
+    if process.returncode != 0:
+        if group.cancelled:
+            raise ExportCancelled()
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def read_stderr(process):
+    # stderr is drained on its own thread so a chatty FFmpeg can't block on a full pipe
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_reader.start()
+    return stderr_reader, stderr_chunks
+
+
+def read_output(process):
+    stderr_reader, stderr_chunks = read_stderr(process)
+    stdout = process.stdout.read()
+    stderr_reader.join()
+    return stdout, b"".join(stderr_chunks)
+
+
+def read_lines(process, on_line):
+    stderr_reader, stderr_chunks = read_stderr(process)
+    for line in process.stdout:
+        on_line(line.decode(errors="replace").rstrip("\r\n"))
+    stderr_reader.join()
+    return b"", b"".join(stderr_chunks)
+
+
+def read_chunks(process, on_chunk):
+    stderr_reader, stderr_chunks = read_stderr(process)
+    while True:
+        chunk = process.stdout.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        on_chunk(chunk)
+    stderr_reader.join()
+    return b"", b"".join(stderr_chunks)
+
+
+def read_progress(process, on_progress):
+    stderr_reader, stderr_chunks = read_stderr(process)
+    fields = {}
+    for line in process.stdout:
+        key, _, value = line.decode(errors="replace").strip().partition("=")
+        fields[key] = value
+        if key == "progress":
+            on_progress(fields)
+            fields = {}
+    stderr_reader.join()
+    return b"", b"".join(stderr_chunks)
+
+
+def wait_process(process):
+    """Wait for process to exit and return its resource usage while tracing, else None."""
+    if not vidTrace.enabled() or not hasattr(os, "wait4"):
+        process.wait()
+        return None
+    # Reaped under Popen's own lock, as Popen.wait does, so a concurrent poll() or kill()
+    # from ProcessGroup.kill never finds the pid released while returncode is still None
+    with process._waitpid_lock:
+        if process.returncode is None:
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return usage
+    # Already reaped through Popen (e.g. by ProcessGroup.kill polling it)
+    return None
+
+
+def progress_seconds(fields):
+    """Output position in seconds from an FFmpeg progress update, or None."""
+    value = fields.get("out_time_us") or fields.get("out_time_ms")
+    try:
+        return int(value) / 1000000
+    except (TypeError, ValueError):
+        return None
+
+
+def progress_frames(fields):
+    value = fields.get("frame", "")
+    return int(value) if value.isdigit() else None
+
+
+class ProgressMeter:
+    """Combines FFmpeg progress updates of one or more concurrent jobs into export statistics.
+
+    Each job is keyed by an id and may run several commands in a row; a
+    command's "progress=end" update folds its position into the job's
+    total. on_stats receives a dict with the finished and total segment
+    counts, the encoded and total media seconds, the completed fraction,
+    frames, encode fps, speed (x realtime), elapsed and ETA in seconds
+    (None until known).
+    """
+
+    def __init__(self, total_seconds, segments=0, on_stats=None):
+        self.total_seconds = total_seconds
+        self.segments = segments
+        self.on_stats = on_stats
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.positions = {}
+        self.frames = {}
+        self.bases = {}
+        self.limits = {}
+        self.segments_done = 0
+
+    def tracker(self, job, limit=None):
+        """Return an on_progress callback for the commands of job, capped at limit seconds."""
+        self.limits[job] = limit
+        return lambda fields: self.update(job, fields)
+
+    def update(self, job, fields):
+        position = progress_seconds(fields)
+        frames = progress_frames(fields)
+        with self.lock:
+            base_seconds, base_frames = self.bases.get(job, (0, 0))
+            limit = self.limits.get(job)
+            # Once a job has covered its output (e.g. a final stream-copy join), nothing more counts
+            if limit is None or base_seconds < limit:
+                if position is not None:
+                    seconds = base_seconds + position
+                    self.positions[job] = min(seconds, limit) if limit else seconds
+                if frames is not None:
+                    self.frames[job] = base_frames + frames
+            if fields.get("progress") == "end":
+                self.bases[job] = (self.positions.get(job, 0), self.frames.get(job, 0))
+            stats = self.snapshot()
+        self.emit(stats)
+
+    def segment_finished(self, done):
+        with self.lock:
+            self.segments_done = done
+            stats = self.snapshot()
+        self.emit(stats)
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        encoded = sum(self.positions.values())
+        frames = sum(self.frames.values())
+        speed = encoded / elapsed
+        remaining = max(0, self.total_seconds - encoded)
+        return {
+            "segments_done": self.segments_done,
+            "segments": self.segments,
+            "seconds": encoded,
+            "total_seconds": self.total_seconds,
+            "fraction": min(1.0, encoded / self.total_seconds) if self.total_seconds else 0,
+            "frames": frames,
+            "fps": frames / elapsed,
+            "speed": speed,
+            "elapsed": elapsed,
+            "eta": remaining / speed if speed > 0 else None,
+        }
+
+    def emit(self, stats):
+        if self.on_stats:
+            self.on_stats(stats)
+
+
+def format_clock(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+def format_stats(stats):
+    """One-line summary of ProgressMeter statistics."""
+    parts = []
+    if stats["segments"]:
+        parts.append(f"{stats['segments_done']}/{stats['segments']} segments")
+    parts.append(f"{stats['fraction'] * 100:.0f}%")
+    parts.append(f"{stats['speed']:.1f}x")
+    parts.append(f"{stats['fps']:.0f} fps")
+    parts.append(f"ETA {format_clock(stats['eta'])}" if stats["eta"] is not None else "ETA --")
+    return " · ".join(parts)
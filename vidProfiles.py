@@ -0,0 +1,109 @@
+import os
+import math
+
+# libx264/AAC settings of every export encode; "balanced" matches FFmpeg's own defaults
+PROFILES = {
+    "draft": {"preset": "veryfast", "crf": 28, "audio_bitrate": "96k"},
+    "balanced": {"preset": "medium", "crf": 23, "audio_bitrate": "128k"},
+    "archive": {"preset": "slow", "crf": 18, "audio_bitrate": "192k"},
+}
+DEFAULT_PROFILE = "balanced"
+
+# Source codecs a smart cut can re-encode to match, and the encoders that produce them
+MATCHING_VIDEO_ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+MATCHING_AUDIO_ENCODERS = {"aac": "aac", "mp3": "libmp3lame", "opus": "libopus"}
+
+# Encoder profile names of the FFprobe profiles each video encoder can produce
+MATCHING_VIDEO_PROFILES = {
+    "libx264": {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high",
+                "High 10": "high10", "High 4:2:2": "high422", "High 4:4:4 Predictive": "high444"},
+    "libx265": {"Main": "main", "Main 10": "main10", "Main Still Picture": "mainstillpicture"},
+}
+
+# Below this many threads per encode, x264's frame threading stops paying for the extra process
+MIN_THREADS_PER_ENCODE = 2
+
+
+def encode_args(profile=DEFAULT_PROFILE, threads=None):
+    """FFmpeg output options encoding video and audio with the named profile."""
+    settings = PROFILES[profile]
+    args = [
+        "-vcodec", "libx264",
+        "-preset", settings["preset"],
+        "-crf", str(settings["crf"]),
+        "-acodec", "aac",
+        "-b:a", settings["audio_bitrate"],
+    ]
+    if threads:
+        args += ["-threads", str(threads)]
+    return args
+
+
+def matching_args(info, profile=DEFAULT_PROFILE, threads=None):
+    """FFmpeg output options encoding streams that match the source's, or None if it can't be matched.
+
+    info is the vidProbe.probe() result of the source. The video keeps its
+    codec, profile, level, pixel format and MP4 track timescale, and the
+    audio its codec, sample rate, channels and bitrate, so the encode can
+    be joined to a stream copy of the same source without re-encoding it;
+    the named profile only sets the speed and quality.
+    """
+    settings = PROFILES[profile]
+    encoder = MATCHING_VIDEO_ENCODERS.get(info.get("video_codec"))
+    encoder_profile = MATCHING_VIDEO_PROFILES.get(encoder, {}).get(info.get("video_profile"))
+    if not encoder_profile or not info.get("pix_fmt") or not info.get("video_timescale"):
+        return None
+    args = [
+        "-c:v", encoder,
+        "-preset", settings["preset"],
+        "-crf", str(settings["crf"]),
+        "-profile:v", encoder_profile,
+        "-pix_fmt", info["pix_fmt"],
+        "-video_track_timescale", str(info["video_timescale"]),
+    ]
+    level = info.get("video_level") or 0
+    if level > 0:
+        # FFprobe reports H.264 levels times 10 and HEVC levels times 30
+        if encoder == "libx264":
+            args += ["-level", f"{level / 10:.1f}"]
+        else:
+            args += ["-x265-params", f"level-idc={level / 30:.1f}"]
+    if info.get("has_audio"):
+        audio_encoder = MATCHING_AUDIO_ENCODERS.get(info.get("audio_codec"))
+        if not audio_encoder or not info.get("audio_sample_rate") or not info.get("audio_channels"):
+            return None
+        args += [
+            "-c:a", audio_encoder,
+            "-ar", str(info["audio_sample_rate"]),
+            "-ac", str(info["audio_channels"]),
+            "-b:a", str(info["audio_bit_rate"]) if info.get("audio_bit_rate") else settings["audio_bitrate"],
+        ]
+    if threads:
+        args += ["-threads", str(threads)]
+    return args
+
+
+def parallel_encodes(cores=None):
+    """Most encodes worth running side by side on cores (default: all) CPU cores."""
+    return max(1, (cores or os.cpu_count() or 1) // MIN_THREADS_PER_ENCODE)
+
+
+def tune(durations, cores=None, max_workers=None):
+    """Pick (parallel encodes, threads per encode) for segments of the given durations.
+
+    Separate encodes scale better than threads within one encode, so as
+    many run side by side as the cores allow at MIN_THREADS_PER_ENCODE
+    each. The longest segment bounds the export time, though: once there
+    are enough encodes for the others to finish alongside it, more would
+    only take threads away from it.
+    """
+    cores = max(1, cores or os.cpu_count() or 1)
+    if not durations:
+        return 1, cores
+    workers = min(len(durations), parallel_encodes(cores))
+    if max_workers:
+        workers = min(workers, max_workers)
+    longest = max(durations)
+    if longest > 0:
+        workers = min(workers, max(1, math.ceil(sum(durations) / longest)))
+    return workers, max(1, cores // workers)
@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import logging
+import shutil
+import argparse
+import tempfile
+import vidCache
+import vidEngine
+import vidProfiles
+import vidQueue
+import vidTrace
+
+PROJECT_VERSION = 1
+PROJECT_SUFFIX = ".vsplit.json"
+
+
+def project_path(video_path):
+    """Default project file of a video: next to it, named after it."""
+    source_name, _ = os.path.splitext(video_path)
+    return source_name + PROJECT_SUFFIX
+
+
+def make_project(video_path, probe, split_points, deactivated_segments, mode="encode",
+                 profile=vidProfiles.DEFAULT_PROFILE, crop=True, merge=False):
+    """Edit decision list of one video: its identity, the edit and the export settings.
+
+    probe is the vidProbe.probe() result of the video the edit was made
+    against.
+    """
+    return {
+        "version": PROJECT_VERSION,
+        "source": {
+            "path": os.path.abspath(video_path),
+            "hash": vidCache.content_hash(video_path),
+            "probe": probe,
+        },
+        "split_points": sorted(split_points),
+        "deactivated_segments": [list(segment) for segment in deactivated_segments],
+        "export": {"mode": mode, "profile": profile, "crop": crop, "merge": merge},
+    }
+
+
+def save_project(path, project):
+    vidCache.save_json(os.path.abspath(path), project)
+
+
+def load_project(path):
+    project = vidCache.load_json(path)
+    if not project:
+        raise ValueError(f"{path} is not a project file")
+    if project.get("version") != PROJECT_VERSION:
+        raise ValueError(f"{path} has unsupported project version {project.get('version')}")
+    return project
+
+
+def resolve_source(project, path):
+    """Path of the project's source video: where it was saved, or next to the project file if both were moved.
+
+    Raises ValueError if the video is missing or its content changed since the project was saved.
+    """
+    saved_path = project["source"]["path"]
+    candidates = [saved_path, os.path.join(os.path.dirname(os.path.abspath(path)), os.path.basename(saved_path))]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            if vidCache.content_hash(candidate) != project["source"]["hash"]:
+                raise ValueError(f"{candidate} has changed since {path} was saved")
+            return candidate
+    raise ValueError(f"Source video of {path} not found: {saved_path}")
+
+
+def submit(queue, project, source_path):
+    """Queue the export a project describes."""
+    settings = project["export"]
+    mode = settings["mode"]
+    return queue.submit(
+        source_path, source_path, project["split_points"], project["deactivated_segments"],
+        project["source"]["probe"]["duration"], settings["merge"], mode,
+        vidEngine.VERTICAL_FILTER if mode == "encode" and settings["crop"] else None, settings["profile"]
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the edits of many saved projects in one run.")
+    parser.add_argument("projects", nargs="+", help=f"project files ({PROJECT_SUFFIX}) saved from the editor")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="FFmpeg workers shared by all exports (default: based on CPU cores)")
+    parser.add_argument("-p", "--profile", choices=sorted(vidProfiles.PROFILES), help="encoding profile of every export")
+    parser.add_argument("--mode", choices=vidEngine.EXPORT_MODES, help="export mode of every export")
+    merge = parser.add_mutually_exclusive_group()
+    merge.add_argument("-m", "--merge", action="store_true", default=None, help="merge the segments of every export")
+    merge.add_argument("--separate", action="store_false", dest="merge", help="export the segments of every export separately")
+    parser.add_argument("--no-crop", action="store_true", help="keep the source frame instead of cropping to 9:16")
+    parser.add_argument("--save", action="store_true", help="write the changed settings back into the project files")
+    parser.add_argument("--trace", metavar="FILE", help="append pipeline trace records to FILE as JSON lines")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.trace:
+        vidTrace.add_sink(vidTrace.JsonLinesSink(args.trace))
+
+    # A queue of its own: one worker budget for all projects, without touching the editor's queue
+    queue_dir = tempfile.mkdtemp(prefix="vidproject-")
+    queue = vidQueue.ExportQueue(path=os.path.join(queue_dir, "queue.json"), budget=args.jobs)
+    failed = 0
+    try:
+        for path in args.projects:
+            try:
+                project = load_project(path)
+                source_path = resolve_source(project, path)
+            except (OSError, ValueError) as e:
+                print(f"Project Error: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            overrides = {"profile": args.profile, "mode": args.mode, "merge": args.merge,
+                         "crop": False if args.no_crop else None}
+            project["export"].update({key: value for key, value in overrides.items() if value is not None})
+            if args.save:
+                save_project(path, project)
+            job = submit(queue, project, source_path)
+            print(vidQueue.describe(job))
+
+        def report(job):
+            # Progress updates of running jobs would flood the terminal
+            if job.status != "running":
+                print(vidQueue.describe(job))
+
+        queue.on_change = report
+        queue.start()
+        try:
+            while queue.pending():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            queue.stop()
+            print("Batch stopped; running the same command again resumes the exports.", file=sys.stderr)
+            return 130
+    finally:
+        queue.close()
+        shutil.rmtree(queue_dir, ignore_errors=True)
+    failed += sum(1 for job in queue.jobs if job.status == "failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
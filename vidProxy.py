@@ -0,0 +1,97 @@
+import os
+import vidProcess
+import vidTrace
+import vidProbe
+
+# Editing proxies are small and seek fast: low resolution, short GOPs, short HLS segments
+PROXY_HEIGHT = 360
+KEYFRAME_SECONDS = 1
+SEGMENT_SECONDS = 2
+
+# Sources up to 1080p play smoothly as they are
+PROXY_THRESHOLD = 1920 * 1080
+
+PLAYLIST_NAME = "proxy.m3u8"
+
+# Everything that changes the proxy output; part of its cache key
+PROXY_PARAMS = {
+    "version": 1,
+    "height": PROXY_HEIGHT,
+    "keyframe_seconds": KEYFRAME_SECONDS,
+    "segment_seconds": SEGMENT_SECONDS,
+}
+
+
+def needs_proxy(width, height):
+    return width * height > PROXY_THRESHOLD
+
+
+def proxy_command(source_path, output_dir):
+    # An HLS "event" playlist only grows, so a player can open it while it's still being written
+    return [
+        "ffmpeg",
+        "-i", source_path,
+        "-vf", f"scale=-2:{PROXY_HEIGHT}",
+        "-vcodec", "libx264",
+        "-preset", "ultrafast",
+        "-tune", "fastdecode",
+        "-force_key_frames", f"expr:gte(t,n_forced*{KEYFRAME_SECONDS})",
+        "-pix_fmt", "yuv420p",
+        "-acodec", "aac",
+        "-b:a", "96k",
+        "-f", "hls",
+        "-hls_time", str(SEGMENT_SECONDS),
+        "-hls_list_size", "0",
+        "-hls_playlist_type", "event",
+        "-hls_segment_filename", os.path.join(output_dir, "proxy_%05d.ts"),
+        "-y",
+        os.path.join(output_dir, PLAYLIST_NAME)
+    ]
+
+
+def playlist_seconds(playlist_path):
+    """Seconds of video in the finished segments the playlist lists so far."""
+    seconds = 0.0
+    try:
+        with open(playlist_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return seconds
+    for line in lines:
+        if line.startswith("#EXTINF:"):
+            try:
+                seconds += float(line[len("#EXTINF:"):].split(",", 1)[0])
+            except ValueError:
+                pass  # A line the muxer is still writing
+    return seconds
+
+
+@vidTrace.traced("proxy")
+def generate_proxy(source_path, output_dir, on_ready=None, on_progress=None, group=None, on_stats=None):
+    """Encode the editing proxy of source_path into output_dir and return its playlist path.
+
+    on_ready is called with the playlist path as soon as it can be played,
+    on_progress with the number of seconds that can be played so far and
+    on_stats with vidProcess.ProgressMeter statistics. Killing group stops
+    the encode. What can be played is what the playlist lists: FFmpeg's
+    own position runs ahead of it by the segment being written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    playlist_path = os.path.join(output_dir, PLAYLIST_NAME)
+    available = [0.0]
+    meter = vidProcess.ProgressMeter(vidProbe.probe(source_path)["duration"], on_stats=on_stats)
+
+    def update(fields):
+        seconds = playlist_seconds(playlist_path)
+        if seconds > available[0]:
+            if not available[0] and on_ready:
+                on_ready(playlist_path)
+            available[0] = seconds
+            if on_progress:
+                on_progress(seconds)
+        meter.update(0, fields)
+
+    vidProcess.run_ffmpeg(proxy_command(source_path, output_dir), group, on_progress=update)
+    if not available[0] and on_ready:
+        on_ready(playlist_path)
+    return playlist_path
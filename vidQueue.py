@@ -0,0 +1,356 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+import itertools
+import subprocess
+import vidCache
+import vidEngine
+import vidProcess
+import vidProfiles
+
+QUEUE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+# Held next to the queue file by the one process that runs and saves it
+LOCK_SUFFIX = ".lock"
+
+STATUSES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED = ("done", "failed", "cancelled")
+
+
+class QueueLocked(Exception):
+    """The queue file is owned by another live process."""
+
+
+class ExportJob:
+    """One submitted edit: everything export_segments needs, plus its place and state in the queue."""
+
+    FIELDS = ("job_id", "video_path", "original_path", "split_points", "deactivated_segments", "total_duration",
+              "merge", "mode", "video_filter", "profile", "priority", "status", "error", "submitted", "result")
+
+    def __init__(self, job_id, video_path, original_path, split_points, deactivated_segments, total_duration,
+                 merge=False, mode="encode", video_filter=None, profile=vidProfiles.DEFAULT_PROFILE, priority=0,
+                 status="queued", error=None, submitted=None, result=None):
+        self.job_id = job_id
+        self.video_path = video_path
+        self.original_path = original_path
+        self.split_points = list(split_points)
+        self.deactivated_segments = [tuple(segment) for segment in deactivated_segments]
+        self.total_duration = total_duration
+        self.merge = merge
+        self.mode = mode
+        self.video_filter = video_filter
+        self.profile = profile
+        self.priority = priority
+        self.status = status
+        self.error = error
+        self.submitted = submitted or time.time()
+        self.result = result  # Number of exported segments once done
+        self.stats = None  # Latest ProgressMeter statistics while running
+        self.workers = 0
+        self.group = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.original_path)
+
+    def segment_count(self):
+        return len(self.split_points) + 1 - len(self.deactivated_segments)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+
+class ExportQueue:
+    """Persistent queue of export jobs, run in the background within a budget of FFmpeg workers.
+
+    Jobs start highest priority first, then in submission order, for as
+    long as workers are free. A job gets its share of the free workers
+    (at least one), so a single job uses the whole budget while a long
+    queue runs several jobs side by side. The default budget is as many
+    encodes as vidProfiles.tune would run on this machine. The queue is
+    saved on every change; jobs that were running when the process exited
+    go back to queued and resume from their export manifest (merged
+    "encode" exports start over). on_change is called with a job whenever
+    its status or progress changes, from the thread that changed it.
+
+    Only one process owns a queue file: the first to open it, recorded by
+    pid in a lock file next to it. Any other process gets a read-only view
+    of the queue (owned is False) that can't be started, changed or saved.
+    The lock is given up by close(), or taken over once its owner is gone.
+    """
+
+    def __init__(self, path=None, budget=None, on_change=None):
+        self.path = path or os.path.join(vidCache.cache_dir("queue"), "queue.json")
+        self.budget = budget or vidProfiles.parallel_encodes()
+        self.on_change = on_change
+        self.lock = threading.RLock()
+        self.jobs = []
+        self.threads = {}
+        self.running = False
+        self.lock_path = self.path + LOCK_SUFFIX
+        self.owned = self.acquire()
+        self.load()
+        self._next_id = itertools.count(max((job.job_id for job in self.jobs), default=0) + 1)
+
+    def acquire(self):
+        if self.lock_is_stale():
+            self.release()
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+
+    def lock_owner(self):
+        try:
+            with open(self.lock_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return None
+
+    def lock_is_stale(self):
+        pid = self.lock_owner()
+        if pid is None:
+            return os.path.exists(self.lock_path)
+        try:
+            # Every save touches the lock, so only an owner that stopped saving long ago ages out
+            age = time.time() - os.path.getmtime(self.lock_path)
+        except OSError:
+            return False
+        return not vidCache.process_alive(pid) or age > vidCache.ProxyCache.STALE_LOCK_SECONDS
+
+    def release(self):
+        try:
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+    def load(self):
+        data = vidCache.load_json(self.path)
+        if not data or data.get("version") != QUEUE_VERSION:
+            return
+        for entry in data.get("jobs", []):
+            job = ExportJob.from_dict(entry)
+            if job.status == "running" and self.owned:
+                job.status = "queued"
+            self.jobs.append(job)
+
+    def save(self):
+        if not self.owned:
+            return
+        if self.lock_owner() != os.getpid():
+            # Taken over by another process after this one stopped saving for too long
+            self.owned = False
+            return
+        with self.lock:
+            data = {"version": QUEUE_VERSION, "jobs": [job.to_dict() for job in self.jobs]}
+        vidCache.save_json(self.path, data)
+        os.utime(self.lock_path)
+
+    def submit(self, video_path, original_path, split_points, deactivated_segments, total_duration,
+               merge=False, mode="encode", video_filter=None, profile=vidProfiles.DEFAULT_PROFILE, priority=0):
+        if not self.owned:
+            raise QueueLocked(f"{self.path} is in use by process {self.lock_owner()}")
+        with self.lock:
+            job = ExportJob(next(self._next_id), video_path, original_path, split_points, deactivated_segments,
+                            total_duration, merge, mode, video_filter, profile, priority)
+            self.jobs.append(job)
+        self.changed(job)
+        self.schedule()
+        return job
+
+    def job(self, job_id):
+        return next((job for job in self.jobs if job.job_id == job_id), None)
+
+    def cancel(self, job_id):
+        if not self.owned:
+            return
+        with self.lock:
+            job = self.job(job_id)
+            if job is None or job.status in FINISHED:
+                return
+            if job.status == "running":
+                job.group.kill()
+                return
+            job.status = "cancelled"
+        self.changed(job)
+
+    def set_priority(self, job_id, priority):
+        if not self.owned:
+            return
+        with self.lock:
+            job = self.job(job_id)
+            if job is None:
+                return
+            job.priority = priority
+        self.changed(job)
+        self.schedule()
+
+    def clear_finished(self):
+        if not self.owned:
+            return
+        with self.lock:
+            self.jobs = [job for job in self.jobs if job.status not in FINISHED]
+        self.save()
+
+    def start(self):
+        if not self.owned:
+            raise QueueLocked(f"{self.path} is in use by process {self.lock_owner()}")
+        self.running = True
+        self.schedule()
+
+    def stop(self):
+        """Stop starting jobs and interrupt the running ones; they resume on the next start."""
+        with self.lock:
+            self.running = False
+            threads = list(self.threads.values())
+            for job in self.jobs:
+                if job.status == "running":
+                    job.group.kill()
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        """Stop the queue and give up its ownership."""
+        self.stop()
+        if self.owned:
+            self.owned = False
+            self.release()
+
+    def busy_workers(self):
+        return sum(job.workers for job in self.jobs if job.status == "running")
+
+    def schedule(self):
+        with self.lock:
+            if not self.running:
+                return
+            queued = sorted(
+                (job for job in self.jobs if job.status == "queued"),
+                key=lambda job: (-job.priority, job.submitted, job.job_id)
+            )
+            for index, job in enumerate(queued):
+                free = self.budget - self.busy_workers()
+                if free <= 0:
+                    break
+                waiting = len(queued) - index
+                job.workers = max(1, min(-(-free // waiting), job.segment_count()))
+                job.status = "running"
+                job.error = None
+                job.stats = None
+                job.group = vidProcess.ProcessGroup()
+                thread = threading.Thread(target=self.run, args=(job,), daemon=True)
+                self.threads[job.job_id] = thread
+                thread.start()
+        self.save()
+
+    def run(self, job):
+        self.changed(job)
+        status, error, result = "done", None, None
+        # The job's share of the worker budget is also its share of the cores
+        cores = max(1, (os.cpu_count() or 1) * job.workers // self.budget)
+        try:
+            result = vidEngine.export_segments(
+                job.video_path, job.original_path, job.split_points, job.deactivated_segments, job.total_duration,
+                merge=job.merge, video_filter=job.video_filter, workers=job.workers, mode=job.mode,
+                on_stats=lambda stats: self.update_stats(job, stats), group=job.group,
+                profile=job.profile, cores=cores
+            )
+        except vidProcess.ExportCancelled:
+            status = "cancelled"
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
+            logger.error(f"ExportQueue Error: {error_msg}")
+            status, error = "failed", error_msg
+        except (OSError, ValueError) as e:
+            logger.error(f"ExportQueue Error: {e}")
+            status, error = "failed", str(e)
+        if status != "done" and not self.running:
+            # Interrupted by stop() (or Ctrl+C reaching FFmpeg first): pick it up again next time
+            status, error = "queued", None
+        with self.lock:
+            job.status, job.error, job.result = status, error, result
+            job.workers = 0
+            job.group = None
+            self.threads.pop(job.job_id, None)
+        self.changed(job)
+        self.schedule()
+
+    def update_stats(self, job, stats):
+        job.stats = stats
+        if self.on_change:
+            self.on_change(job)
+
+    def changed(self, job):
+        self.save()
+        if self.on_change:
+            self.on_change(job)
+
+    def pending(self):
+        with self.lock:
+            return [job for job in self.jobs if job.status in ("queued", "running")]
+
+
+def describe(job):
+    """One-line status of a job for lists and logs."""
+    text = f"#{job.job_id} {job.name} [{job.status}]"
+    if job.profile != vidProfiles.DEFAULT_PROFILE:
+        text += f" {job.profile}"
+    if job.priority:
+        text += f" priority {job.priority}"
+    if job.status == "running" and job.stats:
+        text += f" {vidProcess.format_stats(job.stats)}"
+    elif job.status == "done" and job.result is not None:
+        text += f" {job.result} segment{'s' if job.result != 1 else ''}"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the export queue of the editor without opening it.")
+    parser.add_argument("-j", "--jobs", type=int, metavar="N",
+                        help="FFmpeg workers shared by all running exports (default: based on CPU cores)")
+    parser.add_argument("--list", action="store_true", help="only list the queued exports")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    queue = ExportQueue(budget=args.jobs)
+    try:
+        if args.list:
+            for job in queue.jobs:
+                print(describe(job))
+            return 0
+        if not queue.owned:
+            print(f"The export queue is already being run by process {queue.lock_owner()}.", file=sys.stderr)
+            return 1
+
+        def report(job):
+            # Progress updates of running jobs would flood the terminal
+            if job.status != "running":
+                print(describe(job))
+
+        queue.on_change = report
+        queue.start()
+        try:
+            while queue.pending():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            queue.stop()
+            print("Export queue stopped; running exports resume on the next start.", file=sys.stderr)
+            return 130
+        return 1 if any(job.status == "failed" for job in queue.jobs) else 0
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+import sys
+import argparse
+import subprocess
+import vidCache
+import vidProcess
+import vidProbe
+import vidTrace
+
+INDEX_VERSION = 1
+
+# Frames are compared at this width; scene changes don't need detail
+ANALYSIS_WIDTH = 320
+
+# Scene scores below this are never a cut; they aren't stored, which keeps the index small
+SCORE_FLOOR = 0.1
+
+DEFAULT_THRESHOLD = 0.3
+MIN_GAP_SECONDS = 2.0
+
+
+def analysis_command(video_path):
+    # FFmpeg's scene score compares each frame with the previous one; only frames above the floor are printed
+    return [
+        "ffmpeg",
+        "-v", "error",
+        "-i", video_path,
+        "-an", "-sn", "-dn",
+        "-vf", f"scale={ANALYSIS_WIDTH}:-2,select='gte(scene,{SCORE_FLOOR})',"
+               "metadata=print:key=lavfi.scene_score:file=-",
+        "-f", "null",
+        "-"
+    ]
+
+
+def parse_scores(output):
+    """(time, score) pairs from the output of FFmpeg's metadata=print filter."""
+    scores = []
+    time = None
+    for line in output.splitlines():
+        if line.startswith("frame:"):
+            time = None
+            for field in line.split():
+                if field.startswith("pts_time:"):
+                    time = float(field[len("pts_time:"):])
+        elif line.startswith("lavfi.scene_score=") and time is not None:
+            scores.append((time, float(line.split("=", 1)[1])))
+    return scores
+
+
+@vidTrace.traced("scenes")
+def build_index(video_path, group=None):
+    """Score every frame of the video that may start a new scene."""
+    result = vidProcess.run_ffmpeg(analysis_command(video_path), group)
+    scores = sorted(parse_scores(result.stdout.decode()))
+    return {
+        "version": INDEX_VERSION,
+        "floor": SCORE_FLOOR,
+        "times": [round(time, 6) for time, _ in scores],
+        "scores": [round(score, 4) for _, score in scores],
+    }
+
+
+def load_index(video_path, group=None, analysis_path=None):
+    """Return the scene score index of video_path, building and storing it on first use.
+
+    analysis_path is the file actually decoded to build it, such as a
+    low-resolution proxy of video_path with the same timing; frames are
+    scaled down to ANALYSIS_WIDTH anyway, so a proxy scores the same cuts
+    at a fraction of the decoding cost.
+    """
+    index_path = os.path.join(vidCache.cache_dir("scenes"), vidCache.file_key(video_path) + ".json")
+    index = vidCache.load_json(index_path)
+    if index and index.get("version") == INDEX_VERSION:
+        return index
+    index = build_index(analysis_path or video_path, group)
+    vidCache.save_json(index_path, index)
+    return index
+
+
+def suggest_splits(index, duration, threshold=DEFAULT_THRESHOLD, min_gap=MIN_GAP_SECONDS):
+    """Sorted split suggestions: the strongest scene changes, at least min_gap apart and from the ends."""
+    candidates = sorted(
+        ((score, time) for time, score in zip(index["times"], index["scores"])
+         if score >= threshold and min_gap <= time <= duration - min_gap),
+        reverse=True
+    )
+    chosen = []
+    for _, time in candidates:
+        if all(abs(time - other) >= min_gap for other in chosen):
+            chosen.append(time)
+    return sorted(chosen)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest split points at the scene changes of a video.")
+    parser.add_argument("source", help="video file to analyze")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"scene change score from {SCORE_FLOOR} to 1 (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--min-gap", type=float, default=MIN_GAP_SECONDS, metavar="SECONDS",
+                        help=f"shortest segment to suggest (default: {MIN_GAP_SECONDS})")
+    args = parser.parse_args(argv)
+
+    try:
+        duration = vidProbe.probe(args.source)["duration"]
+        suggestions = suggest_splits(load_index(args.source), duration, args.threshold, args.min_gap)
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
+        print(f"Scene Analysis Error: {error_msg}", file=sys.stderr)
+        return 1
+    # Ready to pass on to vidEngine.py
+    print(" ".join(f"--split {time:.3f}" for time in suggestions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
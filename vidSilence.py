@@ -0,0 +1,140 @@
+import sys
+import argparse
+import subprocess
+import vidProcess
+import vidProbe
+import vidTimeline
+import vidTrace
+
+# Audio is measured in windows of this many seconds at a fixed sample rate
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 0.05
+
+DEFAULT_THRESHOLD_DB = -40.0
+MIN_SILENCE_SECONDS = 0.6
+
+# Silence kept before and after speech when pauses are removed
+PADDING_SECONDS = 0.15
+
+
+def analysis_command(video_path):
+    # astats measures the RMS level of every window and resets; one line pair per window goes to stdout
+    window = int(SAMPLE_RATE * WINDOW_SECONDS)
+    return [
+        "ffmpeg",
+        "-v", "error",
+        "-i", video_path,
+        "-vn", "-sn", "-dn",
+        "-af", f"aresample={SAMPLE_RATE},aformat=channel_layouts=mono,asetnsamples=n={window}:p=0,"
+               "astats=metadata=1:reset=1,ametadata=print:key=lavfi.astats.Overall.RMS_level:file=-",
+        "-f", "null",
+        "-"
+    ]
+
+
+class SilenceFinder:
+    """Turns a stream of FFmpeg window levels into silence intervals, holding only the current one."""
+
+    def __init__(self, threshold_db, min_duration):
+        self.threshold_db = threshold_db
+        self.min_duration = min_duration
+        self.silences = []
+        self.time = None
+        self.silence_start = None
+        self.end = 0
+
+    def line(self, line):
+        if line.startswith("frame:"):
+            for field in line.split():
+                if field.startswith("pts_time:"):
+                    self.time = float(field[len("pts_time:"):])
+        elif line.startswith("lavfi.astats.Overall.RMS_level=") and self.time is not None:
+            # Digital silence is reported as -inf
+            self.window(self.time, float(line.split("=", 1)[1]))
+
+    def window(self, time, level_db):
+        self.end = time + WINDOW_SECONDS
+        if level_db <= self.threshold_db:
+            if self.silence_start is None:
+                self.silence_start = time
+        elif self.silence_start is not None:
+            self.close(time)
+
+    def close(self, end):
+        if end - self.silence_start >= self.min_duration:
+            self.silences.append((self.silence_start, end))
+        self.silence_start = None
+
+    def finish(self):
+        if self.silence_start is not None:
+            self.close(self.end)
+        return self.silences
+
+
+@vidTrace.traced("silence")
+def detect_silences(video_path, threshold_db=DEFAULT_THRESHOLD_DB, min_duration=MIN_SILENCE_SECONDS, group=None):
+    """(start, end) seconds of every stretch of audio quieter than threshold_db for at least min_duration.
+
+    A video without an audio stream has no pauses to find.
+    """
+    if not vidProbe.probe(video_path)["has_audio"]:
+        return []
+    finder = SilenceFinder(threshold_db, min_duration)
+    vidProcess.run_ffmpeg(analysis_command(video_path), group, on_line=finder.line)
+    return finder.finish()
+
+
+def silence_edit(timeline, silences, remove=False, padding=PADDING_SECONDS):
+    """One undoable timeline edit from silences: a split in the middle of each pause, or each pause cut out.
+
+    Pauses at the very start or end have nothing to split from; when
+    removing, they are deactivated like the others.
+    """
+    commands = []
+    for start, end in silences:
+        # The audio track can end a little before the video
+        at_start = start < WINDOW_SECONDS
+        at_end = end > timeline.duration - WINDOW_SECONDS
+        if not remove:
+            if not at_start and not at_end:
+                commands.append(vidTimeline.AddSplit(round((start + end) / 2, 3)))
+            continue
+        cut_start = 0 if at_start else round(start + padding, 3)
+        cut_end = timeline.duration if at_end else round(end - padding, 3)
+        middle = (cut_start + cut_end) / 2
+        # Splitting a deactivated segment leaves the pause deactivated already
+        if cut_end <= cut_start or timeline.is_deactivated(timeline.segment_index(middle)):
+            continue
+        commands += [vidTimeline.AddSplit(cut_start), vidTimeline.AddSplit(cut_end), vidTimeline.ToggleSegment(middle)]
+    return vidTimeline.Batch(commands)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest split points at the pauses of a video.")
+    parser.add_argument("source", help="video file to analyze")
+    parser.add_argument("--remove", action="store_true", help="cut the pauses out instead of splitting at them")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD_DB, metavar="DB",
+                        help=f"loudest level that counts as silence (default: {DEFAULT_THRESHOLD_DB} dBFS)")
+    parser.add_argument("--min-silence", type=float, default=MIN_SILENCE_SECONDS, metavar="SECONDS",
+                        help=f"shortest pause to use (default: {MIN_SILENCE_SECONDS})")
+    args = parser.parse_args(argv)
+
+    try:
+        duration = vidProbe.probe(args.source)["duration"]
+        silences = detect_silences(args.source, args.threshold, args.min_silence)
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else "Unknown FFmpeg error"
+        print(f"Silence Detection Error: {error_msg}", file=sys.stderr)
+        return 1
+
+    timeline = vidTimeline.Timeline(duration)
+    timeline.execute(silence_edit(timeline, silences, args.remove))
+    # Ready to pass on to vidEngine.py
+    options = [f"--split {position:.3f}" for position in timeline.split_points]
+    options += [f"--deactivate {index + 1}" for index in range(len(timeline.segment_ids)) if timeline.is_deactivated(index)]
+    print(" ".join(options))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
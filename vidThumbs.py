@@ -0,0 +1,180 @@
+import os
+import logging
+import threading
+import subprocess
+import collections
+import vidCache
+import vidProcess
+import vidTrace
+
+logger = logging.getLogger(__name__)
+
+THUMBS_VERSION = 1
+
+THUMB_HEIGHT = 54
+THUMBS_PER_SHEET = 10
+
+# Thumbnails sit on a fixed grid: one every MIN_INTERVAL seconds, spread out for long videos
+MIN_INTERVAL = 2.0
+MAX_THUMBS = 300
+
+# Default memory cap of the decoded sprite sheets of one video
+THUMB_MEMORY_BYTES = int(os.environ.get("VIDSPLITTER_THUMB_MEMORY_BYTES", 32 * 1024 ** 2))
+
+THUMB_WORKERS = 2
+
+
+def sheet_command(source_path, times, output_path):
+    # Every input seeks to the keyframe at or before its time and decodes only that keyframe
+    cmd = ["ffmpeg", "-v", "error"]
+    for time in times:
+        cmd += ["-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{time:.3f}", "-an", "-i", source_path]
+    scaled = ";".join(f"[{i}:v:0]scale=-2:{THUMB_HEIGHT},setsar=1[t{i}]" for i in range(len(times)))
+    if len(times) > 1:
+        graph = scaled + ";" + "".join(f"[t{i}]" for i in range(len(times))) + f"hstack=inputs={len(times)}[sheet]"
+    else:
+        graph = scaled.replace("[t0]", "[sheet]")
+    return cmd + [
+        "-filter_complex", graph,
+        "-map", "[sheet]",
+        "-frames:v", "1",
+        "-update", "1",
+        "-q:v", "5",
+        "-y",
+        output_path
+    ]
+
+
+class ThumbnailStore:
+    """Filmstrip thumbnails of one video, packed into sprite sheets and cached on disk.
+
+    Thumbnail i shows the keyframe at or before i * interval seconds;
+    each sprite sheet holds THUMBS_PER_SHEET of them side by side, so one
+    FFmpeg run and one file serve a whole stretch of the timeline. Sheets
+    are generated by a small pool of background workers in the order of
+    the latest request(), so the visible part of the timeline comes
+    first. Loaded sheets are passed through decode (which returns the
+    decoded sheet and its size in bytes) and kept in memory up to
+    max_bytes, least recently used first. on_sheet is called with the
+    sheet index from a worker thread whenever one is loaded.
+    """
+
+    def __init__(self, source_path, duration, max_bytes=None, decode=None, on_sheet=None, workers=THUMB_WORKERS):
+        self.source_path = source_path
+        self.duration = duration
+        self.interval = max(MIN_INTERVAL, duration / MAX_THUMBS)
+        self.count = max(1, int(duration / self.interval) + 1) if duration > 0 else 0
+        self.sheet_count = -(-self.count // THUMBS_PER_SHEET)
+        self.max_bytes = THUMB_MEMORY_BYTES if max_bytes is None else max_bytes
+        self.decode = decode or (lambda data: (data, len(data)))
+        self.on_sheet = on_sheet
+        params = {"version": THUMBS_VERSION, "height": THUMB_HEIGHT, "per_sheet": THUMBS_PER_SHEET,
+                  "interval": round(self.interval, 6)}
+        self.folder = os.path.join(vidCache.cache_dir("thumbs"), vidCache.params_key(vidCache.file_key(source_path), params))
+        self.sheets = collections.OrderedDict()  # sheet index -> (decoded sheet, bytes), least recently used first
+        self.used_bytes = 0
+        self.wanted = []
+        self.loading = set()
+        self.failed = set()
+        self.condition = threading.Condition()
+        self.group = vidProcess.ProcessGroup()
+        self.closed = False
+        self.threads = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def thumb_at(self, seconds):
+        """Index of the thumbnail nearest to seconds."""
+        return max(0, min(self.count - 1, int(round(seconds / self.interval))))
+
+    def sheet_of(self, thumb):
+        """(sheet index, position in the sheet) of a thumbnail."""
+        return divmod(thumb, THUMBS_PER_SHEET)
+
+    def sheet_size(self, sheet):
+        return min(THUMBS_PER_SHEET, self.count - sheet * THUMBS_PER_SHEET)
+
+    def sheet_path(self, sheet):
+        return os.path.join(self.folder, f"{sheet}.jpg")
+
+    def get(self, sheet):
+        """The decoded sheet if it's in memory, else None."""
+        with self.condition:
+            entry = self.sheets.get(sheet)
+            if entry is None:
+                return None
+            self.sheets.move_to_end(sheet)
+            return entry[0]
+
+    def request(self, sheets):
+        """Load these sheets next, in this order; earlier requests that aren't running yet are dropped."""
+        with self.condition:
+            self.wanted = [sheet for sheet in dict.fromkeys(sheets)
+                           if 0 <= sheet < self.sheet_count and sheet not in self.sheets and sheet not in self.failed]
+            self.condition.notify_all()
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.closed and not self.wanted:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                sheet = self.wanted.pop(0)
+                if sheet in self.loading or sheet in self.sheets:
+                    continue
+                self.loading.add(sheet)
+            try:
+                data = self.load(sheet)
+            except vidProcess.ExportCancelled:
+                return
+            except (OSError, subprocess.CalledProcessError) as e:
+                error_msg = e.stderr.decode() if getattr(e, "stderr", None) else str(e)
+                logger.error(f"Thumbnail Error: {error_msg}")
+                data = None
+            decoded = self.decode(data) if data else None
+            with self.condition:
+                self.loading.discard(sheet)
+                if decoded is None:
+                    self.failed.add(sheet)
+                    continue
+                self.sheets[sheet] = decoded
+                self.used_bytes += decoded[1]
+                self.evict(keep=sheet)
+            if self.on_sheet:
+                self.on_sheet(sheet)
+
+    def load(self, sheet):
+        """JPEG bytes of a sheet, generating it on first use."""
+        path = self.sheet_path(sheet)
+        if not os.path.exists(path):
+            self.generate(sheet, path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def generate(self, sheet, path):
+        first = sheet * THUMBS_PER_SHEET
+        times = [min(thumb * self.interval, self.duration) for thumb in range(first, first + self.sheet_size(sheet))]
+        os.makedirs(self.folder, exist_ok=True)
+        # Workers generate different sheets at the same time, so each writes its own part file
+        partial_path = os.path.join(self.folder, f"{sheet}.part.jpg")
+        with vidTrace.span("thumbnails", source=self.source_path, sheet=sheet):
+            vidProcess.run_ffmpeg(sheet_command(self.source_path, times, partial_path), self.group)
+        os.replace(partial_path, path)
+
+    def evict(self, keep):
+        # Called with the condition held
+        while self.used_bytes > self.max_bytes and len(self.sheets) > 1:
+            sheet = next(iter(self.sheets))
+            if sheet == keep:
+                self.sheets.move_to_end(sheet)
+                continue
+            _, size = self.sheets.pop(sheet)
+            self.used_bytes -= size
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.wanted = []
+            self.condition.notify_all()
+        self.group.kill()
@@ -0,0 +1,231 @@
+import bisect
+import itertools
+
+
+class Timeline:
+    """Split points and deactivated segments of one video.
+
+    split_points is kept sorted, so the segment under any time is found
+    with a binary search. Every segment has a stable id that survives
+    splits around it: splitting a segment keeps its id (and deactivation)
+    on the left half and gives the right half a new id with the same
+    state. Edits go through execute() with a command object so they can be
+    undone and redone. suggestions holds sorted split points proposed by
+    analysis that the user hasn't accepted or rejected yet.
+    """
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.split_points = []
+        self.segment_ids = [0]  # segment_ids[i] spans split_points[i - 1] .. split_points[i]
+        self.deactivated = set()
+        self.suggestions = []
+        self.undo_stack = []
+        self.redo_stack = []
+        self._next_id = itertools.count(1)
+
+    @classmethod
+    def restore(cls, duration, split_points, deactivated_segments):
+        """A timeline with these splits and deactivated (start, end) segments and no undo history."""
+        timeline = cls(duration)
+        for position in sorted(set(split_points)):
+            if 0 < position < duration:
+                timeline.insert_split(position)
+        for start, end in deactivated_segments:
+            index = timeline.segment_index((start + end) / 2)
+            timeline.deactivated.add(timeline.segment_ids[index])
+        return timeline
+
+    def segment_index(self, position):
+        return bisect.bisect_right(self.split_points, position)
+
+    def segment_bounds(self, index):
+        start = self.split_points[index - 1] if index > 0 else 0
+        end = self.split_points[index] if index < len(self.split_points) else self.duration
+        return start, end
+
+    def segment_at(self, position):
+        """Return (start, end) of the segment containing position."""
+        return self.segment_bounds(self.segment_index(position))
+
+    def segments(self):
+        boundaries = [0] + self.split_points + [self.duration]
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def deactivated_segments(self):
+        """(start, end) of every deactivated segment, in timeline order."""
+        return [self.segment_bounds(i) for i, segment_id in enumerate(self.segment_ids) if segment_id in self.deactivated]
+
+    def is_deactivated(self, index):
+        return self.segment_ids[index] in self.deactivated
+
+    def set_suggestions(self, positions):
+        """Replace the suggestions, leaving out positions outside the video or already split."""
+        existing = set(self.split_points)
+        self.suggestions = sorted(p for p in set(positions) if 0 < p < self.duration and p not in existing)
+
+    def has_suggestion(self, position):
+        index = bisect.bisect_left(self.suggestions, position)
+        return index < len(self.suggestions) and self.suggestions[index] == position
+
+    def nearest_suggestion(self, position, tolerance):
+        """The suggestion closest to position if it is within tolerance seconds, else None."""
+        index = bisect.bisect_left(self.suggestions, position)
+        candidates = self.suggestions[max(0, index - 1):index + 1]
+        nearest = min(candidates, key=lambda suggestion: abs(suggestion - position), default=None)
+        return nearest if nearest is not None and abs(nearest - position) <= tolerance else None
+
+    def next_suggestion(self, position):
+        """The first suggestion after position, or None past the last one."""
+        index = bisect.bisect_right(self.suggestions, position)
+        return self.suggestions[index] if index < len(self.suggestions) else None
+
+    def insert_split(self, position, right_id=None):
+        index = self.segment_index(position)
+        left_id = self.segment_ids[index]
+        right_id = next(self._next_id) if right_id is None else right_id
+        self.split_points.insert(index, position)
+        self.segment_ids.insert(index + 1, right_id)
+        if left_id in self.deactivated:
+            self.deactivated.add(right_id)
+        return right_id
+
+    def delete_split(self, position):
+        """Remove the split at position, merging the segment after it into the one before."""
+        index = bisect.bisect_left(self.split_points, position)
+        del self.split_points[index]
+        right_id = self.segment_ids.pop(index + 1)
+        right_deactivated = right_id in self.deactivated
+        self.deactivated.discard(right_id)
+        return right_id, right_deactivated
+
+    def execute(self, command):
+        """Apply command and record it for undo. Returns False if it changed nothing."""
+        if not command.apply(self):
+            return False
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+        return True
+
+    def undo(self):
+        if not self.undo_stack:
+            return False
+        command = self.undo_stack.pop()
+        command.revert(self)
+        self.redo_stack.append(command)
+        return True
+
+    def redo(self):
+        if not self.redo_stack:
+            return False
+        command = self.redo_stack.pop()
+        command.apply(self)
+        self.undo_stack.append(command)
+        return True
+
+
+class AddSplit:
+    def __init__(self, position):
+        self.position = position
+        self.right_id = None
+
+    def apply(self, timeline):
+        index = bisect.bisect_left(timeline.split_points, self.position)
+        on_existing = index < len(timeline.split_points) and timeline.split_points[index] == self.position
+        if on_existing or not 0 < self.position < timeline.duration:
+            return False
+        # Redo reuses the id so later commands that refer to it still match
+        self.right_id = timeline.insert_split(self.position, self.right_id)
+        return True
+
+    def revert(self, timeline):
+        timeline.delete_split(self.position)
+
+
+class RemoveSplit:
+    """Removes the split at position, merging the segments on both sides of it.
+
+    The merged segment is the left one: it keeps the left segment's id and
+    deactivation. The right segment's id and deactivation are dropped with
+    the split and put back when the removal is undone.
+    """
+
+    def __init__(self, position):
+        self.position = position
+        self.right_id = None
+        self.right_deactivated = False
+
+    def apply(self, timeline):
+        index = bisect.bisect_left(timeline.split_points, self.position)
+        if index >= len(timeline.split_points) or timeline.split_points[index] != self.position:
+            return False
+        self.right_id, self.right_deactivated = timeline.delete_split(self.position)
+        return True
+
+    def revert(self, timeline):
+        timeline.insert_split(self.position, self.right_id)
+        if self.right_deactivated:
+            timeline.deactivated.add(self.right_id)
+        else:
+            timeline.deactivated.discard(self.right_id)
+
+
+class ToggleSegment:
+    def __init__(self, position):
+        self.position = position
+        self.segment_id = None
+
+    def apply(self, timeline):
+        if self.segment_id is None:
+            self.segment_id = timeline.segment_ids[timeline.segment_index(self.position)]
+        timeline.deactivated ^= {self.segment_id}
+        return True
+
+    def revert(self, timeline):
+        timeline.deactivated ^= {self.segment_id}
+
+
+class AcceptSuggestion:
+    def __init__(self, position):
+        self.position = position
+        self.split = AddSplit(position)
+
+    def apply(self, timeline):
+        if not timeline.has_suggestion(self.position) or not self.split.apply(timeline):
+            return False
+        timeline.suggestions.remove(self.position)
+        return True
+
+    def revert(self, timeline):
+        self.split.revert(timeline)
+        bisect.insort(timeline.suggestions, self.position)
+
+
+class RejectSuggestion:
+    def __init__(self, position):
+        self.position = position
+
+    def apply(self, timeline):
+        if not timeline.has_suggestion(self.position):
+            return False
+        timeline.suggestions.remove(self.position)
+        return True
+
+    def revert(self, timeline):
+        bisect.insort(timeline.suggestions, self.position)
+
+
+class Batch:
+    """Several commands applied, and undone, as one edit."""
+
+    def __init__(self, commands):
+        self.commands = commands
+        self.applied = []
+
+    def apply(self, timeline):
+        self.applied = [command for command in self.commands if command.apply(timeline)]
+        return bool(self.applied)
+
+    def revert(self, timeline):
+        for command in reversed(self.applied):
+            command.revert(timeline)
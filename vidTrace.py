@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import argparse
+import functools
+import itertools
+import threading
+import contextlib
+
+# Every record goes to each sink: a callable taking one dict
+_sinks = []
+_local = threading.local()
+_span_ids = itertools.count(1)
+
+
+class JsonLinesSink:
+    """Appends every record to a file as one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, default=str)
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def add_sink(sink):
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def enabled():
+    return bool(_sinks)
+
+
+def emit(record):
+    record.setdefault("time", time.time())
+    record.setdefault("thread", threading.current_thread().name)
+    for sink in list(_sinks):
+        sink(record)
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current_span():
+    """(id, stage) of the innermost open span on this thread, or (None, None)."""
+    stack = _stack()
+    return stack[-1] if stack else (None, None)
+
+
+@contextlib.contextmanager
+def span(stage, **fields):
+    """Record the wall time, thread CPU time and outcome of a pipeline stage.
+
+    FFmpeg commands run inside the span are recorded with its stage and
+    id. Spans nest per thread; fields are added to the record as they are.
+    """
+    if not _sinks:
+        yield
+        return
+    span_id = next(_span_ids)
+    parent_id, _ = current_span()
+    _stack().append((span_id, stage))
+    status, error = "ok", None
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield
+    except BaseException as e:
+        # Matched by name: vidProcess imports this module, so it can't import vidProcess.ExportCancelled
+        status = "cancelled" if type(e).__name__ in ("ExportCancelled", "KeyboardInterrupt") else "error"
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _stack().pop()
+        emit(dict(
+            fields, type="stage", stage=stage, id=span_id, parent=parent_id, status=status, error=error,
+            wall_seconds=time.perf_counter() - started, cpu_seconds=time.thread_time() - cpu_started
+        ))
+
+
+def traced(stage):
+    """Decorator running a pipeline function in a span; its first argument is recorded as the source."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage, source=args[0] if args else None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def file_sizes(paths):
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def command(cmd, wall_seconds, usage, returncode):
+    """Record one finished FFmpeg/FFprobe process; usage is its os.wait4 rusage, if known."""
+    if not _sinks:
+        return
+    if os.path.basename(cmd[0]).startswith("ffprobe"):
+        inputs, outputs = [cmd[-1]], []
+    else:
+        inputs = [cmd[i + 1] for i, arg in enumerate(cmd[:-1]) if arg == "-i"]
+        outputs = [arg for arg in cmd[1:] if arg not in inputs and not arg.startswith("-") and os.path.isfile(arg)]
+    span_id, stage = current_span()
+    record = {
+        "type": "command",
+        "stage": stage,
+        "span": span_id,
+        "cmd": cmd,
+        "returncode": returncode,
+        "wall_seconds": wall_seconds,
+        "cpu_user_seconds": usage.ru_utime if usage else None,
+        "cpu_system_seconds": usage.ru_stime if usage else None,
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        "max_rss_bytes": usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024) if usage else None,
+        # Sizes of the files named as inputs and outputs, not the bytes actually read: a seek reads far less
+        "input_file_bytes": file_sizes(inputs),
+        "output_file_bytes": file_sizes(outputs),
+        # Reads and writes that reached the disk rather than the page cache, in 512-byte blocks
+        "disk_read_blocks": usage.ru_inblock if usage else None,
+        "disk_write_blocks": usage.ru_oublock if usage else None,
+    }
+    emit(record)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summarize(records):
+    """Count, median, 95th percentile and total wall time of every stage and command stage."""
+    groups = {}
+    for record in records:
+        name = record.get("stage") or "-"
+        if record.get("type") == "command":
+            name += " (ffmpeg)"
+        groups.setdefault(name, []).append(record)
+    summary = {}
+    for name, group in sorted(groups.items()):
+        walls = [record["wall_seconds"] for record in group]
+        summary[name] = {
+            "count": len(group),
+            "failed": sum(1 for record in group if record.get("status", "ok") != "ok" or record.get("returncode")),
+            "p50_seconds": percentile(walls, 0.5),
+            "p95_seconds": percentile(walls, 0.95),
+            "total_seconds": sum(walls),
+        }
+    return summary
+
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Tracing can be switched on for any entry point without code changes
+if os.environ.get("VIDSPLITTER_TRACE"):
+    add_sink(JsonLinesSink(os.environ["VIDSPLITTER_TRACE"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize stage latencies from JSON-lines trace files.")
+    parser.add_argument("traces", nargs="+", help="trace files written with VIDSPLITTER_TRACE or --trace")
+    args = parser.parse_args(argv)
+
+    records = []
+    for path in args.traces:
+        records += read_records(path)
+    for name, stats in summarize(records).items():
+        print(f"{name}: {stats['count']} runs, {stats['failed']} failed, "
+              f"p50 {stats['p50_seconds']:.3f}s, p95 {stats['p95_seconds']:.3f}s, total {stats['total_seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import os
+import sys
+import array
+import vidCache
+import vidProcess
+import vidProbe
+import vidTrace
+
+WAVEFORM_VERSION = 1
+
+# Audio is reduced at this rate; the overview only needs its envelope
+SAMPLE_RATE = 8000
+BUCKET_SAMPLES = 128  # Samples per (min, max) pair of the finest level
+MIN_LEVEL_BUCKETS = 256  # Coarser levels are built down to about this many buckets
+
+SAMPLE_BYTES = 2  # s16le
+FULL_SCALE = 32768
+
+
+def decode_command(video_path):
+    return [
+        "ffmpeg",
+        "-v", "error",
+        "-i", video_path,
+        "-vn", "-sn", "-dn",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-f", "s16le",
+        "pipe:1"
+    ]
+
+
+class Waveform:
+    """Multi-resolution (min, max) peaks of a video's audio.
+
+    levels[0] has one pair per BUCKET_SAMPLES samples; every next level
+    halves the resolution. Each level is an array of interleaved min, max
+    16-bit values, so the whole pyramid is about twice the size of the
+    finest level.
+    """
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    def bucket_seconds(self, level):
+        return BUCKET_SAMPLES * 2 ** level / SAMPLE_RATE
+
+    def peaks(self, start, end, columns):
+        """(min, max) of each of columns equal slices of start..end seconds, as fractions of full scale.
+
+        Reads from the coarsest level that still has a bucket per column,
+        so the cost follows the number of columns, not the duration.
+        """
+        if not self.levels or columns <= 0 or end <= start:
+            return []
+        column_seconds = (end - start) / columns
+        level = 0
+        while level + 1 < len(self.levels) and self.bucket_seconds(level + 1) <= column_seconds:
+            level += 1
+        values = self.levels[level]
+        buckets = len(values) // 2
+        bucket_seconds = self.bucket_seconds(level)
+        result = []
+        for column in range(columns):
+            first = min(buckets, int((start + column * column_seconds) / bucket_seconds))
+            last = min(buckets, max(first + 1, int((start + (column + 1) * column_seconds) / bucket_seconds)))
+            if first >= last:
+                result.append((0.0, 0.0))
+                continue
+            result.append((min(values[2 * first:2 * last:2]) / FULL_SCALE, max(values[2 * first + 1:2 * last:2]) / FULL_SCALE))
+        return result
+
+
+class PeakReducer:
+    """Reduces streamed s16le samples to (min, max) pairs per bucket, holding only a partial bucket."""
+
+    def __init__(self):
+        self.peaks = array.array("h")
+        self.pending = b""
+
+    def chunk(self, data):
+        data = self.pending + data
+        usable = len(data) - len(data) % (BUCKET_SAMPLES * SAMPLE_BYTES)
+        self.pending = data[usable:]
+        self.add(data[:usable])
+
+    def add(self, data):
+        samples = array.array("h", data)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        for i in range(0, len(samples), BUCKET_SAMPLES):
+            bucket = samples[i:i + BUCKET_SAMPLES]
+            self.peaks.append(min(bucket))
+            self.peaks.append(max(bucket))
+
+    def finish(self):
+        usable = len(self.pending) - len(self.pending) % SAMPLE_BYTES
+        if usable:
+            self.add(self.pending[:usable])
+        self.pending = b""
+        return self.peaks
+
+
+def coarser(values):
+    """The next pyramid level: every two neighbouring buckets merged into one."""
+    merged = array.array("h")
+    for i in range(0, len(values), 4):
+        pair = values[i:i + 4]
+        merged.append(min(pair[0::2]))
+        merged.append(max(pair[1::2]))
+    return merged
+
+
+@vidTrace.traced("waveform")
+def build(video_path, group=None):
+    reducer = PeakReducer()
+    if vidProbe.probe(video_path)["has_audio"]:
+        vidProcess.run_ffmpeg(decode_command(video_path), group, on_chunk=reducer.chunk)
+    levels = [reducer.finish()]
+    while len(levels[-1]) // 2 > MIN_LEVEL_BUCKETS:
+        levels.append(coarser(levels[-1]))
+    return Waveform(levels)
+
+
+def cache_paths(video_path):
+    base = os.path.join(vidCache.cache_dir("waveforms"), vidCache.file_key(video_path))
+    return base + ".json", base + ".peaks"
+
+
+def save(waveform, video_path):
+    header_path, peaks_path = cache_paths(video_path)
+    with open(peaks_path, "wb") as f:
+        for values in waveform.levels:
+            values = array.array("h", values)
+            if sys.byteorder == "big":
+                values.byteswap()
+            f.write(values.tobytes())
+    # The header is written last, so peaks without one are never read
+    vidCache.save_json(header_path, {
+        "version": WAVEFORM_VERSION,
+        "sample_rate": SAMPLE_RATE,
+        "bucket_samples": BUCKET_SAMPLES,
+        "levels": [len(values) for values in waveform.levels],
+    })
+
+
+def read_cached(video_path):
+    header_path, peaks_path = cache_paths(video_path)
+    header = vidCache.load_json(header_path)
+    if (not header or header.get("version") != WAVEFORM_VERSION or header.get("sample_rate") != SAMPLE_RATE
+            or header.get("bucket_samples") != BUCKET_SAMPLES):
+        return None
+    values = array.array("h")
+    try:
+        with open(peaks_path, "rb") as f:
+            values.frombytes(f.read())
+    except (OSError, ValueError):
+        return None
+    if len(values) != sum(header["levels"]):
+        return None
+    if sys.byteorder == "big":
+        values.byteswap()
+    levels = []
+    offset = 0
+    for length in header["levels"]:
+        levels.append(values[offset:offset + length])
+        offset += length
+    return Waveform(levels)
+
+
+def load(video_path, group=None):
+    """Return the waveform of video_path, decoding its audio and storing the peaks on first use."""
+    waveform = read_cached(video_path)
+    if waveform is None:
+        waveform = build(video_path, group)
+        save(waveform, video_path)
+    return waveform